@@ -22,7 +22,7 @@ class LimitOrderRankModule(VibeModule):
         self.interval = 10  # 更新间隔(秒)
         
         # Logging stats
-        self.last_log_time = time.time()
+        self.last_log_time = 0.0
         self.call_count = 0
         self.first_run = True
 
@@ -31,12 +31,11 @@ class LimitOrderRankModule(VibeModule):
         由 initialize(context) 自动调用。
         """
         # print(f"DEBUG: LimitOrderRankModule CONFIGURE called! Context data: {type(self.context.data)}")
+        # 日志节流按上下文时钟计算 (回放模式下为虚拟时间)
+        self.last_log_time = self.context.clock.time()
         self.context.logger.info(f"{self.name} started. Refresh interval: {self.interval}s")
         
-        # 立即运行一次
-        self.process()
-        
-        # 注册定时任务 (放在 process 之后，确保第一次已经执行)
+        # 注册定时任务 (调度器注册后立即执行第一次，不阻塞启动)
         self.context.register_cron(self, f"interval:{self.interval}")
 
 
@@ -77,7 +76,7 @@ class LimitOrderRankModule(VibeModule):
             if df.empty:
 
                 # 只有第一次或每分钟 Log 一次空数据警告，避免刷屏
-                if self.first_run or (time.time() - self.last_log_time >= 60):
+                if self.first_run or (self.context.clock.time() - self.last_log_time >= 60):
                      self.context.logger.info("当前无涨停股数据 (或是非交易时间/数据源空)。")
                 return
 
@@ -105,7 +104,7 @@ class LimitOrderRankModule(VibeModule):
             
             # 1. 统计与日志聚合
             self.call_count += 1
-            now = time.time()
+            now = self.context.clock.time()
             if self.first_run:
                 self.context.logger.info(f"First run processed {len(result_df)} limit rank stocks.")
                 self.first_run = False
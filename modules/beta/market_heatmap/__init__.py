@@ -1,12 +1,13 @@
 from vibe_core.module import VibeModule
 from vibe_core.event import Event
+from vibe_core.data.board_heat import BoardHeat
 import pandas as pd
-import time
+import numpy as np
 
 class MarketHeatmapModule(VibeModule):
     """
     市场行业热力图模块
-    展示各行业的实时涨跌分布。
+    展示各行业的实时涨跌分布，并基于板块索引汇总全部概念/行业的涨停热度。
     """
     dependencies = ['AkShareDataModule']
     
@@ -19,15 +20,16 @@ class MarketHeatmapModule(VibeModule):
         self.interval = 10  # 提高刷新频率，与 Limit Rank 保持一致
         
         self.last_log_time = 0
+        # 概念/行业热度: 排除成分股超过该数量的泛板块，每个板块展示的龙头数
+        self.board_heat_max_size = 800
+        self.board_heat_top_n = 40
+        self._board_heat = None
 
     def configure(self):
         """模块初始化"""
         self.context.logger.info(f"{self.name} module loaded.")
         
-        # 立即运行一次
-        self.process()
-        
-        # 注册定时任务
+        # 注册定时任务 (调度器注册后立即执行第一次，不阻塞启动)
         self.context.register_cron(self, f"interval:{self.interval}")
 
     def on_event(self, event: Event):
@@ -36,7 +38,7 @@ class MarketHeatmapModule(VibeModule):
 
     def process(self):
         """获取数据并推送到前端"""
-        t0 = time.time()
+        t0 = self.context.clock.time()
         
         if self.context.data is None:
             return
@@ -46,36 +48,28 @@ class MarketHeatmapModule(VibeModule):
             if not hasattr(self.context.data, 'get_em_sectors'):
                  return
 
-            t1 = time.time()
+            t1 = self.context.clock.time()
             df_sectors = self.context.data.get_em_sectors()
-            t2 = time.time()
+            t2 = self.context.clock.time()
             if df_sectors is None or df_sectors.empty:
                 self.context.logger.warning(f"Heatmap: get_em_sectors empty. Cost: {t2-t1:.2f}s")
                 return
 
             # 2. 获取涨停股数据用于计算权重
             df_limit = self.context.data.get_limit_up_pool()
-            t3 = time.time()
+            t3 = self.context.clock.time()
             
             # self.context.logger.info(f"Heatmap Data Fetch: Sectors={t2-t1:.2f}s, LimitPool={t3-t2:.2f}s")
 
             sector_weights = {} # { '行业名': weighted_count }
 
-            if not df_limit.empty:
-                # 确保列名正确
-                if '所属行业' in df_limit.columns and '涨跌幅' in df_limit.columns:
-                    # 转换数值
-                    df_limit['涨跌幅'] = pd.to_numeric(df_limit['涨跌幅'], errors='coerce').fillna(0)
-                    
-                    # 遍历计算权重
-                    for _, row in df_limit.iterrows():
-                        industry = row['所属行业']
-                        if not industry: continue
-                        
-                        # 规则: 涨幅 > 11% (20cm) 记 2 分，否则 1 分
-                        weight = 2 if row['涨跌幅'] > 11 else 1
-                        
-                        sector_weights[industry] = sector_weights.get(industry, 0) + weight
+            if not df_limit.empty and '所属行业' in df_limit.columns:
+                # 规则: 涨幅 > 11% (20cm) 记 2 分，否则 1 分
+                weights = pd.Series(BoardHeat.limit_weights(df_limit), index=df_limit.index)
+                sector_weights = weights.groupby(df_limit['所属行业']).sum().to_dict()
+
+            # 全部概念/行业的热度 (基于板块索引)
+            self.process_board_heat(df_limit)
 
             # 3. 数据合并与清洗
             if '涨跌幅' in df_sectors.columns:
@@ -106,7 +100,7 @@ class MarketHeatmapModule(VibeModule):
             payload = final_df[payload_cols].to_dict(orient='records')
             
             # 每分钟记录一次日志
-            now = time.time()
+            now = self.context.clock.time()
             if now - self.last_log_time >= 60:
                 self.context.logger.info(f"[Heatmap] Broadcasted {len(payload)} sectors. Cost: {now-t0:.2f}s")
                 self.last_log_time = now
@@ -117,15 +111,50 @@ class MarketHeatmapModule(VibeModule):
         except Exception as e:
             self.context.logger.error(f"Heatmap process error: {e}")
 
+    def _get_board_heat(self):
+        """板块索引重建后 (对象变化) 重新创建聚合器。"""
+        if not hasattr(self.context.data, 'get_board_index'):
+            return None
+        index = self.context.data.get_board_index()
+        if index is None:
+            return None
+        if self._board_heat is None or self._board_heat.index is not index:
+            self._board_heat = BoardHeat(index)
+        return self._board_heat
+
+    def process_board_heat(self, df_limit: pd.DataFrame):
+        """把涨停/炸板/跌停池一次性映射到全部概念与行业，推送 board_heat。"""
+        heat = self._get_board_heat()
+        if heat is None:
+            return
+
+        df_broken = self.context.data.get_broken_limit_pool() if hasattr(self.context.data, 'get_broken_limit_pool') else None
+        df_down = self.context.data.get_limit_down_pool() if hasattr(self.context.data, 'get_limit_down_pool') else None
+
+        result = heat.compute(df_limit, df_broken, df_down, max_size=self.board_heat_max_size)
+        top = result.head(self.board_heat_top_n).replace({np.nan: None})
+        self.context.broadcast_ui("board_heat", top.to_dict(orient='records'))
+
     @classmethod
     def get_ui_config(cls):
         """返回前端配置"""
-        return {
-            "id": "market_heatmap",
-            "title": "Industry Heatmap (Weighted Limit Up)",
-            "component": "market-heatmap-widget",
-            "default_col_span": "col-span-1 md:col-span-2",
-            "config_default": {},
-            "config_description": "Displays top industries sorted by change. Box size represents weighted limit-up count (20cm=2, 10cm=1).",
-            "script_path": "widget.js" 
-        }
+        return [
+            {
+                "id": "market_heatmap",
+                "title": "Industry Heatmap (Weighted Limit Up)",
+                "component": "market-heatmap-widget",
+                "default_col_span": "col-span-1 md:col-span-2",
+                "config_default": {},
+                "config_description": "Displays top industries sorted by change. Box size represents weighted limit-up count (20cm=2, 10cm=1).",
+                "script_path": "widget.js"
+            },
+            {
+                "id": "board_heat",
+                "title": "Concept & Industry Heat (Limit Pools)",
+                "component": "board-heat-widget",
+                "default_col_span": "col-span-1 md:col-span-2",
+                "config_default": {},
+                "config_description": "All concepts and industries ranked by limit-up heat (weighted limit-ups minus broken/limit-down), with leader stocks.",
+                "script_path": "widget.js"
+            }
+        ]
@@ -1,6 +1,6 @@
 (function() {
     console.log("[Heatmap] Widget script loading...");
-    const { ref, onMounted, onUnmounted } = Vue;
+    const { ref, computed, onMounted, onUnmounted } = Vue;
 
     const MarketHeatmapWidget = {
         props: ['widgetId', 'moduleId', 'config'],
@@ -85,7 +85,85 @@
         }
     };
 
+    const BoardHeatWidget = {
+        props: ['widgetId', 'moduleId', 'config'],
+        template: `
+            <div class="h-full flex flex-col bg-slate-900/50 p-2 rounded overflow-hidden select-none">
+                <div class="flex gap-1 mb-2 text-[10px]">
+                    <button v-for="opt in kindOptions" :key="opt.value" @click="kind = opt.value"
+                            :class="['px-2 py-0.5 rounded', kind === opt.value ? 'bg-yellow-400/80 text-black font-bold' : 'bg-slate-800 text-slate-400']">
+                        {{ opt.label }}
+                    </button>
+                </div>
+                <div class="flex-grow overflow-auto custom-scrollbar">
+                    <table class="w-full text-xs">
+                        <thead class="text-slate-500 sticky top-0 bg-slate-900">
+                            <tr>
+                                <th class="text-left font-normal">Board</th>
+                                <th class="text-right font-normal">Up</th>
+                                <th class="text-right font-normal">Broken</th>
+                                <th class="text-right font-normal">Down</th>
+                                <th class="text-right font-normal">Score</th>
+                                <th class="text-left font-normal pl-2">Leaders</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            <tr v-for="item in filtered" :key="item.board" class="border-t border-slate-800 hover:bg-slate-800/50">
+                                <td class="py-1 text-white/90 truncate max-w-[8rem]" :title="item.board + ' (' + item.size + ')'">
+                                    <span :class="item.kind === 'industry' ? 'text-sky-400' : 'text-amber-300'">●</span> {{ item.board }}
+                                </td>
+                                <td class="text-right font-mono text-red-400">{{ item.up }}</td>
+                                <td class="text-right font-mono text-slate-400">{{ item.broken }}</td>
+                                <td class="text-right font-mono text-green-400">{{ item.down }}</td>
+                                <td class="text-right font-mono font-bold text-white">{{ item.score.toFixed(1) }}</td>
+                                <td class="pl-2 text-slate-300 truncate max-w-[12rem]">
+                                    <span v-for="s in item.leaders" :key="s.code" class="mr-1" :title="s.code">
+                                        {{ s.name }}<sup v-if="s.boards > 1" class="text-yellow-400">{{ s.boards }}</sup>
+                                    </span>
+                                </td>
+                            </tr>
+                        </tbody>
+                    </table>
+                </div>
+                <div v-if="heatData.length === 0" class="absolute inset-0 flex items-center justify-center text-slate-600 italic text-sm">
+                    Waiting for limit pool data...
+                </div>
+            </div>
+        `,
+        setup(props) {
+            const heatData = ref([]);
+            const kind = ref('all');
+            const kindOptions = [
+                { value: 'all', label: 'All' },
+                { value: 'concept', label: 'Concept' },
+                { value: 'industry', label: 'Industry' }
+            ];
+
+            const filtered = computed(() => {
+                if (kind.value === 'all') return heatData.value;
+                return heatData.value.filter(item => item.kind === kind.value);
+            });
+
+            onMounted(() => {
+                if (window.vibeSocket) {
+                    window.vibeSocket.subscribe(props.moduleId, (data) => {
+                        heatData.value = data;
+                    });
+                }
+            });
+
+            onUnmounted(() => {
+                if (window.vibeSocket) {
+                    window.vibeSocket.unsubscribe(props.moduleId);
+                }
+            });
+
+            return { heatData, kind, kindOptions, filtered };
+        }
+    };
+
     if (!window.VibeComponentRegistry) window.VibeComponentRegistry = {};
     window.VibeComponentRegistry['market-heatmap-widget'] = MarketHeatmapWidget;
+    window.VibeComponentRegistry['board-heat-widget'] = BoardHeatWidget;
     console.log("[Heatmap] Widget registered.");
 })();
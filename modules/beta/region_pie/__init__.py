@@ -1,9 +1,7 @@
 from vibe_core.module import VibeModule
 from vibe_core.event import Event
 import pandas as pd
-import time
 import os
-import threading
 
 class RegionPieModule(VibeModule):
     """
@@ -22,41 +20,16 @@ class RegionPieModule(VibeModule):
         self.interval = 10  
         
         self.last_log_time = 0
-        self.is_fetching = False
         
     def configure(self):
         self.context.logger.info(f"{self.name} started.")
-        self.process()
+        # 第一次由调度器执行 (注册后立即触发)，不阻塞启动
         self.context.register_cron(self, f"interval:{self.interval}")
 
     def on_event(self, event: Event):
         if event.type == "TIMER":
             self.process()
 
-    def fetch_missing_info(self, codes):
-        """后台通过系统接口触发网络获取 (only_cache=False)"""
-        if self.is_fetching: return
-        self.is_fetching = True
-        
-        try:
-            updates = 0
-            for code in codes:
-                # 这里调用不带 only_cache=True，会触发网络请求并写入 SQLite
-                info = self.context.data.get_stock_info(code)
-                if info and 'provincial_name' in info:
-                    updates += 1
-                
-                # 礼貌性延迟，避免封 IP
-                time.sleep(0.5)
-            
-            if updates > 0:
-                self.context.logger.info(f"Fetched info for {updates} new stocks via Adapter.")
-                
-        except Exception as e:
-            self.context.logger.error(f"Error in fetch_missing_info: {e}")
-        finally:
-            self.is_fetching = False
-
     def process(self):
         if self.context.data is None: return
 
@@ -68,9 +41,9 @@ class RegionPieModule(VibeModule):
             df_limit = self.context.data.get_limit_up_pool()
             
             if df_limit is None or df_limit.empty:
-                if time.time() - self.last_log_time > 60:
+                if self.context.clock.time() - self.last_log_time > 60:
                      self.context.logger.info("Limit pool empty.")
-                     self.last_log_time = time.time()
+                     self.last_log_time = self.context.clock.time()
                 return
 
             # 2. 提取代码列表
@@ -81,26 +54,27 @@ class RegionPieModule(VibeModule):
             current_codes = [str(c).zfill(6) for c in df_limit[code_col]]
             
             # 3. 统计省份分布
-            region_counts = {}
-            missing_codes = []
-            
-            for code in current_codes:
-                # 关键修改：
-                # 使用 only_cache=True，这会查询 SQLite，速度极快 (毫秒级)
-                # 不会阻塞主线程，也不会触发网络请求
-                info = self.context.data.get_stock_info(code, only_cache=True)
-                
-                province = info.get('provincial_name') if info else None
-                
-                if province:
-                    region_counts[province] = region_counts.get(province, 0) + 1
-                else:
-                    missing_codes.append(code)
+            # 一次批量查询整个涨停池 (内存缓存 + 单次 IN 查询)，不触发网络请求
+            if hasattr(self.context.data, 'get_stock_info_many'):
+                df_info = self.context.data.get_stock_info_many(current_codes)
+                provinces = df_info['province']
+                region_counts = provinces.value_counts().to_dict()
+                missing_codes = df_info.loc[provinces.isna(), 'code'].tolist()
+            else:
+                region_counts = {}
+                missing_codes = []
+                for code in current_codes:
+                    info = self.context.data.get_stock_info(code, only_cache=True)
+                    province = info.get('provincial_name') if info else None
+                    if province:
+                        region_counts[province] = region_counts.get(province, 0) + 1
+                    else:
+                        missing_codes.append(code)
             
             # 4. 异步获取缺失信息
-            # 如果发现有 SQLite 里没有的股票，启动后台线程去联网抓取
-            if missing_codes and not self.is_fetching:
-                threading.Thread(target=self.fetch_missing_info, args=(missing_codes,), daemon=True).start()
+            # 交给 StockInfoModule 的后台预取队列 (去重、限速)，涨停池中的股票优先抓取
+            if missing_codes and hasattr(self.context.data, 'prefetch_stock_info'):
+                self.context.data.prefetch_stock_info(missing_codes, priority=0)
 
             # 5. 构造 Payload
             sorted_regions = sorted(region_counts.items(), key=lambda x: x[1], reverse=True)
@@ -110,7 +84,7 @@ class RegionPieModule(VibeModule):
             self.context.broadcast_ui("region_pie", payload)
             
             # Log
-            now = time.time()
+            now = self.context.clock.time()
             if now - self.last_log_time >= 60:
                 mapped_count = len(current_codes) - len(missing_codes)
                 self.context.logger.info(f"[RegionPie] Broadcasted. Mapped: {mapped_count}/{len(current_codes)}")
@@ -2,7 +2,6 @@ from vibe_core.module import VibeModule
 from vibe_core.event import Event
 import logging
 import pandas as pd
-import time
 
 class WeightedLimitUpModule(VibeModule):
     """
@@ -19,13 +18,15 @@ class WeightedLimitUpModule(VibeModule):
         self.name = "Weighted Limit Up Rank"
         self.interval = 10  # 更新间隔(秒)
         
-        self.last_log_time = time.time()
+        self.last_log_time = 0.0
         self.call_count = 0
         self.first_run = True
 
     def configure(self):
         self.context.logger.info(f"{self.name} started. Refresh interval: {self.interval}s")
-        self.process()
+        # 日志节流按上下文时钟计算 (回放模式下为虚拟时间)
+        self.last_log_time = self.context.clock.time()
+        # 第一次由调度器执行 (注册后立即触发)，不阻塞启动
         self.context.register_cron(self, f"interval:{self.interval}")
 
     def on_stop(self):
@@ -52,7 +53,7 @@ class WeightedLimitUpModule(VibeModule):
                 return
 
             if df.empty:
-                if self.first_run or (time.time() - self.last_log_time >= 60):
+                if self.first_run or (self.context.clock.time() - self.last_log_time >= 60):
                      self.context.logger.info("当前无涨停股数据。")
                 return
 
@@ -82,7 +83,7 @@ class WeightedLimitUpModule(VibeModule):
             
             # 日志
             self.call_count += 1
-            now = time.time()
+            now = self.context.clock.time()
             if self.first_run:
                 self.context.logger.info(f"First run processed {len(result_df)} weighted limit stocks.")
                 self.first_run = False
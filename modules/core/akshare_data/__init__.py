@@ -1,10 +1,6 @@
 from vibe_core.module import VibeModule, ModuleCategory
-import sys
-import os
-# Fix for dynamic loading relative imports
-sys.path.append(os.path.dirname(__file__))
-from adapter import AKShareAdapter
-from base import AKShareBase 
+from .adapter import AKShareAdapter
+from .base import AKShareBase
 import datetime
 
 class AkShareDataModule(VibeModule, AKShareAdapter):
@@ -23,6 +19,7 @@ class AkShareDataModule(VibeModule, AKShareAdapter):
 
     def initialize(self, context):
         self.context = context
+        self.pool_cache_ttl = self.config.get("pool_cache_ttl", self.pool_cache_ttl)
         
         # Dynamically register SELF as provider
         if self.context.data and hasattr(self.context.data, 'register_provider'):
@@ -1,8 +1,8 @@
 import pandas as pd
 import logging
-from realtime.market import AKShareMarket
-from realtime.limit import AKShareLimitBoard
-from dictionary.meta import AKShareMeta
+from .realtime.market import AKShareMarket
+from .realtime.limit import AKShareLimitBoard
+from .dictionary.meta import AKShareMeta
 
 try:
     import akshare as ak
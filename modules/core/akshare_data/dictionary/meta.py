@@ -2,7 +2,15 @@ import pandas as pd
 import logging
 import datetime
 import os
-from base import AKShareBase
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, List, Sequence, Iterable
+from ..base import AKShareBase
+from vibe_core.data.concept_store import ConceptHistoryStore
+from vibe_core.data.concept_analytics import ConceptAnalytics
+from vibe_core.data.board_index import BoardIndex
+from vibe_core.data.ratelimit import TokenBucket
+from vibe_core.data.calendar import get_trading_calendar
 
 try:
     import akshare as ak
@@ -83,11 +91,29 @@ class AKShareMeta(AKShareBase):
 
         return pd.DataFrame()
 
-    def get_ths_concept_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    def get_ths_concept_history(self, symbol: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        获取同花顺概念指数日线。
+        未指定 start_date 时从本地存储的最后日期次日开始 (本地无数据则取全部历史)，
+        未指定 end_date 时取今天。
+        """
         self._ensure_akshare()
         if ak is None: return pd.DataFrame()
+
+        if start_date is None:
+            last = self.get_concept_history_store().read_last_date(symbol)
+            start_date = (last + datetime.timedelta(days=1)).strftime("%Y%m%d") if last else self.ths_history_start
+        if end_date is None:
+            end_date = datetime.date.today().strftime("%Y%m%d")
+
+        start_date = start_date.replace("-", "")
+        end_date = end_date.replace("-", "")
+        if start_date > end_date:
+            return pd.DataFrame()
+
         try:
-            return ak.stock_board_concept_index_ths(symbol=symbol, start_date=start_date, end_date=end_date)
+            df = ak.stock_board_concept_index_ths(symbol=symbol, start_date=start_date, end_date=end_date)
+            return df if df is not None else pd.DataFrame()
         except Exception as e:
             self.log(logging.ERROR, f"获取 {symbol} 历史数据错误: {e}")
             return pd.DataFrame()
@@ -145,12 +171,326 @@ class AKShareMeta(AKShareBase):
             except Exception as e:
                 self.log(logging.ERROR, f"同步 {filename} 失败: {e}")
 
-    def sync_ths_concept_histories(self):
-        """同步所有同花顺概念的历史数据。"""
-        # Placeholder
+    # 全量历史的起始日期 (本地无数据的新概念从这里开始拉取)
+    ths_history_start = "20200101"
+    ths_concepts_path = os.path.join("data", "concepts", "ths_concepts.csv")
+
+    def get_concept_history_store(self) -> ConceptHistoryStore:
+        """共享的概念历史存储 (CSV 源 + 列式面板)。"""
+        if getattr(self, "_concept_store", None) is None:
+            self._concept_store = ConceptHistoryStore()
+        return self._concept_store
+
+    def _ths_concept_names(self) -> list:
+        path = self.ths_concepts_path
+        names = []
+        if os.path.exists(path):
+            try:
+                names = pd.read_csv(path)["name"].dropna().astype(str).tolist()
+            except Exception as e:
+                self.log(logging.WARNING, f"读取 {path} 失败: {e}")
+        # 合并本地已有的概念，避免概念列表缺失时丢失存量数据的更新
+        names += list(self.get_concept_history_store().source_files().keys())
+        return list(dict.fromkeys(names))
+
+    @staticmethod
+    def _last_closed_date(now: datetime.datetime = None) -> datetime.date:
+        """最近一个已收盘的交易日 (15:00 之前视为当日未收盘)。"""
+        now = now or datetime.datetime.now()
+        day = now.date() if now.hour >= 15 else now.date() - datetime.timedelta(days=1)
+        return get_trading_calendar().last_trading_day(day)
+
+    def sync_ths_concept_histories(self, max_workers: int = 8, rate_per_sec: float = 4.0, rebuild_panel: bool = True) -> Dict[str, int]:
+        """
+        增量同步所有同花顺概念的历史数据。
+        1. 从本地存储读取每个概念的最后日期，只请求缺失的尾部区间；
+        2. 线程池并发抓取，所有线程共享一个令牌桶限速；
+        3. 每个概念的 CSV 通过临时文件 + os.replace 原子替换；
+        4. 全部完成后重建列式面板。
+        """
+        self._ensure_akshare()
+        if ak is None: return {}
+
         self.sync_concepts_and_sectors()
-        self.log(logging.INFO, "Concept history sync logic placeholder.")
 
-    def sync_board_constituent_data(self):
-        """同步板块与成分股的对应关系"""
-        self.log(logging.INFO, "Board constituent sync logic placeholder.")
\ No newline at end of file
+        store = self.get_concept_history_store()
+        os.makedirs(store.source_dir, exist_ok=True)
+        target = self._last_closed_date()
+        end_date = target.strftime("%Y%m%d")
+
+        # 已是最新的概念直接跳过，不发请求
+        todo = []
+        stats = {"updated": 0, "skipped": 0, "failed": 0, "rows": 0}
+        for name in self._ths_concept_names():
+            last = store.read_last_date(name)
+            if last and last >= target:
+                stats["skipped"] += 1
+                continue
+            start = (last + datetime.timedelta(days=1)).strftime("%Y%m%d") if last else self.ths_history_start
+            todo.append((name, start))
+
+        self.log(logging.INFO, f"概念历史增量同步: 待更新 {len(todo)} 个，已最新 {stats['skipped']} 个")
+        if not todo:
+            return stats
+
+        bucket = TokenBucket(rate_per_sec)
+
+        def fetch(name: str, start: str) -> int:
+            bucket.acquire()
+            df = self.get_ths_concept_history(name, start_date=start, end_date=end_date)
+            if df is None or df.empty:
+                return 0
+            return store.append_rows(name, df)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(fetch, name, start): name for name, start in todo}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    added = future.result()
+                    stats["rows"] += added
+                    if added:
+                        stats["updated"] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    self.log(logging.ERROR, f"同步概念 {name} 历史失败: {e}")
+
+        if rebuild_panel and stats["updated"]:
+            store.build()
+
+        self.log(logging.INFO, f"概念历史增量同步完成: {stats}")
+        return stats
+
+    # --- 概念强度分析 (基于本地面板，无网络请求) ---
+
+    def get_concept_analytics(self) -> Optional[ConceptAnalytics]:
+        """返回与当前面板绑定的分析引擎，面板重建后自动更换。"""
+        panel = self.get_concept_history_store().load()
+        if panel is None:
+            return None
+        engine = getattr(self, "_concept_analytics", None)
+        if engine is None or engine.panel is not panel:
+            engine = ConceptAnalytics(panel)
+            self._concept_analytics = engine
+        return engine
+
+    def get_concept_strength(self, windows: Sequence[int] = (5, 20, 60), benchmark: Optional[str] = None,
+                             rank_window: int = 20, date: Optional[str] = None) -> pd.DataFrame:
+        """全部同花顺概念的强度汇总 (滚动收益、相对强度、动量排名、回撤)。"""
+        engine = self.get_concept_analytics()
+        if engine is None:
+            return pd.DataFrame()
+        try:
+            return engine.summary(windows=windows, benchmark=benchmark, rank_window=rank_window, date=date)
+        except Exception as e:
+            self.log(logging.ERROR, f"计算概念强度失败: {e}")
+            return pd.DataFrame()
+
+    def get_concept_correlation(self, window: int = 60, concepts: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """概念日收益相关系数矩阵。"""
+        engine = self.get_concept_analytics()
+        if engine is None:
+            return pd.DataFrame()
+        return engine.correlation(window=window, concepts=concepts)
+
+    def get_em_concept_strength(self) -> pd.DataFrame:
+        """东财概念快照 (data/concepts/em_concepts.csv) 的横截面排名。"""
+        path = os.path.join("data", "concepts", "em_concepts.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        try:
+            return ConceptAnalytics.rank_snapshot(pd.read_csv(path))
+        except Exception as e:
+            self.log(logging.ERROR, f"读取 {path} 失败: {e}")
+            return pd.DataFrame()
+
+    # --- 板块 <-> 成分股索引 ---
+
+    board_map_path = os.path.join("data", "concepts", "board_stocks_map.json")
+    board_index_path = os.path.join("data", "concepts", "panel", "board_index.npz")
+
+    def get_board_index(self) -> Optional[BoardIndex]:
+        """
+        返回板块/成分股双向索引 (整数 ID + CSR)。
+        board_stocks_map.json 更新后自动重建二进制索引。
+        """
+        path = self.board_map_path
+        stamp = os.path.getmtime(path) if os.path.exists(path) else None
+        if getattr(self, "_board_index", None) is not None and self._board_index_stamp == stamp:
+            return self._board_index
+
+        industries = []
+        sectors_path = os.path.join(os.path.dirname(path), "em_sectors.csv")
+        if os.path.exists(sectors_path):
+            try:
+                industries = pd.read_csv(sectors_path)["板块名称"].tolist()
+            except Exception as e:
+                self.log(logging.WARNING, f"读取行业列表失败: {e}")
+
+        try:
+            self._board_index = BoardIndex.load_or_build(path, self.board_index_path, industries)
+        except Exception as e:
+            self.log(logging.ERROR, f"加载板块索引失败: {e}")
+            self._board_index = None
+        self._board_index_stamp = stamp
+        return self._board_index
+
+    def get_stock_boards(self, codes: Sequence[str], kind: Optional[int] = None) -> pd.DataFrame:
+        """
+        一组股票 (如涨停池) 所属的板块及命中个数。
+        :param kind: None 全部; 0 概念; 1 行业
+        :return: DataFrame[board, count, size]
+        """
+        index = self.get_board_index()
+        if index is None:
+            return pd.DataFrame(columns=["board", "count", "size"])
+        return index.boards_of_many(codes, kind=kind)
+
+    # --- 板块成分股抓取 ---
+
+    board_crawl_checkpoint_path = os.path.join("data", "concepts", "board_crawl_checkpoint.json")
+
+    def _em_board_list(self) -> Dict[str, str]:
+        """东财行业/概念板块列表 {板块名: "industry" | "concept"}，接口失败时使用本地快照。"""
+        boards: Dict[str, str] = {}
+        sources = (
+            ("industry", self.get_em_sectors, "em_sectors.csv"),
+            ("concept", self.get_em_concepts, "em_concepts.csv"),
+        )
+        for kind, func, filename in sources:
+            df = func()
+            if df is None or df.empty or "板块名称" not in df.columns:
+                path = os.path.join("data", "concepts", filename)
+                df = pd.read_csv(path) if os.path.exists(path) else pd.DataFrame()
+            if "板块名称" in df.columns:
+                for name in df["板块名称"].dropna().astype(str):
+                    boards.setdefault(name, kind)
+        return boards
+
+    def _load_board_checkpoint(self, day: str) -> Dict:
+        """读取当日的抓取检查点；跨日的检查点作废 (成分股可能已变化)。"""
+        path = self.board_crawl_checkpoint_path
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("date") == day:
+                    return data
+            except Exception as e:
+                self.log(logging.WARNING, f"读取抓取检查点失败，将重新开始: {e}")
+        return {"date": day, "boards": {}}
+
+    @staticmethod
+    def _diff_board_maps(old: Dict[str, List[str]], new: Dict[str, List[str]]) -> Dict[str, int]:
+        """比较新旧板块成分映射。"""
+        diff = {"added_boards": 0, "removed_boards": 0, "changed_boards": 0, "added_links": 0, "removed_links": 0}
+        for name in set(old) | set(new):
+            before, after = set(old.get(name, [])), set(new.get(name, []))
+            if name not in old:
+                diff["added_boards"] += 1
+            elif name not in new:
+                diff["removed_boards"] += 1
+            elif before != after:
+                diff["changed_boards"] += 1
+            diff["added_links"] += len(after - before)
+            diff["removed_links"] += len(before - after)
+        return diff
+
+    def sync_board_constituent_data(self, max_workers: int = 4, rate_per_sec: float = 3.0,
+                                    checkpoint_every: int = 20) -> Dict[str, int]:
+        """
+        同步东财行业/概念板块与成分股的对应关系
+        (data/concepts/board_stocks_map.json 与 stock_boards_map.json)。
+        1. 线程池并发抓取，所有线程共享一个令牌桶限速；
+        2. 每完成 checkpoint_every 个板块写一次检查点，中断后当日重跑只抓剩余板块；
+        3. 抓取失败 (或返回空) 的板块保留原有成分股，不会被清空；
+        4. 与现有映射做差异比较，有变化时才原子重写映射文件并重建板块索引。
+        """
+        self._ensure_akshare()
+        if ak is None: return {}
+
+        boards = self._em_board_list()
+        if not boards:
+            self.log(logging.ERROR, "无法获取板块列表，跳过成分股同步")
+            return {}
+
+        checkpoint = self._load_board_checkpoint(datetime.date.today().isoformat())
+        done: Dict[str, List[str]] = checkpoint["boards"]
+        todo = [name for name in boards if name not in done]
+        stats = {"boards": len(boards), "resumed": len(boards) - len(todo), "fetched": 0, "failed": 0}
+        self.log(logging.INFO, f"板块成分股同步: 共 {len(boards)} 个板块，待抓取 {len(todo)} 个")
+
+        bucket = TokenBucket(rate_per_sec)
+
+        def fetch(name: str) -> List[str]:
+            bucket.acquire()
+            func = self.get_industry_cons if boards[name] == "industry" else self.get_concept_cons
+            df = func(name)
+            if df is None or df.empty or "代码" not in df.columns:
+                raise ValueError("成分股为空")
+            return sorted(set(df["代码"].astype(str).str.zfill(6)))
+
+        # 结果只在主线程中合并与落盘，工作线程只负责请求
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {pool.submit(fetch, name): name for name in todo}
+        try:
+            for i, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    done[name] = future.result()
+                    stats["fetched"] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    self.log(logging.WARNING, f"抓取板块 {name} 成分股失败: {e}")
+                if i % checkpoint_every == 0:
+                    _write_json_atomic(self.board_crawl_checkpoint_path, checkpoint)
+        except KeyboardInterrupt:
+            # Ctrl+C: 取消排队中的板块 (不等待)，已完成但尚未合并的结果也记入检查点
+            pool.shutdown(wait=False, cancel_futures=True)
+            for future, name in futures.items():
+                if name not in done and future.done() and not future.cancelled() and future.exception() is None:
+                    done[name] = future.result()
+            self.log(logging.WARNING, f"板块成分股同步被中断，已保存 {len(done)} 个板块到检查点")
+            raise
+        finally:
+            _write_json_atomic(self.board_crawl_checkpoint_path, checkpoint)
+        pool.shutdown()
+
+        old: Dict[str, List[str]] = {}
+        if os.path.exists(self.board_map_path):
+            with open(self.board_map_path, "r", encoding="utf-8") as f:
+                old = json.load(f)
+
+        new: Dict[str, List[str]] = {}
+        for name in boards:
+            if name in done:
+                new[name] = done[name]
+            elif name in old:
+                new[name] = old[name]
+
+        diff = self._diff_board_maps(old, new)
+        stats.update(diff)
+        if diff["added_links"] or diff["removed_links"] or diff["added_boards"] or diff["removed_boards"]:
+            stock_map: Dict[str, List[str]] = {}
+            for name, codes in new.items():
+                for code in codes:
+                    stock_map.setdefault(code, []).append(name)
+            _write_json_atomic(os.path.join(os.path.dirname(self.board_map_path), "stock_boards_map.json"), stock_map, indent=2)
+            _write_json_atomic(self.board_map_path, new, indent=2)
+            self.get_board_index()
+
+        # 全部成功才清除检查点，否则下次重跑只补抓失败的板块
+        if stats["failed"] == 0 and os.path.exists(self.board_crawl_checkpoint_path):
+            os.remove(self.board_crawl_checkpoint_path)
+
+        self.log(logging.INFO, f"板块成分股同步完成: {stats}")
+        return stats
+
+
+def _write_json_atomic(path: str, data, indent: Optional[int] = None):
+    """写临时文件后 os.replace，读取方不会看到写了一半的 JSON。"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp, path)
\ No newline at end of file
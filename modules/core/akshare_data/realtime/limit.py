@@ -1,9 +1,8 @@
 import pandas as pd
 import logging
-import datetime
 import os
-import time
-from base import AKShareBase
+from ..base import AKShareBase
+from vibe_core.clock import get_clock
 from vibe_core.data.debug_logger import log_debug, log_error
 
 try:
@@ -17,6 +16,10 @@ class AKShareLimitBoard(AKShareBase):
     逻辑从 LimitBoardAdapter 迁移并复用 AKShareBase。
     """
 
+    # 当天炸板/跌停池的缓存有效期 (秒)，须不小于最慢的轮询间隔 (热力图每 10 秒)，
+    # 否则每次轮询时缓存都已过期；可在模块配置 pool_cache_ttl 覆盖
+    pool_cache_ttl = 15
+
     def get_limit_up_pool(self, date: str = None) -> pd.DataFrame:
         self._ensure_akshare()
         log_debug(f"get_limit_up_pool called. Date={date}, AK_Loaded={ak is not None}")
@@ -26,13 +29,13 @@ class AKShareLimitBoard(AKShareBase):
             return pd.DataFrame()
         
         # 如果未指定日期，默认为当天
-        now = datetime.datetime.now()
+        now = get_clock().now()
         is_today = (date is None) or (date == now.strftime("%Y%m%d"))
         date_str = date if date else now.strftime("%Y%m%d")
         
         # --- Cache Logic (Only for today/realtime) ---
         if is_today:
-            current_ts = time.time()
+            current_ts = get_clock().time()
             if not hasattr(self, '_limit_up_cache'):
                 self._limit_up_cache = None
                 self._limit_up_cache_time = 0
@@ -55,14 +58,14 @@ class AKShareLimitBoard(AKShareBase):
             # --- Update Cache ---
             if is_today and not df.empty:
                 self._limit_up_cache = df
-                self._limit_up_cache_time = time.time()
+                self._limit_up_cache_time = get_clock().time()
             # --------------------
 
             # --- 自动备份逻辑 (Throttled 60s) ---
             # 只要数据不为空就备份，但控制频率
             if not df.empty:
                 try:
-                    current_ts = time.time()
+                    current_ts = get_clock().time()
                     if not hasattr(self, '_limit_up_last_backup_time'):
                          self._limit_up_last_backup_time = 0
                     
@@ -88,11 +91,32 @@ class AKShareLimitBoard(AKShareBase):
             self.log(logging.ERROR, f"Error fetching limit up pool: {e}")
             return pd.DataFrame()
 
+    def _today_pool(self, kind: str, date: str, fetch) -> pd.DataFrame:
+        """
+        当天的炸板/跌停池缓存 pool_cache_ttl 秒，覆盖热力图的一个轮询周期，历史日期不缓存。
+        """
+        now = get_clock().now()
+        date_str = date if date else now.strftime("%Y%m%d")
+        if date_str != now.strftime("%Y%m%d"):
+            return fetch(date_str)
+
+        if not hasattr(self, '_pool_cache'):
+            self._pool_cache = {}
+        cached = self._pool_cache.get(kind)
+        if cached is not None and get_clock().time() - cached[1] < self.pool_cache_ttl:
+            return cached[0]
+
+        df = fetch(date_str)
+        if not df.empty:
+            self._pool_cache[kind] = (df, get_clock().time())
+        return df
+
     def get_broken_limit_pool(self, date: str = None) -> pd.DataFrame:
         self._ensure_akshare()
         if ak is None: return pd.DataFrame()
+        return self._today_pool("broken", date, self._fetch_broken_limit_pool)
 
-        date_str = date if date else datetime.datetime.now().strftime("%Y%m%d")
+    def _fetch_broken_limit_pool(self, date_str: str) -> pd.DataFrame:
         try:
             df = ak.stock_zt_pool_zbgc_em(date=date_str)
             return df if df is not None else pd.DataFrame()
@@ -102,11 +126,11 @@ class AKShareLimitBoard(AKShareBase):
             return pd.DataFrame()
 
     def get_limit_down_pool(self, date: str = None) -> pd.DataFrame:
-
         self._ensure_akshare()
         if ak is None: return pd.DataFrame()
+        return self._today_pool("limit_down", date, self._fetch_limit_down_pool)
 
-        date_str = date if date else datetime.datetime.now().strftime("%Y%m%d")
+    def _fetch_limit_down_pool(self, date_str: str) -> pd.DataFrame:
         try:
             df = ak.stock_dt_pool_em(date=date_str)
             return df if df is not None else pd.DataFrame()
@@ -116,7 +140,7 @@ class AKShareLimitBoard(AKShareBase):
 
     def sync_limit_data(self, date: str = None):
         """同步并保存当天的涨跌停数据。"""
-        date_str = date if date else datetime.datetime.now().strftime("%Y%m%d")
+        date_str = date if date else get_clock().now().strftime("%Y%m%d")
         save_dir = os.path.join("data", "storage", "limit_board", date_str)
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
@@ -1,9 +1,16 @@
 from vibe_core.module import VibeModule, ModuleCategory
 from vibe_core.data.provider import IDataProvider, DataDimension, SyncPolicy
+from vibe_core.data.bar_store import get_bar_store
 import pandas as pd
+import numpy as np
 import os
 import re
-from typing import Optional, Dict
+import logging
+import threading
+from typing import Optional, Dict, Tuple
+
+# 不做数值转换的列 (代码、日期保持字符串，便于与 Tushare 格式直接比较)
+TEXT_COLUMN_PATTERN = re.compile(r"(code|date|symbol|name|代码|名称|日期)", re.IGNORECASE)
 
 class LocalDataModule(VibeModule, IDataProvider):
     """
@@ -28,6 +35,17 @@ class LocalDataModule(VibeModule, IDataProvider):
             "stock_list": "25_股票列表",
         }
 
+        # 按日期存档的日线 CSV 合并后的列式存储 (按股票随机访问)
+        self.bar_store = get_bar_store()
+
+        # Markdown 表格只解析一次: 转为带类型的 DataFrame 后 pickle 缓存到 cache_dir，
+        # 进程内按源文件 mtime 缓存，并为含 ts_code 的表建立 代码 -> 行区间 索引
+        self.cache_dir = os.path.join("data", "storage", "local_tables")
+        self._paths: Dict[str, str] = {}
+        self._tables: Dict[str, Tuple[float, pd.DataFrame]] = {}
+        self._code_index: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._table_lock = threading.Lock()
+
     def initialize(self, context):
         self.context = context
         
@@ -51,13 +69,29 @@ class LocalDataModule(VibeModule, IDataProvider):
     def sync_policy(self) -> SyncPolicy:
         return SyncPolicy.MANUAL
 
+    @property
+    def archive_filename_template(self) -> str:
+        return "{table}.md"
+
+    def on_event(self, event):
+        pass
+
+    def _logger(self) -> logging.Logger:
+        return self.context.logger if self.context else logging.getLogger("vibe.local_data")
+
     def _find_file(self, keyword: str) -> Optional[str]:
+        cached = self._paths.get(keyword)
+        if cached and os.path.exists(cached):
+            return cached
+
         if not os.path.exists(self.root_path):
             return None
             
         for f in os.listdir(self.root_path):
             if keyword in f:
-                return os.path.join(self.root_path, f)
+                path = os.path.join(self.root_path, f)
+                self._paths[keyword] = path
+                return path
         return None
 
     def _read_markdown_table(self, file_path: str) -> pd.DataFrame:
@@ -85,38 +119,117 @@ class LocalDataModule(VibeModule, IDataProvider):
             return pd.DataFrame(data, columns=headers)
             
         except Exception as e:
-            self.context.logger.error(f"Error reading {file_path}: {e}")
+            self._logger().error(f"Error reading {file_path}: {e}")
             return pd.DataFrame()
 
+    @staticmethod
+    def _convert_types(df: pd.DataFrame) -> pd.DataFrame:
+        """Markdown 解析出的字符串列: 能完整转为数值的列转为数值，代码/日期列保持字符串。"""
+        out = df.copy()
+        for col in out.columns:
+            if TEXT_COLUMN_PATTERN.search(str(col)):
+                continue
+            raw = out[col].replace({"": None, "None": None, "nan": None, "NaN": None})
+            values = pd.to_numeric(raw, errors="coerce")
+            if values.notna().sum() == raw.notna().sum():
+                out[col] = values
+        if "ts_code" in out.columns and "trade_date" in out.columns:
+            out = out.sort_values(["ts_code", "trade_date"], kind="stable").reset_index(drop=True)
+        return out
+
+    def _cache_path(self, file_path: str) -> str:
+        return os.path.join(self.cache_dir, os.path.splitext(os.path.basename(file_path))[0] + ".pkl")
+
+    def _load_table(self, file_path: str) -> pd.DataFrame:
+        """
+        读取带类型的表: 进程内缓存 -> pickle 缓存 -> 解析 Markdown (并写入 pickle)。
+        返回的 DataFrame 为共享对象，调用方不得修改。
+        """
+        mtime = os.path.getmtime(file_path)
+        with self._table_lock:
+            cached = self._tables.get(file_path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            cache_path = self._cache_path(file_path)
+            df = None
+            if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= mtime:
+                try:
+                    df = pd.read_pickle(cache_path)
+                except Exception as e:
+                    self._logger().warning(f"Failed to load table cache {cache_path}: {e}")
+
+            if df is None:
+                df = self._convert_types(self._read_markdown_table(file_path))
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    tmp = cache_path + ".tmp"
+                    df.to_pickle(tmp)
+                    os.replace(tmp, cache_path)
+                except Exception as e:
+                    self._logger().warning(f"Failed to write table cache {cache_path}: {e}")
+
+            self._tables[file_path] = (mtime, df)
+            self._code_index[file_path] = self._build_code_index(df)
+            return df
+
+    @staticmethod
+    def _build_code_index(df: pd.DataFrame) -> Dict[str, Tuple[int, int]]:
+        """按 ts_code 排序后的表: 代码 -> [start, end) 行区间。"""
+        if df.empty or "ts_code" not in df.columns or "trade_date" not in df.columns:
+            return {}
+        codes = df["ts_code"].to_numpy()
+        bounds = np.r_[0, np.flatnonzero(codes[1:] != codes[:-1]) + 1, len(codes)]
+        return {codes[s]: (int(s), int(e)) for s, e in zip(bounds[:-1], bounds[1:])}
+
+    def _code_rows(self, table_name: str, code: str) -> Tuple[pd.DataFrame, int, int]:
+        """某只股票在表中的行区间 (表按 ts_code, trade_date 排序)。"""
+        file_path = self._resolve(table_name)
+        if not file_path:
+            return pd.DataFrame(), 0, 0
+        df = self._load_table(file_path)
+        start, end = self._code_index.get(file_path, {}).get(code, (0, 0))
+        return df, start, end
+
     def get_price(self, code: str, date: str) -> Optional[float]:
-        df = self.get_table("daily")
-        if df.empty: return None
-        
-        # Naive implementation
-        try:
-            row = df[(df['ts_code'] == code) & (df['trade_date'] == date)]
-            if not row.empty:
-                return float(row.iloc[0]['close'])
-        except: pass
+        panel = self.bar_store.load()
+        if panel is not None and panel.symbol_index(code) >= 0:
+            return panel.price(code, date)
+
+        df, start, end = self._code_rows("daily", code)
+        if end <= start or "close" not in df.columns:
+            return None
+        dates = df["trade_date"].to_numpy()[start:end]
+        date = str(date).replace("-", "")
+        pos = int(np.searchsorted(dates, date))
+        if pos < len(dates) and dates[pos] == date:
+            try:
+                return float(df["close"].iat[start + pos])
+            except (TypeError, ValueError):
+                return None
         return None
 
     def get_history(self, code: str, start_date: str, end_date: str) -> pd.DataFrame:
-        df = self.get_table("daily")
-        if df.empty: return pd.DataFrame()
-        try:
-            mask = (df['ts_code'] == code) & (df['trade_date'] >= start_date) & (df['trade_date'] <= end_date)
-            return df[mask]
-        except: return pd.DataFrame()
+        panel = self.bar_store.load()
+        if panel is not None and panel.symbol_index(code) >= 0:
+            return panel.history(code, start_date, end_date)
 
-    def get_table(self, table_name: str, date: Optional[str] = None) -> pd.DataFrame:
+        df, start, end = self._code_rows("daily", code)
+        if end <= start:
+            return pd.DataFrame()
+        dates = df["trade_date"].to_numpy()[start:end]
+        lo = int(np.searchsorted(dates, str(start_date).replace("-", ""), side="left"))
+        hi = int(np.searchsorted(dates, str(end_date).replace("-", ""), side="right"))
+        return df.iloc[start + lo:start + hi].copy()
+
+    def _resolve(self, table_name: str) -> Optional[str]:
         keyword = self.file_map.get(table_name, table_name)
-        file_path = self._find_file(keyword)
-        
-        if not file_path:
-            file_path = self._find_file(table_name)
-        
+        return self._find_file(keyword) or self._find_file(table_name)
+
+    def get_table(self, table_name: str, date: Optional[str] = None) -> pd.DataFrame:
+        file_path = self._resolve(table_name)
         if file_path:
-            return self._read_markdown_table(file_path)
+            return self._load_table(file_path).copy()
         else:
             return pd.DataFrame()
     
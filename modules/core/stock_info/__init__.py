@@ -4,40 +4,122 @@ import logging
 import json
 import os
 import sqlite3
+import bisect
 import datetime
+import itertools
+import queue
+import threading
+import time
 import pandas as pd
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Iterable, List
+from vibe_core.data.ratelimit import TokenBucket
+from vibe_core.data.calendar import get_trading_calendar
 
 try:
     import akshare as ak
 except ImportError:
     ak = None
 
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:
+    lazy_pinyin = None
+
+# 批量查询返回的常用字段
+SUMMARY_COLUMNS = ["code", "symbol", "name", "province", "industry", "listed_date", "updated_at"]
+
+# stock_detail 的类型化列 (从雪球 JSON 中提取)，data 列保留完整原始数据
+SCHEMA_VERSION = 1
+TYPED_COLUMNS = {
+    "code": "TEXT",
+    "name": "TEXT",
+    "province": "TEXT",
+    "industry": "TEXT",
+    "industry_code": "TEXT",
+    "listed_date": "TEXT",
+}
+INDEXED_COLUMNS = ("code", "province", "industry", "updated_at")
+
+# 预取队列优先级 (数值越小越先处理)
+PRIORITY_HIGH = 0          # 当前涨停池等正在展示的股票
+PRIORITY_NORMAL = 5
+PRIORITY_BACKGROUND = 9    # 临近过期的刷新、盘后全市场预热
+
 class StockInfoModule(VibeModule, IDataProvider):
     """
     Stock Info Module (SQLite Backend)
     Provides detailed stock information (e.g., sector, province) with caching.
     Replaces StockInfoAdapter.
+
+    读路径: 内存缓存 (symbol -> 详情) -> 常驻 SQLite 连接 -> 网络 (雪球)。
+    get_stock_info_many 对整个股票池只做一次 IN (...) 查询，其余全部命中内存。
+
+    stock_detail 除 JSON 原文外还有省份、行业、上市日期等类型化列和二级索引，
+    横截面查询 (query_stocks / load_summary) 直接走索引，不解析 JSON。
+
+    网络抓取统一走后台预取服务: 去重的优先级队列 + 固定数量的工作线程 + 令牌桶限速，
+    定时把临近过期的记录排队刷新，非交易时段预热全市场。
+
+    数据库路径: 构造参数 db_path > 实例配置 db_path > default_db_path (测试应指向临时库)。
     """
-    
-    def __init__(self, context=None):
+
+    default_db_path = os.path.join("data", "storage", "stock_info.db")
+
+    def __init__(self, context=None, db_path: Optional[str] = None):
         VibeModule.__init__(self)
         self.category = ModuleCategory.DATA
         self.name = "stock_info"
         self.description = "Detailed Stock Info Provider (SQLite Cache)"
         self.logger = logging.getLogger("vibe.data.stock_info")
         
-        self.db_path = "data/storage/stock_info.db"
+        self.db_path = db_path or self.default_db_path
         self.cache_validity_days = 30
         self._code_name_map = None
 
+        # 代码/名称表 (持久化在 stock_code_name，按代码排序的平行列表 + 前缀索引)
+        self._codes: List[str] = []
+        self._names: List[str] = []
+        self._code_index: List[tuple] = []      # (code, i) 排序
+        self._name_index: List[tuple] = []      # (name, i) 排序
+        self._initials_index: List[tuple] = []  # (拼音首字母, i) 排序
+        self._code_names_date: Optional[str] = None
+        self._code_map_lock = threading.Lock()
+        self._code_refreshing = False
+
+        # 常驻连接 + 内存缓存
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.RLock()
+        self._cache: Dict[str, Dict] = {}           # symbol -> 详情 (含 _updated_at)
+        self._summary: Dict[str, tuple] = {}        # symbol -> SUMMARY_COLUMNS 行
+        self._misses: Dict[str, float] = {}         # symbol -> 最近一次库中未命中的时间
+        self.miss_ttl = 60
+        self._warmed = False
+
+        # 后台预取
+        self.prefetch_workers = 2
+        self.prefetch_rate = 2.0           # 每秒请求雪球的次数
+        self.refresh_margin_days = 3       # 距过期不足 N 天即排队刷新
+        self.refresh_interval = 600        # 刷新/预热检查间隔 (秒)
+        self.prefetch_stats = {"fetched": 0, "failed": 0}
+        self._prefetch_queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._queued: Dict[str, int] = {}  # code -> 排队中 (或抓取中) 的优先级
+        self._queue_lock = threading.Lock()
+        self._seq = itertools.count()
+        self._workers: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._bucket: Optional[TokenBucket] = None
+
     def initialize(self, context):
         self.context = context
         if context and hasattr(context, 'logger'):
             self.logger = context.logger
+        if self.db_path == self.default_db_path and self.config.get("db_path"):
+            self.db_path = self.config["db_path"]
         
         # Initialize DB
         self._init_db()
+        self.warm_cache()
+        self._ensure_code_map()
         
         # Register provider
         if self.context.data and hasattr(self.context.data, 'register_provider'):
@@ -48,24 +130,133 @@ class StockInfoModule(VibeModule, IDataProvider):
 
     def configure(self):
         self.context.logger.info(f"{self.name} initialized.")
+        self.context.register_cron(self, f"interval:{self.refresh_interval}")
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """常驻连接 (跨线程共享，由 _db_lock 串行化访问)。"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL: 读写互不阻塞，批量写入只需一次 fsync
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def close(self):
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     def _init_db(self):
         """Initialize database schema"""
         try:
-            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-            with sqlite3.connect(self.db_path) as conn:
-                c = conn.cursor()
-                c.execute('''
+            with self._db_lock:
+                conn = self._get_conn()
+                columns = "".join(f",\n                        {name} {kind}" for name, kind in TYPED_COLUMNS.items())
+                conn.execute(f'''
                     CREATE TABLE IF NOT EXISTS stock_detail (
                         symbol TEXT PRIMARY KEY,
                         updated_at TEXT,
-                        data TEXT
+                        data TEXT{columns}
+                    )
+                ''')
+                self._migrate(conn)
+                for column in INDEXED_COLUMNS:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_stock_detail_{column} ON stock_detail ({column})")
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS stock_code_name (
+                        code TEXT PRIMARY KEY,
+                        name TEXT,
+                        initials TEXT,
+                        updated_at TEXT
                     )
                 ''')
                 conn.commit()
         except Exception as e:
             self.logger.error(f"Failed to init DB: {e}")
 
+    def _migrate(self, conn: sqlite3.Connection):
+        """旧库 (只有 symbol/updated_at/data) 补齐类型化列，并从 JSON 回填。"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(stock_detail)")}
+        for name, kind in TYPED_COLUMNS.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE stock_detail ADD COLUMN {name} {kind}")
+
+        updates = []
+        for symbol, data_json in conn.execute("SELECT symbol, data FROM stock_detail").fetchall():
+            try:
+                data = json.loads(data_json)
+            except (TypeError, ValueError):
+                continue
+            fields = self._extract_fields(symbol, data)
+            updates.append(tuple(fields[name] for name in TYPED_COLUMNS) + (symbol,))
+
+        assignments = ", ".join(f"{name}=?" for name in TYPED_COLUMNS)
+        conn.executemany(f"UPDATE stock_detail SET {assignments} WHERE symbol=?", updates)
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self.logger.info(f"stock_detail migrated to schema v{SCHEMA_VERSION} ({len(updates)} rows backfilled)")
+
+    @staticmethod
+    def _extract_fields(symbol: str, data: Dict) -> Dict[str, Any]:
+        """从雪球详情中提取类型化列。"""
+        industry = data.get("affiliate_industry")
+        industry_name, industry_code = (industry.get("ind_name"), industry.get("ind_code")) \
+            if isinstance(industry, dict) else (industry, None)
+        listed = data.get("listed_date")
+        if isinstance(listed, (int, float)) and listed > 0:
+            # 雪球返回毫秒时间戳 (北京时间零点)
+            listed = (datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=listed, hours=8)).strftime("%Y-%m-%d")
+        elif not isinstance(listed, str):
+            listed = None
+        return {
+            "code": symbol[2:],
+            "name": data.get("org_short_name_cn"),
+            "province": data.get("provincial_name"),
+            "industry": industry_name,
+            "industry_code": industry_code,
+            "listed_date": listed,
+        }
+
+    def _remember_summary(self, symbol: str, updated_at: Optional[str], fields: Dict[str, Any]):
+        self._misses.pop(symbol, None)
+        self._summary[symbol] = (
+            fields["code"], symbol, fields["name"], fields["province"],
+            fields["industry"], fields["listed_date"], updated_at,
+        )
+
+    def _is_fresh(self, data: Optional[Dict]) -> bool:
+        updated_at = data.get("_updated_at") if data else None
+        if not updated_at:
+            return False
+        try:
+            last_date = datetime.datetime.strptime(updated_at, "%Y-%m-%d").date()
+        except ValueError:
+            return False
+        return (datetime.date.today() - last_date).days < self.cache_validity_days
+
+    _SUMMARY_SELECT = "SELECT symbol, updated_at, code, name, province, industry, listed_date FROM stock_detail"
+
+    def _load_summary_rows(self, rows):
+        for symbol, updated_at, code, name, province, industry, listed_date in rows:
+            self._misses.pop(symbol, None)
+            self._summary[symbol] = (code or symbol[2:], symbol, name, province, industry, listed_date, updated_at)
+
+    def warm_cache(self):
+        """一次性把整张表的常用字段载入内存 (只读类型化列，不解析 JSON)。"""
+        try:
+            with self._db_lock:
+                rows = self._get_conn().execute(self._SUMMARY_SELECT).fetchall()
+                self._load_summary_rows(rows)
+                self._warmed = True
+            self.logger.info(f"Stock info cache warmed: {len(self._summary)} symbols")
+        except Exception as e:
+            self.logger.error(f"Failed to warm stock info cache: {e}")
+
     @property
     def data_dimension(self) -> DataDimension:
         return DataDimension.INFO
@@ -78,19 +269,145 @@ class StockInfoModule(VibeModule, IDataProvider):
     def archive_filename_template(self) -> str:
         return "info.db"
 
+    # --- 代码/名称表 ---
+
     def _ensure_code_map(self):
-        if self._code_name_map is None:
-            try:
-                if ak:
-                    df = ak.stock_info_a_code_name()
-                    self._code_name_map = dict(zip(df['name'], df['code']))
-                    for code in df['code']:
-                        self._code_name_map[str(code)] = str(code)
-                else:
+        """
+        加载代码/名称表: 优先读本地 stock_code_name，不访问网络；
+        本地为空时同步拉取一次，本地不是今天更新的则后台刷新。
+        """
+        if self._code_name_map is not None:
+            return
+        with self._code_map_lock:
+            if self._code_name_map is not None:
+                return
+            self.load_code_names()
+            if not self._codes:
+                self.refresh_code_names()
+                if self._code_name_map is None:
                     self._code_name_map = {}
-            except Exception as e:
-                self.logger.warning(f"Failed to load stock code map: {e}. Will rely on direct code usage.")
-                self._code_name_map = {}
+        if self._code_names_date != datetime.date.today().isoformat():
+            self._refresh_code_names_async()
+
+    def load_code_names(self) -> int:
+        """从本地表加载代码/名称并建立搜索索引。"""
+        try:
+            with self._db_lock:
+                rows = self._get_conn().execute(
+                    "SELECT code, name, initials, updated_at FROM stock_code_name ORDER BY code").fetchall()
+        except Exception as e:
+            self.logger.error(f"Failed to load stock code names: {e}")
+            return 0
+        if rows:
+            self._build_code_index([(c, n, i) for c, n, i, _ in rows])
+            self._code_names_date = max(r[3] or "" for r in rows)
+        return len(rows)
+
+    def _build_code_index(self, rows: List[tuple]):
+        rows = sorted(rows)
+        codes = [r[0] for r in rows]
+        names = [r[1] or "" for r in rows]
+        code_map = dict(zip(names, codes))
+        code_map.update((c, c) for c in codes)
+
+        self._codes, self._names = codes, names
+        self._code_index = [(c, i) for i, c in enumerate(codes)]
+        self._name_index = sorted((name, i) for i, name in enumerate(names))
+        self._initials_index = sorted((r[2], i) for i, r in enumerate(rows) if r[2])
+        self._code_name_map = code_map
+
+    @staticmethod
+    def _initials(name: str) -> str:
+        """拼音首字母 (贵州茅台 -> gzmt)；未安装 pypinyin 时为空。"""
+        if lazy_pinyin is None or not name:
+            return ""
+        return "".join(lazy_pinyin(name, style=Style.FIRST_LETTER)).lower().replace(" ", "")
+
+    def refresh_code_names(self) -> int:
+        """从网络拉取全部 A 股代码/名称，整表替换并重建索引。"""
+        if ak is None:
+            return 0
+        try:
+            df = ak.stock_info_a_code_name()
+        except Exception as e:
+            self.logger.warning(f"Failed to load stock code map: {e}. Will rely on local/direct code usage.")
+            return 0
+        if df is None or df.empty:
+            return 0
+        return self.save_code_names(zip(df['code'].astype(str), df['name'].astype(str)))
+
+    def save_code_names(self, pairs: Iterable[tuple], updated_at: Optional[str] = None) -> int:
+        """整表替换代码/名称 (单个事务) 并重建内存索引。"""
+        updated_at = updated_at or datetime.date.today().isoformat()
+        rows = [(str(code).zfill(6), name, self._initials(name)) for code, name in pairs]
+        try:
+            with self._db_lock:
+                conn = self._get_conn()
+                with conn:
+                    conn.execute("DELETE FROM stock_code_name")
+                    conn.executemany("INSERT OR REPLACE INTO stock_code_name VALUES (?, ?, ?, ?)",
+                                     [r + (updated_at,) for r in rows])
+        except Exception as e:
+            self.logger.error(f"DB Write Error: {e}")
+            return 0
+        self._build_code_index(rows)
+        self._code_names_date = updated_at
+        self.logger.info(f"Stock code names refreshed: {len(rows)} symbols")
+        return len(rows)
+
+    def _refresh_code_names_async(self):
+        if ak is None or self._code_refreshing:
+            return
+        self._code_refreshing = True
+
+        def run():
+            try:
+                self.refresh_code_names()
+            finally:
+                self._code_refreshing = False
+        threading.Thread(target=run, name="stock-code-names", daemon=True).start()
+
+    def get_stock_name(self, code: str) -> Optional[str]:
+        self._ensure_code_map()
+        code = str(code).zfill(6) if str(code).isdigit() else str(code)
+        i = bisect.bisect_left(self._codes, code)
+        if i < len(self._codes) and self._codes[i] == code:
+            return self._names[i]
+        return None
+
+    def search_stocks(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """
+        代码/名称/拼音首字母前缀搜索 (用于前端自动补全)。
+        数字按代码前缀，字母按拼音首字母前缀，其余按名称前缀，结果不足时补充名称包含匹配。
+        """
+        self._ensure_code_map()
+        q = str(query).strip()
+        if not q or limit <= 0:
+            return []
+
+        hits: List[int] = []
+
+        def prefix(index: List[tuple], key: str):
+            # (key,) 排在所有以 key 开头的 (k, i) 之前
+            pos = bisect.bisect_left(index, (key,))
+            while pos < len(index) and len(hits) < limit and index[pos][0].startswith(key):
+                if index[pos][1] not in hits:
+                    hits.append(index[pos][1])
+                pos += 1
+
+        if q.isdigit():
+            prefix(self._code_index, q)
+        elif q.isascii():
+            prefix(self._initials_index, q.lower())
+        else:
+            prefix(self._name_index, q)
+            if len(hits) < limit:
+                for i, name in enumerate(self._names):
+                    if q in name and i not in hits:
+                        hits.append(i)
+                        if len(hits) >= limit:
+                            break
+        return [{"code": self._codes[i], "name": self._names[i]} for i in hits]
 
     def _format_symbol_for_xq(self, code: str) -> str:
         code = str(code)
@@ -119,27 +436,22 @@ class StockInfoModule(VibeModule, IDataProvider):
         
         # Check cache
         cached_data = self._get_from_db(xq_symbol)
-        
-        if cached_data:
-            updated_at = cached_data.get("_updated_at")
-            if updated_at:
-                try:
-                    last_date = datetime.datetime.strptime(updated_at, "%Y-%m-%d").date()
-                    days_diff = (datetime.date.today() - last_date).days
-                    if days_diff < self.cache_validity_days:
-                        return cached_data
-                except ValueError:
-                    pass 
+        if self._is_fresh(cached_data):
+            return cached_data
         
         if only_cache:
             return {}
 
-        # Fetch from network
+        return self._fetch_remote(code)
+
+    def _fetch_remote(self, code: str) -> Dict[str, Any]:
+        """从雪球抓取并写库。"""
         if ak is None:
             self.logger.error("AkShare not installed.")
             return {}
 
-        self.logger.info(f"Fetching info for {query} ({xq_symbol}) from network...")
+        xq_symbol = self._format_symbol_for_xq(code)
+        self.logger.debug(f"Fetching info for {code} ({xq_symbol}) from network...")
         try:
             df = ak.stock_individual_basic_info_xq(symbol=xq_symbol)
             if df is None or df.empty:
@@ -157,40 +469,261 @@ class StockInfoModule(VibeModule, IDataProvider):
             self.logger.error(f"Error fetching info for {xq_symbol}: {e}")
             return {}
 
-    def _get_from_db(self, symbol: str) -> Optional[Dict]:
+    def get_stock_info_many(self, codes: Iterable[str], only_cache: bool = True) -> pd.DataFrame:
+        """
+        批量获取常用字段 (省份、行业、上市日期等)。
+        内存未命中的代码合并为一次 IN (...) 查询；库中也没有的代码在 miss_ttl 秒内不再查库。
+        :param only_cache: False 时对缺失/过期的代码逐个走网络 (慢，适合后台线程)
+        :return: DataFrame[SUMMARY_COLUMNS]，按输入顺序，缺失/过期的行除 code 外为空
+        """
+        codes = [str(c).zfill(6) if str(c).isdigit() else str(c) for c in codes]
+        symbols = [self._format_symbol_for_xq(c) for c in codes]
+
+        if not self._warmed:
+            self.warm_cache()
+
+        now = time.time()
+        unknown = [s for s in set(symbols)
+                   if s not in self._summary and now - self._misses.get(s, 0) > self.miss_ttl]
+        if unknown:
+            self._query_db(unknown)
+            for s in unknown:
+                if s not in self._summary:
+                    self._misses[s] = now
+
+        # updated_at 为 YYYY-MM-DD，直接按字符串与过期日比较
+        expired = (datetime.date.today() - datetime.timedelta(days=self.cache_validity_days)).isoformat()
+
+        if not only_cache:
+            for code, symbol in zip(codes, symbols):
+                row = self._summary.get(symbol)
+                if row is None or not row[-1] or row[-1] <= expired:
+                    self.get_stock_info(code)
+
+        empty = (None,) * (len(SUMMARY_COLUMNS) - 2)
+        rows = []
+        for code, symbol in zip(codes, symbols):
+            row = self._summary.get(symbol)
+            if row is None or not row[-1] or row[-1] <= expired:
+                row = (code, symbol) + empty
+            rows.append(row)
+        return pd.DataFrame.from_records(rows, columns=SUMMARY_COLUMNS)
+
+    def _query_db(self, symbols: List[str]):
+        """一次查询多只股票的常用字段 (按 SQLite 变量上限分批)。"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                c = conn.cursor()
-                c.execute("SELECT data, updated_at FROM stock_detail WHERE symbol=?", (symbol,))
-                row = c.fetchone()
-                if row:
-                    data_json, updated_at = row
-                    data = json.loads(data_json)
-                    data["_updated_at"] = updated_at
-                    return data
+            with self._db_lock:
+                conn = self._get_conn()
+                for i in range(0, len(symbols), 500):
+                    chunk = symbols[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(f"{self._SUMMARY_SELECT} WHERE symbol IN ({placeholders})", chunk).fetchall()
+                    self._load_summary_rows(rows)
         except Exception as e:
             self.logger.error(f"DB Read Error: {e}")
-        return None
+
+    def _get_from_db(self, symbol: str) -> Optional[Dict]:
+        if symbol not in self._cache:
+            try:
+                with self._db_lock:
+                    row = self._get_conn().execute(
+                        "SELECT data, updated_at FROM stock_detail WHERE symbol=?", (symbol,)).fetchone()
+                if row:
+                    data = json.loads(row[0])
+                    data["_updated_at"] = row[1]
+                    self._cache[symbol] = data
+            except Exception as e:
+                self.logger.error(f"DB Read Error: {e}")
+        data = self._cache.get(symbol)
+        return dict(data) if data else None
 
     def _save_to_db(self, symbol: str, updated_at: str, data: Dict):
+        self.save_many({symbol: data}, updated_at)
+
+    def save_many(self, records: Dict[str, Dict], updated_at: Optional[str] = None):
+        """
+        批量写入 (单个事务 + executemany UPSERT)。
+        :param records: {雪球代码 (如 SH600519): 详情}
+        """
+        if not records:
+            return
+        updated_at = updated_at or datetime.date.today().strftime("%Y-%m-%d")
+        names = ["symbol", "updated_at", "data"] + list(TYPED_COLUMNS)
+        assignments = ", ".join(f"{name}=excluded.{name}" for name in names[1:])
+        sql = (f"INSERT INTO stock_detail ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+               f"ON CONFLICT(symbol) DO UPDATE SET {assignments}")
+
+        rows, extracted = [], {}
+        for symbol, data in records.items():
+            data = {k: v for k, v in data.items() if k != "_updated_at"}
+            fields = self._extract_fields(symbol, data)
+            extracted[symbol] = (data, fields)
+            rows.append((symbol, updated_at, json.dumps(data, ensure_ascii=False))
+                        + tuple(fields[name] for name in TYPED_COLUMNS))
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                c = conn.cursor()
-                data_json = json.dumps(data, ensure_ascii=False)
-                c.execute('''
-                    INSERT OR REPLACE INTO stock_detail (symbol, updated_at, data)
-                    VALUES (?, ?, ?)
-                ''', (symbol, updated_at, data_json))
-                conn.commit()
+            with self._db_lock:
+                conn = self._get_conn()
+                with conn:
+                    conn.executemany(sql, rows)
+                for symbol, (data, fields) in extracted.items():
+                    self._cache[symbol] = dict(data, _updated_at=updated_at)
+                    self._remember_summary(symbol, updated_at, fields)
         except Exception as e:
             self.logger.error(f"DB Write Error: {e}")
 
+    # --- 横截面查询 (类型化列 + 索引) ---
+
+    def load_summary(self) -> pd.DataFrame:
+        """全部股票的常用字段 (一次 SQL 读入 DataFrame，不解析 JSON)。"""
+        try:
+            with self._db_lock:
+                return pd.read_sql_query(
+                    "SELECT code, symbol, name, province, industry, listed_date, updated_at FROM stock_detail ORDER BY symbol",
+                    self._get_conn())
+        except Exception as e:
+            self.logger.error(f"DB Read Error: {e}")
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    def query_stocks(self, province: Optional[str] = None, industry: Optional[str] = None,
+                     missing: Optional[str] = None) -> pd.DataFrame:
+        """
+        按省份/行业筛选，或找出某字段缺失的股票 (走二级索引)。
+        例: query_stocks(province="浙江省")、query_stocks(missing="province")
+        """
+        clauses, params = [], []
+        if province is not None:
+            clauses.append("province = ?")
+            params.append(province)
+        if industry is not None:
+            clauses.append("industry = ?")
+            params.append(industry)
+        if missing is not None:
+            if missing not in TYPED_COLUMNS:
+                raise ValueError(f"Unknown column: {missing}")
+            clauses.append(f"({missing} IS NULL OR {missing} = '')")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        try:
+            with self._db_lock:
+                return pd.read_sql_query(
+                    f"SELECT code, symbol, name, province, industry, listed_date, updated_at FROM stock_detail{where} ORDER BY symbol",
+                    self._get_conn(), params=params)
+        except Exception as e:
+            self.logger.error(f"DB Read Error: {e}")
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
     # --- IDataProvider Stubs ---
     def get_price(self, code: str, date: str = None) -> float: return None 
     def get_history(self, code: str, start_date: str, end_date: str) -> pd.DataFrame: return pd.DataFrame()
     def get_table(self, table_name: str, date: str = None) -> pd.DataFrame: return pd.DataFrame()
     def get_snapshot(self, codes: list) -> list: return []
 
+    # --- 后台预取 ---
+
+    def _expired_before(self, margin_days: int = 0) -> str:
+        """updated_at 小于等于该日期 (YYYY-MM-DD) 的记录视为需要刷新。"""
+        return (datetime.date.today() - datetime.timedelta(days=self.cache_validity_days - margin_days)).isoformat()
+
+    def prefetch_stock_info(self, codes: Iterable[str], priority: int = PRIORITY_NORMAL, force: bool = False) -> int:
+        """
+        把股票加入后台抓取队列 (立即返回)。
+        已在队列中的代码不会重复入队，但更高的优先级会把它提前。
+        :param force: 即使本地数据未过期也重新抓取 (用于临近过期的刷新)
+        :return: 新入队的数量
+        """
+        if not self._warmed:
+            self.warm_cache()
+        expired = self._expired_before()
+        added = 0
+        with self._queue_lock:
+            for code in codes:
+                code = str(code).zfill(6) if str(code).isdigit() else str(code)
+                if not force:
+                    row = self._summary.get(self._format_symbol_for_xq(code))
+                    if row is not None and row[-1] and row[-1] > expired:
+                        continue
+                current = self._queued.get(code)
+                if current is not None and current <= priority:
+                    continue
+                self._queued[code] = priority
+                self._prefetch_queue.put((priority, next(self._seq), code))
+                added += 1
+        if added:
+            self.start_prefetch()
+        return added
+
+    def prefetch_pending(self) -> int:
+        with self._queue_lock:
+            return len(self._queued)
+
+    def start_prefetch(self):
+        """启动工作线程 (幂等)。"""
+        with self._queue_lock:
+            self._workers = [t for t in self._workers if t.is_alive()]
+            if self._workers:
+                return
+            self._stop_event.clear()
+            self._bucket = TokenBucket(self.prefetch_rate)
+            for i in range(self.prefetch_workers):
+                t = threading.Thread(target=self._prefetch_loop, name=f"stock-info-prefetch-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
+
+    def stop_prefetch(self, timeout: float = 2.0):
+        self._stop_event.set()
+        for t in self._workers:
+            t.join(timeout)
+        self._workers = []
+
+    def _prefetch_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                priority, _, code = self._prefetch_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._queue_lock:
+                # 已被更高优先级的条目取代，或已处理
+                if self._queued.get(code) != priority:
+                    continue
+            try:
+                self._bucket.acquire()
+                if self._stop_event.is_set():
+                    break
+                data = self._fetch_remote(code)
+                self.prefetch_stats["fetched" if data else "failed"] += 1
+            except Exception as e:
+                self.prefetch_stats["failed"] += 1
+                self.logger.error(f"Prefetch {code} failed: {e}")
+            finally:
+                with self._queue_lock:
+                    if self._queued.get(code) == priority:
+                        del self._queued[code]
+
+    def schedule_refresh(self) -> int:
+        """把临近过期的记录以后台优先级排队刷新。"""
+        due = self._expired_before(self.refresh_margin_days)
+        codes = [row[0] for row in list(self._summary.values()) if not row[-1] or row[-1] <= due]
+        return self.prefetch_stock_info(codes, PRIORITY_BACKGROUND, force=True)
+
+    def warm_universe(self) -> int:
+        """全市场预热: 本地缺失或过期的 A 股全部排队 (后台优先级)。"""
+        self._ensure_code_map()
+        return self.prefetch_stock_info(list(self._codes), PRIORITY_BACKGROUND)
+
+    @staticmethod
+    def is_market_hours(now: Optional[datetime.datetime] = None) -> bool:
+        now = now or datetime.datetime.now()
+        return datetime.time(9, 0) <= now.time() <= datetime.time(15, 30) and get_trading_calendar().is_trading_day(now)
+
     def on_event(self, event):
-        """No-op for data provider."""
-        pass
+        if event.type == "TIMER":
+            if self._code_names_date != datetime.date.today().isoformat():
+                self._refresh_code_names_async()
+            added = self.schedule_refresh()
+            if not self.is_market_hours():
+                added += self.warm_universe()
+            if added:
+                self.logger.info(f"Stock info prefetch queued {added} symbols (pending {self.prefetch_pending()}, stats {self.prefetch_stats})")
+
+    def on_stop(self):
+        self.stop_prefetch()
+        self.close()
@@ -1,19 +1,33 @@
 from vibe_core.module import VibeModule, ModuleCategory
 from vibe_core.data.provider import BaseFetcher, FetcherType, DataCategory, DataDimension
+from vibe_core.data.backfill import DailyBackfill
+from vibe_core.data.bar_store import get_bar_store
 import pandas as pd
 import datetime
 import logging
+import os
 
 try:
     import tushare as ts
 except ImportError:
     ts = None
 
+try:
+    from vibe_core.server.websocket_manager import manager as ws_manager
+except ImportError:
+    ws_manager = None
+
 class TushareDataModule(VibeModule, BaseFetcher):
     """
     Tushare Data Module
     Consolidates TushareAdapter and TushareInfoAdapter functionality.
     """
+
+    # pro.daily 每分钟调用预算 (可在 config.data.tushare_calls_per_minute 覆盖)
+    calls_per_minute = 200
+    sync_workers = 4
+    sync_widget_id = "tushare_sync"
+    legacy_daily_dir = os.path.join("data", "daily")
     
     def __init__(self, context=None):
         VibeModule.__init__(self)
@@ -46,20 +60,24 @@ class TushareDataModule(VibeModule, BaseFetcher):
     def configure(self):
         self.context.logger.info(f"{self.name} initialized.")
 
+    def on_event(self, event):
+        # 纯数据提供者，同步进度由 sync_daily 主动推送
+        pass
+
     def _init_tushare(self):
         if ts is None:
-            self.context.logger.error("Tushare module not found. Please install tushare.")
+            self._logger().error("Tushare module not found. Please install tushare.")
             return
 
         if self.token and self.token != "YOUR_TUSHARE_TOKEN":
             try:
                 self.pro = ts.pro_api(self.token)
-                self.context.logger.info("Tushare Pro API initialized.")
+                self._logger().info("Tushare Pro API initialized.")
             except Exception as e:
-                self.context.logger.error(f"Failed to init Tushare Pro: {e}")
+                self._logger().error(f"Failed to init Tushare Pro: {e}")
                 self.pro = None
         else:
-            self.context.logger.warning("Tushare token not configured.")
+            self._logger().warning("Tushare token not configured.")
             self.pro = None
 
     @property
@@ -134,45 +152,69 @@ class TushareDataModule(VibeModule, BaseFetcher):
             self.context.logger.error(f"Failed to fetch income data: {e}")
             return pd.DataFrame()
 
-    def sync_daily_data(self, start_date: str = None, end_date: str = None):
+    def _logger(self) -> logging.Logger:
+        # 手动同步时 (DataFactory 直接实例化) 模块没有 context
+        return self.context.logger if self.context else logging.getLogger("vibe.tushare")
+
+    def daily_path(self, trade_date: str) -> str:
+        return self.get_save_path(DataCategory.STOCK, f"daily_{trade_date}.csv")
+
+    def has_daily(self, trade_date: str) -> bool:
+        """该交易日是否已落盘 (兼容旧版 data/daily 目录)。"""
+        return os.path.exists(self.daily_path(trade_date)) or \
+            os.path.exists(os.path.join(self.legacy_daily_dir, f"daily_{trade_date}.csv"))
+
+    def _report_sync_progress(self, stats: dict):
+        payload = dict(stats, source="tushare")
+        if self.context:
+            self.context.broadcast_ui(self.sync_widget_id, payload)
+        elif ws_manager:
+            ws_manager.broadcast_sync({"type": "update", "widget_id": self.sync_widget_id, "data": payload})
+
+    def sync_daily_data(self, start_date: str = None, end_date: str = None, force: bool = False,
+                        max_workers: int = None, calls_per_minute: float = None) -> dict:
+        """
+        按交易日补齐日线 (pro.daily)。
+        非交易日与本地已有的日期直接跳过；并发、限速、重试与原子写入见 DailyBackfill。
+        进度通过 tushare_sync 组件推送到看板。
+        """
+        logger = self._logger()
         if not self.pro:
-            self.context.logger.error("Cannot sync: Tushare token invalid.")
-            return
+            logger.error("Cannot sync: Tushare token invalid.")
+            return {}
 
-        dates_to_sync = []
-        if start_date and end_date:
-            try:
-                dt_range = pd.date_range(start=start_date, end=end_date)
-                dates_to_sync = [d.strftime("%Y%m%d") for d in dt_range]
-            except Exception as e:
-                self.context.logger.error(f"Invalid date range: {e}")
-                return
-        elif start_date:
-             dates_to_sync = [start_date]
-        else:
-            dates_to_sync = [datetime.datetime.now().strftime("%Y%m%d")]
+        start = start_date or datetime.datetime.now().strftime("%Y%m%d")
+        end = end_date or start
+        data_config = self.context.config.get("data", {}) if self.context and self.context.config else {}
+        backfill = DailyBackfill(
+            fetch=lambda day: self.pro.daily(trade_date=day),
+            path_for=self.daily_path,
+            exists=self.has_daily,
+            calls_per_minute=calls_per_minute or data_config.get("tushare_calls_per_minute", self.calls_per_minute),
+            max_workers=max_workers or data_config.get("tushare_workers", self.sync_workers),
+            on_progress=self._report_sync_progress,
+            logger=logger,
+        )
+        try:
+            stats = backfill.run(start, end, force=force)
+        except Exception as e:
+            logger.error(f"Tushare sync {start}~{end} failed: {e}")
+            return {}
+        if stats.get("fetched"):
+            # 新日期并入共享的列式日线存储 (LocalDataModule 等查询方使用同一实例)
+            get_bar_store().build()
+        return stats
 
-        self.context.logger.info(f"Starting Tushare sync for {len(dates_to_sync)} days...")
-        
-        for date_str in dates_to_sync:
-            try:
-                self.context.logger.info(f"Fetching Tushare daily for {date_str}...")
-                df = self.pro.daily(trade_date=date_str)
-                
-                if df.empty:
-                    self.context.logger.warning(f"No data found for {date_str}. Market might be closed.")
-                else:
-                    fname = f"daily_{date_str}.csv"
-                    # We access BaseFetcher.get_save_path but need to ensure 'stock' category logic
-                    # BaseFetcher.get_save_path(category, filename)
-                    filename = self.get_save_path(DataCategory.STOCK, fname)
-                    df.to_csv(filename, index=False)
-                    self.context.logger.info(f"Successfully synced {len(df)} records to {filename}")
-            except Exception as e:
-                self.context.logger.error(f"Error during Tushare sync for {date_str}: {e}")
-                continue
-        
-        self.context.logger.info("Tushare sync batch completed.")
+    def get_ui_config(self):
+        return {
+            "id": self.sync_widget_id,
+            "title": "Tushare 日线同步",
+            "component": "tushare-sync-widget",
+            "default_col_span": "col-span-1",
+            "config_default": {},
+            "config_description": "Progress of the Tushare daily-bar backfill (trading days done / skipped / failed).",
+            "script_path": "widget.js"
+        }
 
     # --- Info Adapter Methods ---
 
@@ -0,0 +1,71 @@
+const TushareSyncWidget = {
+    props: ['widgetId'],
+    template: `
+    <div class="card h-100">
+        <div class="card-header d-flex justify-content-between align-items-center">
+            <span>Tushare 日线同步</span>
+            <span class="badge" :class="statusClass">{{ status }}</span>
+        </div>
+        <div class="card-body small">
+            <p class="mb-1"><strong>区间:</strong> {{ range || '-' }}</p>
+            <div class="progress mb-2" style="height: 8px;">
+                <div class="progress-bar" :style="{ width: percent + '%' }"></div>
+            </div>
+            <p class="mb-1">{{ done }} / {{ total }} 个交易日 (已存在跳过 {{ skipped }})</p>
+            <p class="mb-1">成功 {{ fetched }}，无数据 {{ empty }}，失败 {{ failed }}，共 {{ rows }} 行</p>
+            <p v-if="current" class="mb-1 text-muted">最近完成: {{ current }}</p>
+            <div v-if="failedDays.length" class="alert alert-danger mt-2 p-1">
+                失败日期: {{ failedDays.join(', ') }}
+            </div>
+        </div>
+    </div>
+    `,
+    data() {
+        return {
+            status: 'Idle',
+            range: '',
+            total: 0,
+            done: 0,
+            skipped: 0,
+            fetched: 0,
+            empty: 0,
+            failed: 0,
+            rows: 0,
+            current: null,
+            failedDays: []
+        }
+    },
+    computed: {
+        percent() {
+            if (!this.total) return this.status === 'completed' ? 100 : 0;
+            return Math.round(this.done * 100 / this.total);
+        },
+        statusClass() {
+            if (this.status === 'running') return 'bg-primary';
+            if (this.status === 'completed') return 'bg-success';
+            if (this.status === 'failed') return 'bg-danger';
+            return 'bg-secondary';
+        }
+    },
+    mounted() {
+        if (window.vibeSocket) {
+            window.vibeSocket.subscribe(this.widgetId, (data) => {
+                this.status = data.status || 'Idle';
+                this.range = data.start === data.end ? data.start : `${data.start} ~ ${data.end}`;
+                this.total = data.total || 0;
+                this.done = data.done || 0;
+                this.skipped = data.skipped || 0;
+                this.fetched = data.fetched || 0;
+                this.empty = data.empty || 0;
+                this.failed = data.failed || 0;
+                this.rows = data.rows || 0;
+                this.current = data.current;
+                this.failedDays = data.failed_days || [];
+            });
+        }
+    }
+};
+
+// 注册组件
+if (!window.VibeComponentRegistry) window.VibeComponentRegistry = {};
+window.VibeComponentRegistry['tushare-sync-widget'] = TushareSyncWidget;
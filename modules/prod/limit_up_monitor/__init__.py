@@ -1,13 +1,10 @@
 from vibe_core.module import VibeModule
 from vibe_core.event import Event
-import datetime
 import traceback
 
 try:
-    import akshare as ak
     import pandas as pd
 except ImportError:
-    ak = None
     pd = None
 
 class LimitUpMonitor(VibeModule):
@@ -25,8 +22,6 @@ class LimitUpMonitor(VibeModule):
     def configure(self):
         self.name = "涨停监控服务"
         self.category = "Service"
-        self._trade_dates_cache = None
-        self._last_cache_date = None
         
         # 注册每 10 秒运行一次 (UI更新更及时，底层已有缓存和IO限流)
         self.context.register_cron(self, "interval:10")
@@ -37,39 +32,14 @@ class LimitUpMonitor(VibeModule):
             self.check_and_run()
 
     def is_trading_day(self, current_date):
-        """检查指定日期是否为交易日"""
-        if current_date.weekday() >= 5: 
-            return False, "Weekend"
-
-        if ak is None:
-            return True, "AKShare Missing"
-
-        date_str = current_date.strftime("%Y-%m-%d")
-        
-        if self._trade_dates_cache is not None and self._last_cache_date == date_str:
-            pass 
-        else:
-            try:
-                self.context.logger.info(f"[{self.name}] Syncing trade calendar...")
-                df = ak.tool_trade_date_hist_sina()
-                if df is not None and not df.empty:
-                    dates = pd.to_datetime(df['trade_date'])
-                    trade_dates = set(d.strftime("%Y-%m-%d") for d in dates)
-                    self._trade_dates_cache = trade_dates
-                    self._last_cache_date = date_str
-                else:
-                    return True, "Calendar Empty"
-            except Exception as e:
-                return True, f"Error: {e}"
-
-        if self._trade_dates_cache and date_str in self._trade_dates_cache:
-            return True, "Trading Day"
-        else:
-            return False, "Holiday"
+        """检查指定日期是否为交易日 (本地持久化的共享交易日历，不联网)"""
+        calendar = self.context.calendar
+        if calendar.is_trading_day(current_date):
+            return True, "Trading Day" if calendar.covers(current_date) else "Weekday"
+        return False, "Holiday" if current_date.weekday() < 5 else "Weekend"
 
     def check_and_run(self):
-        now = datetime.datetime.now()
-        if now.weekday() >= 5: return
+        now = self.context.now
 
         # 定义时间窗口
         start_time = now.replace(hour=9, minute=20, second=0, microsecond=0)
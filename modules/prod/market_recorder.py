@@ -1,7 +1,6 @@
 from vibe_core.module import VibeModule
 from vibe_core.event import Event
-import datetime
-import time
+from vibe_core.data.replay import SECTOR_BACKUP_DIR, TimedArchive
 
 class MarketDataRecorder(VibeModule):
     """
@@ -13,6 +12,8 @@ class MarketDataRecorder(VibeModule):
         super().__init__()
         self.description = "Market Data Recorder Module. Fetches snapshot data periodically and saves it to CSV storage."
         self.interval = 60 # Default loop interval (fallback)
+        # 行业板块快照备份 (供回放数据源 get_em_sectors 使用)
+        self.sector_archive = TimedArchive(SECTOR_BACKUP_DIR, "em_sectors")
 
     def configure(self):
         # Default recording interval: 1 minute
@@ -31,13 +32,17 @@ class MarketDataRecorder(VibeModule):
         if self.context.data is None:
             return
 
+        # 回放模式下数据本身来自录制文件，不再重复录制
+        if getattr(self.context, "config", {}).get("system", {}).get("mode") == "replay":
+            return
+
         # Check if we can fetch data
         if hasattr(self.context.data, "get_snapshot"):
             data = self.context.data.get_snapshot(self.watchlist)
             
             if data:
                 count = 0
-                timestamp = datetime.datetime.now().isoformat()
+                timestamp = self.context.now.isoformat()
                 
                 for item in data:
                     # Enrich with timestamp
@@ -50,4 +55,12 @@ class MarketDataRecorder(VibeModule):
                 # Log commented out to reduce noise
                 # self.context.logger.info(f"Recorded {count} market data snapshots.")
         else:
-            self.context.logger.warning("Data provider does not support snapshots, cannot record.")
\ No newline at end of file
+            self.context.logger.warning("Data provider does not support snapshots, cannot record.")
+
+        if self.config.get("record_sectors", True) and hasattr(self.context.data, "get_em_sectors"):
+            try:
+                sectors = self.context.data.get_em_sectors()
+                if sectors is not None and not sectors.empty:
+                    self.sector_archive.write(sectors, self.context.now)
+            except Exception as e:
+                self.context.logger.error(f"Failed to record sectors: {e}")
\ No newline at end of file
@@ -0,0 +1,82 @@
+from vibe_core.module import VibeModule, ModuleCategory
+from vibe_core.event import Event
+from vibe_core.metrics import registry
+from vibe_core.accounting import accounting
+
+
+class SystemMetricsModule(VibeModule):
+    """
+    系统指标面板
+    定期汇总指标注册表 (数据调用延迟、缓存命中、定时任务耗时、WebSocket 发送) 与各模块实例的资源占用推送到仪表盘。
+    完整指标见 /metrics (Prometheus 格式)，模块明细见 /api/modules。
+    """
+
+    widget_id = "system_metrics"
+
+    def __init__(self, context=None):
+        super().__init__()
+        if context:
+            self.context = context
+        self.name = "SystemMetrics"
+        self.category = ModuleCategory.SYSTEM
+        self.interval = 5
+        self.top_n = 10
+
+    def configure(self):
+        self.context.register_cron(self, f"interval:{self.interval}")
+
+    def on_event(self, event: Event):
+        if event.type == "TIMER":
+            self.context.broadcast_ui(self.widget_id, self.summary())
+
+    def summary(self) -> dict:
+        snap = registry.snapshot()
+
+        def series(name):
+            return snap.get(name, {}).get("series", [])
+
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+
+        calls = sorted(series("vibe_data_call_seconds"), key=lambda s: s["sum"], reverse=True)[:self.top_n]
+        data_calls = [{
+            "provider": s["labels"]["provider"], "method": s["labels"]["method"], "count": s["count"],
+            "avg_ms": ms(s["avg"]), "p95_ms": ms(s["p95"]), "total_s": round(s["sum"], 2),
+        } for s in calls]
+
+        cache = {}
+        for s in series("vibe_data_cache_total"):
+            key = f'{s["labels"]["provider"]}.{s["labels"]["method"]}'
+            cache.setdefault(key, {"hit": 0, "miss": 0, "coalesced": 0})[s["labels"]["result"]] = int(s["value"])
+        for stats in cache.values():
+            total = sum(stats.values())
+            stats["hit_ratio"] = round((stats["hit"] + stats["coalesced"]) / total, 3) if total else None
+
+        jobs = sorted(series("vibe_scheduler_job_seconds"), key=lambda s: s["sum"], reverse=True)[:self.top_n]
+        ws = series("vibe_ws_send_seconds")
+        connections = series("vibe_ws_connections")
+        return {
+            "time": self.context.now.strftime("%H:%M:%S"),
+            "data_calls": data_calls,
+            "cache": cache,
+            # 与 /api/modules 的行格式一致，看板首屏直接取接口数据，之后由推送刷新
+            "modules": accounting.report()[:self.top_n],
+            "jobs": [{"tag": s["labels"]["tag"], "count": s["count"], "avg_ms": ms(s["avg"]), "p95_ms": ms(s["p95"])}
+                     for s in jobs],
+            "ws": {
+                "connections": int(connections[0]["value"]) if connections else 0,
+                "sent": ws[0]["count"] if ws else 0,
+                "p95_ms": ms(ws[0]["p95"]) if ws else None,
+            },
+        }
+
+    def get_ui_config(self):
+        return {
+            "id": self.widget_id,
+            "title": "系统指标",
+            "component": "system-metrics-widget",
+            "default_col_span": "col-span-1 md:col-span-2",
+            "config_default": {},
+            "config_description": "Data-call latency, cache hit ratio, scheduler jobs, WebSocket sends and per-module resource usage.",
+            "script_path": "widget.js"
+        }
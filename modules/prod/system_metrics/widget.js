@@ -0,0 +1,107 @@
+const SystemMetricsWidget = {
+    props: ['widgetId'],
+    template: `
+    <div class="card h-100">
+        <div class="card-header d-flex justify-content-between align-items-center">
+            <span>系统指标</span>
+            <span class="text-muted small">{{ time || '等待中...' }}</span>
+        </div>
+        <div class="card-body small overflow-auto">
+            <p class="mb-2">
+                WebSocket: {{ ws.connections }} 连接，已发送 {{ ws.sent }} 条，p95 {{ fmt(ws.p95_ms) }} ms
+                <a class="ms-2" href="/metrics" target="_blank">/metrics</a>
+            </p>
+            <h6>数据调用 (按总耗时)</h6>
+            <table class="table table-sm mb-2">
+                <thead><tr><th>来源</th><th>方法</th><th>次数</th><th>平均 ms</th><th>p95 ms</th><th>命中率</th></tr></thead>
+                <tbody>
+                    <tr v-for="c in dataCalls" :key="c.provider + c.method">
+                        <td>{{ c.provider }}</td>
+                        <td>{{ c.method }}</td>
+                        <td>{{ c.count }}</td>
+                        <td>{{ fmt(c.avg_ms) }}</td>
+                        <td>{{ fmt(c.p95_ms) }}</td>
+                        <td>{{ hitRatio(c) }}</td>
+                    </tr>
+                </tbody>
+            </table>
+            <h6>模块资源 (按 CPU 时间) <a class="small fw-normal" href="/api/modules" target="_blank">/api/modules</a></h6>
+            <table class="table table-sm mb-2">
+                <thead><tr><th>实例</th><th>调用</th><th>CPU s</th><th>平均 ms</th><th>最大 ms</th><th>数据调用</th><th>推送 KB</th><th>状态 KB</th></tr></thead>
+                <tbody>
+                    <tr v-for="m in modules" :key="m.id">
+                        <td>{{ m.id }}</td>
+                        <td>{{ m.calls }}</td>
+                        <td>{{ m.cpu_seconds.toFixed(2) }}</td>
+                        <td>{{ fmt(m.avg_wall_ms) }}</td>
+                        <td>{{ fmt(m.max_wall_ms) }}</td>
+                        <td>{{ m.data_calls }}</td>
+                        <td>{{ kb(m.broadcast_bytes) }}</td>
+                        <td>{{ kb(m.state_bytes) }}</td>
+                    </tr>
+                </tbody>
+            </table>
+            <h6>定时任务</h6>
+            <table class="table table-sm mb-0">
+                <thead><tr><th>模块</th><th>次数</th><th>平均 ms</th><th>p95 ms</th></tr></thead>
+                <tbody>
+                    <tr v-for="j in jobs" :key="j.tag">
+                        <td>{{ j.tag }}</td>
+                        <td>{{ j.count }}</td>
+                        <td>{{ fmt(j.avg_ms) }}</td>
+                        <td>{{ fmt(j.p95_ms) }}</td>
+                    </tr>
+                </tbody>
+            </table>
+        </div>
+    </div>
+    `,
+    data() {
+        return {
+            time: '',
+            dataCalls: [],
+            cache: {},
+            modules: [],
+            topN: 10,
+            jobs: [],
+            ws: { connections: 0, sent: 0, p95_ms: null }
+        }
+    },
+    methods: {
+        fmt(value) {
+            return value === null || value === undefined ? '-' : value;
+        },
+        kb(bytes) {
+            return bytes === null || bytes === undefined ? '-' : (bytes / 1024).toFixed(1);
+        },
+        loadModules() {
+            // 首次推送 (interval 秒) 之前先从接口取模块明细
+            fetch('/api/modules')
+                .then(r => r.json())
+                .then(rows => { if (!this.modules.length) this.modules = rows.slice(0, this.topN); })
+                .catch(e => console.error('[SystemMetrics] /api/modules failed', e));
+        },
+        hitRatio(call) {
+            const stats = this.cache[call.provider + '.' + call.method];
+            if (!stats || stats.hit_ratio === null) return '-';
+            return Math.round(stats.hit_ratio * 100) + '%';
+        }
+    },
+    mounted() {
+        this.loadModules();
+        if (window.vibeSocket) {
+            window.vibeSocket.subscribe(this.widgetId, (data) => {
+                this.time = data.time;
+                this.dataCalls = data.data_calls || [];
+                this.cache = data.cache || {};
+                this.modules = data.modules || [];
+                this.jobs = data.jobs || [];
+                this.ws = data.ws || this.ws;
+            });
+        }
+    }
+};
+
+// 注册组件
+if (!window.VibeComponentRegistry) window.VibeComponentRegistry = {};
+window.VibeComponentRegistry['system-metrics-widget'] = SystemMetricsWidget;
@@ -35,11 +35,18 @@ class TushareSyncModule(VibeModule):
             if self.attempted_sync_date == today_str_params:
                 return
 
-            # Check if data file exists
-            # Note: Path must match TushareAdapter's save path
-            file_path = os.path.join("data", "daily", f"daily_{today_str_params}.csv")
-            
-            if os.path.exists(file_path):
+            # Non-trading days never have daily data
+            if not self.context.calendar.is_trading_day(now):
+                self.attempted_sync_date = today_str_params
+                return
+
+            # Check if data file exists (current storage layout or legacy data/daily)
+            file_paths = [
+                os.path.join("data", "storage", "stock", "post_market", f"daily_{today_str_params}.csv"),
+                os.path.join("data", "daily", f"daily_{today_str_params}.csv"),
+            ]
+
+            if any(os.path.exists(p) for p in file_paths):
                 # Data exists, no need to sync
                 # We can mark it as attempted/done so we don't check file system every minute
                 self.attempted_sync_date = today_str_params
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.data.backfill import DailyBackfill, is_quota_error
+from vibe_core.data.calendar import TradingCalendar
+
+TRADE_DATES = ["2023-12-29", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05", "2024-01-08"]
+
+
+class TestDailyBackfill(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calendar = TradingCalendar(TRADE_DATES, path=os.path.join(self.tmp.name, "cal.txt"))
+        self.calls = []
+        self.lock = threading.Lock()
+        self.progress = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path_for(self, day):
+        return os.path.join(self.tmp.name, f"daily_{day}.csv")
+
+    def make(self, fetch):
+        def tracked(day):
+            with self.lock:
+                self.calls.append(day)
+            return fetch(day)
+        backfill = DailyBackfill(tracked, self.path_for, calls_per_minute=6000, max_workers=3,
+                                 on_progress=self.progress.append, calendar=self.calendar)
+        backfill.sleep = lambda seconds: None
+        return backfill
+
+    def test_skips_holidays_and_stored_days(self):
+        pd.DataFrame({"ts_code": ["old"]}).to_csv(self.path_for("20240103"), index=False)
+        backfill = self.make(lambda day: pd.DataFrame({"ts_code": ["000001.SZ", "600519.SH"], "trade_date": [day, day]}))
+
+        stats = backfill.run("20240101", "20240107")
+
+        self.assertEqual(sorted(self.calls), ["20240102", "20240104", "20240105"])
+        self.assertEqual((stats["total"], stats["skipped"], stats["fetched"], stats["rows"]), (3, 1, 3, 6))
+        self.assertEqual(stats["status"], "completed")
+        self.assertEqual(len(pd.read_csv(self.path_for("20240104"))), 2)
+        self.assertEqual(pd.read_csv(self.path_for("20240103"))["ts_code"].tolist(), ["old"])
+        self.assertFalse(any(f.endswith(".tmp") for f in os.listdir(self.tmp.name)))
+        self.assertEqual(self.progress[0]["done"], 0)
+        self.assertEqual(self.progress[-1]["done"], 3)
+
+    def test_retry_then_fail(self):
+        attempts = {}
+
+        def flaky(day):
+            attempts[day] = attempts.get(day, 0) + 1
+            if day == "20240108":
+                raise RuntimeError("抱歉，您每分钟最多访问该接口200次")
+            if attempts[day] == 1:
+                raise ConnectionError("timeout")
+            return pd.DataFrame({"ts_code": ["000001.SZ"]})
+
+        backfill = self.make(flaky)
+        waits = []
+        backfill.sleep = waits.append
+
+        stats = backfill.run("20240105", "20240108")
+
+        self.assertEqual(attempts["20240105"], 2)
+        self.assertEqual(attempts["20240108"], backfill.max_retries + 1)
+        self.assertEqual(stats["failed_days"], ["20240108"])
+        self.assertEqual(stats["status"], "failed")
+        self.assertIn(backfill.quota_wait, waits)
+        self.assertFalse(os.path.exists(self.path_for("20240108")))
+
+    def test_empty_result_not_written(self):
+        stats = self.make(lambda day: pd.DataFrame()).run("20240102", "20240102")
+        self.assertEqual(stats["empty"], 1)
+        self.assertFalse(os.path.exists(self.path_for("20240102")))
+
+    def test_is_quota_error(self):
+        self.assertTrue(is_quota_error(Exception("抱歉，您每分钟最多访问该接口500次")))
+        self.assertFalse(is_quota_error(Exception("connection reset")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import datetime
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.module import VibeModule
+from vibe_core.backtest.engine import BacktestEngine
+from vibe_core.backtest.feed import BarFeed
+from vibe_core.backtest.portfolio import Portfolio
+from vibe_core.backtest.schedule import CronSpec
+
+
+def minute_frames(codes, days, start_price=10.0):
+    """每个交易日 09:31-11:30、13:01-15:00 共 240 根分钟线。"""
+    minutes = np.r_[np.arange(9 * 60 + 31, 11 * 60 + 31), np.arange(13 * 60 + 1, 15 * 60 + 1)]
+    stamps = np.concatenate([np.datetime64(d, "m") + minutes.astype("timedelta64[m]") for d in days])
+    frames = {}
+    for k, code in enumerate(codes):
+        close = start_price + k + np.arange(len(stamps)) * 0.001
+        frames[code] = pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "vol": 100.0},
+                                    index=pd.DatetimeIndex(stamps))
+    return frames
+
+
+class Strategy(VibeModule):
+    def __init__(self):
+        super().__init__()
+        self.quote_events = 0
+        self.timers = []
+
+    def configure(self):
+        self.context.register_cron(self, "interval:3600")
+        self.context.register_cron(self, "0 16 * * *")
+
+    def on_event(self, event):
+        if event.type == "TIMER":
+            self.timers.append(self.context.now)
+        elif event.type == "QUOTE":
+            self.quote_events += 1
+            if self.quote_events == 1:
+                self.context.order("600519.SH", 250)
+
+
+class TestBacktestEngine(unittest.TestCase):
+    def make_engine(self, module, days, codes=("600519.SH", "000001.SZ")):
+        feed = BarFeed.from_frames(minute_frames(codes, days))
+        return BacktestEngine([module], days[0], days[-1], feed=feed, data=MagicMock())
+
+    def test_batched_quotes_fills_and_timers(self):
+        # 2024-01-05 周五, 01-06/07 周末, 01-08 周一
+        days = ["2024-01-05", "2024-01-06", "2024-01-08"]
+        module = Strategy()
+        result = self.make_engine(module, days).run()
+
+        # 周末的 bar 被跳过，每个时间戳一个 QUOTE 事件
+        self.assertEqual(module.quote_events, 480)
+        self.assertEqual(result.stats["bars"], 480)
+
+        # 第一根 bar 提交的订单在下一根 bar 开盘成交，按整手取 200 股
+        trades = result.trades
+        self.assertEqual(len(trades), 1)
+        self.assertEqual(trades["shares"].iloc[0], 200)
+        self.assertEqual(trades["time"].iloc[0], datetime.datetime(2024, 1, 5, 9, 32))
+
+        # cron 16:00 只在交易日触发; interval 在行情时间点触发
+        crons = [t for t in module.timers if t.hour == 16]
+        self.assertEqual(crons, [datetime.datetime(2024, 1, 5, 16), datetime.datetime(2024, 1, 8, 16)])
+        intervals = [t for t in module.timers if t.hour != 16]
+        self.assertEqual(intervals[0], datetime.datetime(2024, 1, 5, 9, 31))
+        # 09:31 10:31 13:01 14:01 (午休空档不补跑)
+        self.assertEqual(intervals[:4], [datetime.datetime(2024, 1, 5, h, m) for h, m in ((9, 31), (10, 31), (13, 1), (14, 1))])
+        self.assertEqual(len(intervals), 2 * 4)
+
+        equity = result.equity["equity"]
+        self.assertAlmostEqual(equity.iloc[0], 1_000_000.0)
+        self.assertLess(abs(result.stats["total_return"]), 0.01)
+
+    def test_year_of_minutes_runs_fast(self):
+        days = [str(d) for d in np.arange(np.datetime64("2024-01-01"), np.datetime64("2024-12-31")) if np.is_busday(d)]
+        codes = [f"{600000 + i}.SH" for i in range(50)]
+        start = time.perf_counter()
+        result = self.make_engine(Strategy(), days, codes).run()
+        self.assertEqual(result.stats["bars"], len(days) * 240)
+        self.assertLess(time.perf_counter() - start, 20)
+
+
+class TestPortfolio(unittest.TestCase):
+    def test_t_plus_one_and_fees(self):
+        feed = BarFeed.from_frames(minute_frames(["A"], ["2024-01-02", "2024-01-03"]))
+        portfolio = Portfolio(["A"], cash=10_000)
+        portfolio.slippage = 0.0
+        bars = iter(feed)
+        first = next(bars)
+        portfolio.on_bar(first)
+        portfolio.order("A", 500, first.time)
+        portfolio.on_bar(next(bars))
+        self.assertEqual(portfolio.position("A"), 500)
+        self.assertAlmostEqual(portfolio.cash, 10_000 - 500 * 10.001 - 5.0)
+
+        # 当日买入不可卖
+        portfolio.order("A", -500, first.time)
+        for batch in bars:
+            portfolio.on_bar(batch)
+            if batch.time.date() == datetime.date(2024, 1, 2):
+                self.assertEqual(portfolio.position("A"), 500)
+        self.assertEqual(portfolio.position("A"), 0)
+        self.assertEqual(len(portfolio.trades), 2)
+
+
+class TestCronSpec(unittest.TestCase):
+    def test_next_after(self):
+        spec = CronSpec("*/15 9-10 * * 1-5")
+        self.assertEqual(spec.next_after(datetime.datetime(2024, 1, 5, 10, 50)), datetime.datetime(2024, 1, 8, 9, 0))
+        self.assertEqual(spec.next_after(datetime.datetime(2024, 1, 8, 9, 0)), datetime.datetime(2024, 1, 8, 9, 15))
+        with self.assertRaises(ValueError):
+            CronSpec("61 * * * *")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import sys
+import shutil
+import tempfile
+import textwrap
+import unittest
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.backtest import sweep
+from vibe_core.backtest.engine import BacktestEngine
+from vibe_core.backtest.feed import BarFeed
+from vibe_core.backtest.sweep import apply_params, expand_grid, parse_param, run_sweep
+from tests.test_backtest import minute_frames
+
+STRATEGY_SOURCE = textwrap.dedent('''
+    from vibe_core.module import VibeModule
+
+    class ThresholdStrategy(VibeModule):
+        def __init__(self):
+            super().__init__()
+            self.interval = 60
+            self.bought = False
+
+        def on_event(self, event):
+            if event.type != "QUOTE" or self.bought:
+                return
+            price = self.context.price("600519.SH")
+            if price is not None and price >= self.config.get("threshold", 0):
+                self.context.order("600519.SH", self.config.get("shares", 100))
+                self.bought = True
+''')
+
+
+def engine_feed_is_shared(start, end):
+    """在工作进程中运行: 引擎裁剪后的行情是否仍与 mmap 加载的行情共享内存"""
+    feed = sweep._worker["feed"]
+    engine = BacktestEngine([], start, end, feed=feed, verbose=False)
+    return all(np.shares_memory(engine.feed.fields[n], feed.fields[n]) for n in feed.fields)
+
+
+class TestSweepHelpers(unittest.TestCase):
+    def test_grid_and_params(self):
+        self.assertEqual(parse_param("threshold=1,2.5,abc"), {"threshold": [1, 2.5, "abc"]})
+        with self.assertRaises(ValueError):
+            parse_param("threshold")
+        combos = expand_grid({"a": [1, 2], "b": [True, False], "c": 3})
+        self.assertEqual(len(combos), 4)
+        self.assertEqual(combos[0], {"a": 1, "b": True, "c": 3})
+
+    def test_apply_params_sets_existing_attributes(self):
+        class Dummy:
+            def __init__(self):
+                self.config = {}
+                self.interval = 10
+
+        module = Dummy()
+        apply_params(module, {"interval": 30, "threshold": 5})
+        self.assertEqual(module.interval, 30)
+        self.assertEqual(module.config, {"interval": 30, "threshold": 5})
+        self.assertFalse(hasattr(module, "threshold"))
+
+
+class TestRunSweep(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "threshold_strategy.py")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(STRATEGY_SOURCE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_parallel_sweep_collects_metrics(self):
+        days = ["2024-01-02", "2024-01-03", "2024-01-04"]
+        feed = BarFeed.from_frames(minute_frames(["600519.SH", "000001.SZ"], days))
+        feed.save(os.path.join(self.tmp, "feed"))
+        loaded = BarFeed.load(os.path.join(self.tmp, "feed"))
+        self.assertIsInstance(loaded.fields["close"], np.memmap)
+        np.testing.assert_array_equal(loaded.fields["close"], feed.fields["close"])
+
+        grid = {"threshold": [0, 10.5, 1000], "shares": [100, 1000]}
+        table = run_sweep(self.path, grid, days[0], days[-1], feed=feed, cash=100_000, max_workers=2,
+                          base_config={"unused": 1})
+
+        self.assertEqual(len(table), 6)
+        self.assertTrue(table["error"].isna().all())
+        self.assertEqual(set(table["run"]), set(range(6)))
+        self.assertTrue((table["bars"] == 720).all())
+        # 阈值过高不会成交
+        self.assertTrue((table.loc[table["threshold"] == 1000, "trades"] == 0).all())
+        self.assertTrue((table.loc[table["threshold"] < 1000, "trades"] == 1).all())
+        # 按收益降序 (价格单边上涨，仓位越大收益越高)
+        self.assertTrue(table["total_return"].is_monotonic_decreasing)
+        self.assertEqual(table.iloc[0]["shares"], 1000)
+
+    def test_workers_share_the_mapped_feed(self):
+        # 含一个周六: 裁剪在 run_sweep 落盘前完成，工作进程里不再按掩码复制
+        days = ["2024-01-04", "2024-01-05", "2024-01-06"]
+        feed = BarFeed.from_frames(minute_frames(["600519.SH"], days))
+        feed_dir = os.path.join(self.tmp, "feed")
+        feed.between(None, None).trading_only().save(feed_dir)
+        self.assertEqual(len(BarFeed.load(feed_dir)), 480)
+
+        with ProcessPoolExecutor(max_workers=1, initializer=sweep._init_worker,
+                                 initargs=(self.path, feed_dir, {})) as pool:
+            self.assertTrue(pool.submit(engine_feed_is_shared, days[0], days[-1]).result())
+
+        table = run_sweep(self.path, {"threshold": [0]}, days[0], days[-1], feed=feed, max_workers=1)
+        self.assertEqual(table["bars"].iloc[0], 480)
+
+    def test_missing_module_reports_error(self):
+        days = ["2024-01-02"]
+        feed = BarFeed.from_frames(minute_frames(["600519.SH"], days))
+        empty = os.path.join(self.tmp, "empty.py")
+        open(empty, "w").close()
+        table = run_sweep(empty, {"threshold": [1]}, days[0], days[0], feed=feed, max_workers=1)
+        self.assertIn("module class not found", table["error"].iloc[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
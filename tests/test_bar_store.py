@@ -0,0 +1,128 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.data.bar_store import DailyBarStore
+
+
+def write_tushare(directory, day, rows):
+    pd.DataFrame([
+        {"ts_code": code, "trade_date": day, "open": close, "high": close, "low": close, "close": close,
+         "pre_close": close, "pct_chg": 0.0, "vol": 100.0, "amount": 1000.0}
+        for code, close in rows
+    ]).to_csv(os.path.join(directory, f"daily_{day}.csv"), index=False)
+
+
+class TestDailyBarStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "post_market")
+        os.makedirs(self.src)
+        self.store = DailyBarStore(source_dirs=[self.src], store_dir=os.path.join(self.tmp.name, "bars"))
+        write_tushare(self.src, "20240304", [("000001.SZ", 10.0), ("600519.SH", 1700.0)])
+        write_tushare(self.src, "20240305", [("000001.SZ", 10.5)])
+
+    def tearDown(self):
+        self.store._panel = None
+        self.tmp.cleanup()
+
+    def test_history_is_row_slice(self):
+        panel = self.store.build()
+        self.assertEqual(panel.shape, (2, 2))
+        df = self.store.get_history("000001.SZ", "20240301", "20240331")
+        self.assertEqual(df["trade_date"].tolist(), ["20240304", "20240305"])
+        np.testing.assert_allclose(df["close"], [10.0, 10.5])
+        # 停牌/缺失日期不返回
+        self.assertEqual(self.store.get_history("sh600519")["trade_date"].tolist(), ["20240304"])
+        self.assertTrue(self.store.get_history("999999").empty)
+        self.assertEqual(panel.price("000001", "2024-03-05"), 10.5)
+        self.assertIsNone(panel.price("600519.SH", "20240305"))
+
+    def test_incremental_build_and_akshare_source(self):
+        self.store.build()
+        # 新增一个 AKShare 快照日期 + 修改已有日期
+        pd.DataFrame({
+            "代码": ["000001", "300750"], "名称": ["平安银行", "宁德时代"],
+            "最新价": [10.8, 200.0], "今开": [10.6, 198.0], "最高": [10.9, 201.0], "最低": [10.5, 197.0],
+            "昨收": [10.5, 199.0], "涨跌幅": [2.86, 0.5], "成交量": [500.0, 300.0], "成交额": [540000.0, 6000000.0],
+        }).to_csv(os.path.join(self.src, "akshare_20240306.csv"), index=False)
+        write_tushare(self.src, "20240305", [("000001.SZ", 10.4), ("600519.SH", 1710.0)])
+        os.utime(os.path.join(self.src, "daily_20240305.csv"), (1e9, 2e9))
+
+        self.assertEqual(sorted(self.store.dirty_dates()), ["20240305", "20240306"])
+        panel = self.store.build()
+        self.assertEqual(panel.shape, (3, 3))
+        self.assertEqual(self.store.dirty_dates(), [])
+        np.testing.assert_allclose(panel.history("000001")["close"], [10.0, 10.4, 10.8], rtol=1e-6)
+        self.assertEqual(panel.price("600519", "20240305"), 1710.0)
+        # AKShare 成交额 (元) 换算为千元
+        self.assertAlmostEqual(panel.price("300750", "20240306", "amount"), 6000.0)
+
+    def test_prices_round_trip_exactly(self):
+        pd.DataFrame([{"ts_code": "000001.SZ", "trade_date": "20240306", "open": 1419.1, "high": 11.47,
+                       "low": 11.39, "close": 11.47, "pre_close": 11.43, "pct_chg": 0.35,
+                       "vol": 123456789.0, "amount": 1417893216.123}]).to_csv(
+            os.path.join(self.src, "daily_20240306.csv"), index=False)
+        panel = self.store.build()
+        self.assertEqual(panel.price("000001", "20240306"), 11.47)
+        self.assertEqual(panel.price("000001", "20240306", "open"), 1419.1)
+        self.assertEqual(panel.price("000001", "20240306", "vol"), 123456789.0)
+        self.assertEqual(panel.price("000001", "20240306", "amount"), 1417893216.123)
+        self.assertEqual(self.store.get_history("000001")["close"].tolist(), [10.0, 10.5, 11.47])
+
+    def test_legacy_float32_store_is_rebuilt(self):
+        self.store.build()
+        # 模拟旧版本: float32 字段、meta 无 dtype 与 version (文件直接位于 store_dir)
+        meta = self.store._read_meta()
+        meta.pop("dtype")
+        dates = np.load(self.store.dates_path)
+        meta.pop("version")
+        fields = {name: np.asarray(self.store.load(auto_build=False).field(name), dtype=np.float32)
+                  for name in meta["fields"]}
+        self.store._panel = None
+        self.store._write_atomic(fields, dates, meta)
+        self.assertTrue(self.store.is_stale())
+        self.assertEqual(self.store.load(auto_build=False).field("close").dtype, np.float32)
+
+        panel = self.store.build()
+        self.assertEqual(panel.field("close").dtype, np.float64)
+        self.assertFalse(self.store.is_stale())
+        # 旧布局的顶层文件在重建后清理
+        self.assertFalse([e for e in os.listdir(self.store.store_dir) if e.endswith(".npy")])
+
+    def test_rebuild_leaves_mapped_files_untouched(self):
+        self.store.build()
+        # 另一个长期存活的实例 (如 LocalDataModule.bar_store) 持有旧映射
+        other = DailyBarStore(source_dirs=[self.src], store_dir=self.store.store_dir)
+        held = other.load(auto_build=False)
+        old_dir = os.path.dirname(held.fields["close"].filename)
+
+        write_tushare(self.src, "20240306", [("000001.SZ", 11.0)])
+        panel = self.store.build()
+        self.assertNotEqual(os.path.dirname(panel.fields["close"].filename), old_dir)
+        self.assertEqual(held.price("000001", "20240305"), 10.5)
+        # 该实例下次加载时看到新版本
+        self.assertEqual(other.load(auto_build=False).price("000001", "20240306"), 11.0)
+
+        del held
+        other._panel = None
+        self.store.build(full=True)
+        self.assertEqual(len([e for e in os.listdir(self.store.store_dir) if e.startswith("v")]), 1)
+
+    def test_tushare_preferred_and_weekend_skipped(self):
+        write_tushare(self.src, "20240309", [("000001.SZ", 99.0)])  # 周六
+        pd.DataFrame({"代码": ["000001"], "最新价": [1.0]}).to_csv(
+            os.path.join(self.src, "akshare_20240304.csv"), index=False)
+        files = self.store.source_files()
+        self.assertEqual(list(files), ["20240304", "20240305"])
+        self.assertTrue(files["20240304"].endswith("daily_20240304.csv"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import datetime
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.data.board_index import BoardIndex, KIND_INDUSTRY
+from vibe_core.data.board_heat import BoardHeat
+
+MAPPING = {
+    "机器人": ["000001", "000002", "600519"],
+    "白酒": ["600519", "000858"],
+    "银行": ["000001"],
+}
+
+
+class TestBoardIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = BoardIndex.from_mapping(MAPPING, industries=["白酒", "银行"])
+
+    def test_bidirectional_lookup(self):
+        self.assertEqual(self.index.stocks_of("机器人"), ["000001", "000002", "600519"])
+        self.assertEqual(self.index.boards_of("600519.SH"), ["机器人", "白酒"])
+        self.assertEqual(self.index.boards_of("sz000001"), ["机器人", "银行"])
+        self.assertEqual(self.index.boards_of("999999"), [])
+        self.assertEqual(self.index.stocks_of("不存在"), [])
+
+    def test_intersection(self):
+        self.assertEqual(self.index.intersection("机器人", "白酒"), ["600519"])
+        self.assertEqual(self.index.intersection("白酒", "银行"), [])
+
+    def test_board_counts_and_weights(self):
+        counts = self.index.board_counts(["000001", "600519", "未知"])
+        self.assertEqual(counts[self.index.board_id("机器人")], 2)
+        self.assertEqual(counts[self.index.board_id("白酒")], 1)
+
+        sums = self.index.board_counts(["000001", "600519"], weights=[1.5, 2.0])
+        self.assertAlmostEqual(sums[self.index.board_id("机器人")], 3.5)
+        self.assertAlmostEqual(sums[self.index.board_id("银行")], 1.5)
+
+    def test_boards_of_many(self):
+        df = self.index.boards_of_many(["000001", "600519"])
+        self.assertEqual(df.iloc[0]["board"], "机器人")
+        self.assertEqual(int(df.iloc[0]["count"]), 2)
+
+        industries = self.index.boards_of_many(["000001", "600519"], kind=KIND_INDUSTRY)
+        self.assertEqual(set(industries["board"]), {"白酒", "银行"})
+
+
+class TestBoardIndexPersistence(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.json_path = os.path.join(self.root, "board_stocks_map.json")
+        self.index_path = os.path.join(self.root, "panel", "board_index.npz")
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump(MAPPING, f, ensure_ascii=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_roundtrip_and_rebuild_on_change(self):
+        built = BoardIndex.load_or_build(self.json_path, self.index_path)
+        self.assertTrue(os.path.exists(self.index_path))
+
+        loaded = BoardIndex.load(self.index_path)
+        self.assertEqual(loaded.boards, built.boards)
+        np.testing.assert_array_equal(loaded.stock_indptr, built.stock_indptr)
+        self.assertEqual(loaded.boards_of("600519"), ["机器人", "白酒"])
+
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump({"新概念": ["300750"]}, f, ensure_ascii=False)
+        stamp = os.path.getmtime(self.index_path) + 10
+        os.utime(self.json_path, (stamp, stamp))
+
+        rebuilt = BoardIndex.load_or_build(self.json_path, self.index_path)
+        self.assertEqual(rebuilt.boards, ["新概念"])
+
+
+class TestBoardConstituentSync(unittest.TestCase):
+    """AKShareMeta.sync_board_constituent_data 的断点续传与增量合并。"""
+
+    def setUp(self):
+        from modules.core.akshare_data import AkShareDataModule
+        from modules.core.akshare_data import base as ak_base
+        from modules.core.akshare_data.dictionary import meta as ak_meta
+        self.ak_base, self.ak_meta = ak_base, ak_meta
+
+        self.root = tempfile.mkdtemp()
+        self.module = AkShareDataModule()
+        self.module.board_map_path = os.path.join(self.root, "board_stocks_map.json")
+        self.module.board_index_path = os.path.join(self.root, "panel", "board_index.npz")
+        self.module.board_crawl_checkpoint_path = os.path.join(self.root, "checkpoint.json")
+        with open(self.module.board_map_path, "w", encoding="utf-8") as f:
+            json.dump({"银行": ["000001"], "退市板块": ["000002"], "失败概念": ["600000"]}, f, ensure_ascii=False)
+
+        self.module.get_em_sectors = MagicMock(return_value=pd.DataFrame({"板块名称": ["银行"]}))
+        self.module.get_em_concepts = MagicMock(return_value=pd.DataFrame({"板块名称": ["机器人", "失败概念"]}))
+        self.module.get_industry_cons = MagicMock(return_value=pd.DataFrame({"代码": ["000001", "600036"]}))
+        self.module.get_concept_cons = MagicMock(
+            side_effect=lambda name: pd.DataFrame({"代码": [300024]}) if name == "机器人" else pd.DataFrame())
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _sync(self):
+        with patch.object(self.ak_base, "ak", MagicMock()), patch.object(self.ak_meta, "ak", MagicMock()):
+            return self.module.sync_board_constituent_data(max_workers=2, rate_per_sec=100)
+
+    def test_incremental_merge_keeps_failed_boards(self):
+        stats = self._sync()
+        self.assertEqual(stats["fetched"], 2)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["added_boards"], 1)
+        self.assertEqual(stats["removed_boards"], 1)
+        self.assertEqual(stats["added_links"], 2)
+
+        with open(self.module.board_map_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        self.assertEqual(saved, {"银行": ["000001", "600036"], "机器人": ["300024"], "失败概念": ["600000"]})
+        with open(os.path.join(self.root, "stock_boards_map.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["300024"], ["机器人"])
+        self.assertEqual(self.module.get_board_index().boards_of("600036"), ["银行"])
+
+        # 有失败时保留检查点，重跑只补抓失败的板块
+        self.assertTrue(os.path.exists(self.module.board_crawl_checkpoint_path))
+        self.module.get_industry_cons.reset_mock()
+        self.module.get_concept_cons.reset_mock()
+        stats = self._sync()
+        self.module.get_industry_cons.assert_not_called()
+        self.module.get_concept_cons.assert_called_once_with("失败概念")
+        self.assertEqual(stats["resumed"], 2)
+
+    def test_resume_from_checkpoint(self):
+        with open(self.module.board_crawl_checkpoint_path, "w", encoding="utf-8") as f:
+            json.dump({"date": datetime.date.today().isoformat(), "boards": {"银行": ["000001"]}}, f, ensure_ascii=False)
+        self.module.get_concept_cons.side_effect = lambda name: pd.DataFrame({"代码": ["300024"]})
+
+        stats = self._sync()
+        self.module.get_industry_cons.assert_not_called()
+        self.assertEqual(stats["resumed"], 1)
+        self.assertEqual(stats["failed"], 0)
+        self.assertFalse(os.path.exists(self.module.board_crawl_checkpoint_path))
+
+    def test_interrupt_cancels_queue_and_checkpoints_finished_boards(self):
+        import threading
+        from concurrent.futures import wait as wait_futures
+        release = threading.Event()
+        self.module.get_concept_cons.side_effect = lambda name: release.wait(5) and pd.DataFrame({"代码": ["300024"]})
+
+        def interrupted(futures):
+            # 银行 抓取完成但尚未被主线程合并时按下 Ctrl+C
+            bank = next(f for f, name in futures.items() if name == "银行")
+            wait_futures([bank])
+            raise KeyboardInterrupt
+
+        with patch.object(self.ak_meta, "as_completed", interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                with patch.object(self.ak_base, "ak", MagicMock()), patch.object(self.ak_meta, "ak", MagicMock()):
+                    self.module.sync_board_constituent_data(max_workers=1, rate_per_sec=100)
+        release.set()
+
+        with open(self.module.board_crawl_checkpoint_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["boards"], {"银行": ["000001", "600036"]})
+        # 单线程: 机器人 正在抓取，失败概念 仍在排队并被取消
+        self.assertNotIn("失败概念", [c.args[0] for c in self.module.get_concept_cons.call_args_list])
+
+
+class TestBoardHeat(unittest.TestCase):
+    def setUp(self):
+        self.index = BoardIndex.from_mapping(MAPPING, industries=["白酒", "银行"])
+        self.limit_up = pd.DataFrame({
+            "代码": ["000001", "000002", "600519"],
+            "名称": ["平安银行", "万科A", "贵州茅台"],
+            "涨跌幅": [10.0, 20.0, 10.0],
+            "连板数": [1, 1, 3],
+        })
+
+    def test_counts_scores_and_leaders(self):
+        heat = BoardHeat(self.index).compute(
+            self.limit_up, broken=pd.DataFrame({"代码": ["000858"]}), limit_down=pd.DataFrame({"代码": [1]}), top_k=2)
+        rows = heat.set_index("board")
+
+        self.assertEqual(rows.loc["机器人", "up"], 3)
+        self.assertEqual(rows.loc["机器人", "weight"], 4.0)
+        self.assertEqual(rows.loc["白酒", "broken"], 1)
+        self.assertEqual(rows.loc["白酒", "score"], 0.5)
+        self.assertEqual(rows.loc["银行", "down"], 1)
+        self.assertEqual(rows.loc["银行", "kind"], "industry")
+        self.assertEqual(heat.iloc[0]["board"], "机器人")
+
+        leaders = rows.loc["机器人", "leaders"]
+        self.assertEqual([s["code"] for s in leaders], ["600519", "000002"])
+        self.assertEqual(leaders[0]["boards"], 3)
+
+    def test_filters_and_empty_pool(self):
+        heat = BoardHeat(self.index)
+        self.assertEqual(list(heat.compute(self.limit_up, kind=KIND_INDUSTRY)["board"]), ["银行", "白酒"])
+        self.assertNotIn("机器人", set(heat.compute(self.limit_up, max_size=2)["board"]))
+        self.assertTrue(heat.compute(pd.DataFrame()).empty)
+
+    def test_heatmap_module_broadcasts_board_heat(self):
+        from modules.beta.market_heatmap import MarketHeatmapModule
+        context = MagicMock()
+        context.data.get_board_index.return_value = self.index
+        context.data.get_broken_limit_pool.return_value = pd.DataFrame()
+        context.data.get_limit_down_pool.return_value = pd.DataFrame()
+
+        module = MarketHeatmapModule(context)
+        module.process_board_heat(self.limit_up)
+        channel, payload = context.broadcast_ui.call_args[0]
+        self.assertEqual(channel, "board_heat")
+        self.assertEqual(payload[0]["board"], "机器人")
+
+    def test_heatmap_log_throttle_follows_context_clock(self):
+        from modules.beta.market_heatmap import MarketHeatmapModule
+        from vibe_core.clock import VirtualClock
+        context = MagicMock()
+        context.clock = VirtualClock(datetime.datetime(2026, 1, 13, 10, 0), speed=0)
+        context.data.get_em_sectors.return_value = pd.DataFrame({"板块名称": ["银行"], "涨跌幅": [1.0]})
+        context.data.get_limit_up_pool.return_value = pd.DataFrame()
+        module = MarketHeatmapModule(context)
+        module.process_board_heat = MagicMock()
+
+        def logged():
+            return sum("[Heatmap] Broadcasted" in c.args[0] for c in context.logger.info.call_args_list)
+
+        module.process()
+        module.process()
+        self.assertEqual(logged(), 1)
+        # 回放时钟快进一分钟后才再次记录
+        context.clock.advance(60)
+        module.process()
+        self.assertEqual(logged(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
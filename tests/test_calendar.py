@@ -0,0 +1,75 @@
+import os
+import sys
+import datetime
+import tempfile
+import unittest
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.data.calendar import TradingCalendar, day_strings
+
+# 2024 年元旦与春节前后的真实交易日
+TRADE_DATES = [
+    "2023-12-28", "2023-12-29",
+    "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05",
+    "2024-02-07", "2024-02-08", "2024-02-19",
+]
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "trade_dates.txt")
+        self.cal = TradingCalendar(TRADE_DATES, path=self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_is_trading_day(self):
+        self.assertTrue(self.cal.is_trading_day("20240102"))
+        self.assertFalse(self.cal.is_trading_day(datetime.date(2024, 1, 1)))  # 元旦
+        self.assertFalse(self.cal.is_trading_day("2024-02-12"))  # 春节休市 (周一)
+        self.assertFalse(self.cal.is_trading_day("2024-01-06"))  # 周六
+        # 日历覆盖范围外按工作日近似
+        self.assertTrue(self.cal.is_trading_day("2025-03-03"))
+        self.assertFalse(self.cal.is_trading_day("2025-03-01"))
+
+    def test_next_prev(self):
+        self.assertEqual(self.cal.next_trading_day("2023-12-29"), datetime.date(2024, 1, 2))
+        self.assertEqual(self.cal.next_trading_day("2024-02-08"), datetime.date(2024, 2, 19))
+        self.assertEqual(self.cal.prev_trading_day("2024-02-19"), datetime.date(2024, 2, 8))
+        self.assertEqual(self.cal.prev_trading_day("2024-01-01"), datetime.date(2023, 12, 29))
+        self.assertEqual(self.cal.last_trading_day("2024-02-14"), datetime.date(2024, 2, 8))
+        self.assertEqual(self.cal.last_trading_day("2024-01-03"), datetime.date(2024, 1, 3))
+        # 超出日历尾部
+        self.assertEqual(self.cal.next_trading_day("2024-02-19"), datetime.date(2024, 2, 20))
+
+    def test_trading_days_between(self):
+        days = self.cal.trading_days_between("20231230", "20240103")
+        self.assertEqual(day_strings(days), ["20240102", "20240103"])
+        self.assertEqual(len(self.cal.trading_days_between("2024-02-09", "2024-02-18")), 0)
+        # 跨越日历尾部时按工作日补齐
+        tail = day_strings(self.cal.trading_days_between("2024-02-19", "2024-02-21"), sep="-")
+        self.assertEqual(tail, ["2024-02-19", "2024-02-20", "2024-02-21"])
+
+    def test_persist_and_refresh(self):
+        self.cal.save()
+        loaded = TradingCalendar.load(self.path)
+        np.testing.assert_array_equal(loaded.dates, self.cal.dates)
+
+        self.assertTrue(loaded.needs_refresh(today="2024-02-01"))
+        loaded.refresh(lambda: TRADE_DATES + ["2024-12-31"])
+        self.assertFalse(loaded.needs_refresh(today="2024-02-01"))
+        self.assertEqual(TradingCalendar.load(self.path).dates[-1], np.datetime64("2024-12-31"))
+
+        # 下载失败时保留原日历
+        def broken():
+            raise ConnectionError("offline")
+        loaded.refresh(broken)
+        self.assertEqual(len(loaded.dates), len(TRADE_DATES) + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import datetime
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.clock import SystemClock, VirtualClock, get_clock, set_clock
+from vibe_core.context import Context
+from vibe_core.data.aggregator import DataAggregator
+from vibe_core.driver.scheduler import SimpleScheduler
+
+START = datetime.datetime(2026, 1, 13, 9, 30)
+
+
+class TestVirtualClock(unittest.TestCase):
+    def tearDown(self):
+        set_clock(None)
+
+    def test_speed_and_jumps(self):
+        clock = VirtualClock(START, speed=1000)
+        time.sleep(0.05)
+        elapsed = clock.time() - START.timestamp()
+        self.assertGreater(elapsed, 40)
+        self.assertLess(elapsed, 1000)
+
+        clock.set_speed(0)
+        frozen = clock.time()
+        time.sleep(0.02)
+        self.assertEqual(clock.time(), frozen)
+        clock.advance(60)
+        self.assertAlmostEqual(clock.time(), frozen + 60, places=3)
+        clock.set(datetime.datetime(2026, 1, 13, 15, 0))
+        self.assertEqual(clock.now(), datetime.datetime(2026, 1, 13, 15, 0))
+
+    def test_paused_sleep_wakes_on_advance(self):
+        clock = VirtualClock(START, speed=0)
+        woke = threading.Event()
+        worker = threading.Thread(target=lambda: (clock.sleep(10), woke.set()), daemon=True)
+        worker.start()
+        clock.advance(5)
+        self.assertFalse(woke.wait(0.05))
+        clock.advance(5)
+        self.assertTrue(woke.wait(1))
+
+    def test_context_and_scheduler_follow_global_clock(self):
+        self.assertIsInstance(get_clock(), SystemClock)
+        clock = set_clock(VirtualClock(START, speed=0))
+        ctx = Context()
+        self.assertEqual(ctx.now, START)
+
+        # 虚拟时间下 interval:10 的任务: 每推进 10 秒执行一次，不依赖真实时间
+        scheduler = SimpleScheduler()
+        ctx._scheduler = scheduler
+        module = MagicMock()
+        module.name = "m"
+        fired = []
+        module.on_event.side_effect = lambda evt: fired.append(evt.timestamp)
+        ctx.register_cron(module, "interval:10")
+        scheduler.start()
+        try:
+            deadline = time.time() + 1
+            while len(fired) < 1 and time.time() < deadline:
+                time.sleep(0.01)
+            for _ in range(3):
+                clock.advance(10)
+                target = len(fired) + 1
+                while len(fired) < target and time.time() < deadline:
+                    time.sleep(0.01)
+        finally:
+            scheduler.stop()
+            clock.advance(10)
+        self.assertEqual(len(fired), 4)
+        self.assertEqual(fired[0], START.timestamp())
+        self.assertEqual(fired[-1], START.timestamp() + 30)
+
+    def test_aggregator_ttl_uses_virtual_time(self):
+        clock = set_clock(VirtualClock(START, speed=0))
+        provider = MagicMock()
+        provider.get_table.side_effect = ["first", "second"]
+        agg = DataAggregator(provider, cache_ttl=5)
+        self.assertEqual(agg.get_table("t"), "first")
+        self.assertEqual(agg.get_table("t"), "first")
+        clock.advance(6)
+        self.assertEqual(agg.get_table("t"), "second")
+
+
+if __name__ == '__main__':
+    unittest.main()
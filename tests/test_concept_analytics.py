@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.data.concept_store import ConceptPanel, FIELDS
+from vibe_core.data.concept_analytics import ConceptAnalytics
+
+
+def make_panel(close: np.ndarray, concepts):
+    values = np.full((len(FIELDS),) + close.shape, np.nan)
+    values[FIELDS.index("close")] = close
+    dates = np.datetime64("2024-01-01", "D") + np.arange(len(close))
+    return ConceptPanel(values, dates, concepts)
+
+
+class TestConceptAnalytics(unittest.TestCase):
+    def setUp(self):
+        close = np.array([
+            [10.0, 10.0, np.nan],
+            [11.0, 9.0, np.nan],
+            [12.0, 8.0, 5.0],
+            [9.0, 10.0, 6.0],
+        ])
+        self.engine = ConceptAnalytics(make_panel(close, ["强", "弱", "新"]))
+
+    def test_rolling_returns(self):
+        ret = self.engine.rolling_returns(2)
+        self.assertTrue(np.isnan(ret[:2]).all())
+        np.testing.assert_allclose(ret[2, :2], [0.2, -0.2])
+        self.assertTrue(np.isnan(ret[2, 2]))
+
+    def test_relative_strength_vs_concept(self):
+        rs = self.engine.relative_strength(1, benchmark="弱")
+        np.testing.assert_allclose(rs[:, 1][1:], 0.0)
+        self.assertAlmostEqual(rs[1, 0], 0.1 - (-0.1))
+
+    def test_momentum_rank_ignores_nan(self):
+        rank = self.engine.momentum_rank(1)
+        self.assertEqual(rank[1, 0], 1.0)
+        self.assertEqual(rank[1, 1], 0.5)
+        self.assertTrue(np.isnan(rank[1, 2]))
+
+    def test_drawdown(self):
+        dd = self.engine.drawdown()
+        self.assertAlmostEqual(dd[3, 0], 9.0 / 12.0 - 1.0)
+        np.testing.assert_allclose(self.engine.max_drawdown()[:2], [9.0 / 12.0 - 1.0, -0.2])
+
+    def test_summary_sorted_by_rank(self):
+        summary = self.engine.summary(windows=(1,), rank_window=1)
+        self.assertEqual(summary.index[0], "弱")
+        self.assertIn("rs_1", summary.columns)
+
+    def test_rank_snapshot(self):
+        df = pd.DataFrame({"板块名称": ["A", "B"], "涨跌幅": [1.0, 3.0], "换手率": [2.0, 1.0]})
+        ranked = ConceptAnalytics.rank_snapshot(df)
+        self.assertEqual(list(ranked.columns), ["涨跌幅", "换手率", "涨跌幅_rank", "换手率_rank", "score"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import datetime
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.data.concept_store import ConceptHistoryStore
+
+HEADER = "日期,开盘价,最高价,最低价,收盘价,成交量,成交额\n"
+
+
+class TestConceptHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, "ths")
+        os.makedirs(self.source)
+        self._write("概念A", [
+            ("2024-01-02", 10, 11, 9, 10.5, 100, 1000),
+            ("2024-01-03", 10.5, 12, 10, 11.0, 200, 2000),
+            ("2024-01-04", 11, 12, 10, 12.0, 300, 3000),
+        ])
+        # 概念B 上市较晚
+        self._write("概念B", [
+            ("2024-01-03", 20, 21, 19, 20.0, 50, 500),
+            ("2024-01-04", 20, 22, 19, 21.0, 60, 600),
+        ])
+        self.store = ConceptHistoryStore(source_dir=self.source, store_dir=os.path.join(self.root, "panel"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _write(self, name, rows):
+        with open(os.path.join(self.source, f"{name}.csv"), "w", encoding="utf-8") as f:
+            f.write(HEADER)
+            for row in rows:
+                f.write(",".join(str(v) for v in row) + "\n")
+
+    def test_build_aligns_dates_and_concepts(self):
+        panel = self.store.load()
+        self.assertEqual(panel.shape, (6, 3, 2))
+        self.assertEqual(panel.concepts, ["概念A", "概念B"])
+
+        close = panel.field("close")
+        np.testing.assert_allclose(close[:, panel.concept_index("概念A")], [10.5, 11.0, 12.0])
+        self.assertTrue(np.isnan(close[0, panel.concept_index("概念B")]))
+        self.assertEqual(close[2, panel.concept_index("概念B")], 21.0)
+
+    def test_load_is_memory_mapped_and_cached(self):
+        self.store.build()
+        fresh = ConceptHistoryStore(source_dir=self.source, store_dir=self.store.store_dir)
+        panel = fresh.load()
+        self.assertIsInstance(panel.values, np.memmap)
+        self.assertIs(fresh.load(), panel)
+
+    def test_stale_after_new_csv(self):
+        self.store.build()
+        self.assertFalse(self.store.is_stale())
+        self._write("概念C", [("2024-01-05", 1, 1, 1, 1, 1, 1)])
+        self.assertTrue(self.store.is_stale())
+        panel = self.store.load()
+        self.assertEqual(len(panel.concepts), 3)
+        self.assertEqual(str(panel.dates[-1]), "2024-01-05")
+
+    def test_rebuild_leaves_mapped_files_untouched(self):
+        old = self.store.load()
+        old_dir = os.path.dirname(old.values.filename)
+        other = ConceptHistoryStore(source_dir=self.source, store_dir=self.store.store_dir)
+        held = other.load()
+
+        self._write("概念C", [("2024-01-05", 1, 1, 1, 1, 1, 1)])
+        panel = self.store.build()
+        # 新版本写入新目录，meta 指向它
+        self.assertNotEqual(os.path.dirname(panel.values.filename), old_dir)
+        self.assertEqual(os.path.dirname(self.store.panel_path), os.path.dirname(panel.values.filename))
+        self.assertEqual(len(panel.concepts), 3)
+        # 另一个读取方持有的旧映射仍可读
+        self.assertEqual(held.field("close")[2, held.concept_index("概念A")], 12.0)
+
+        del held, other, old
+        self.store.build()
+        versions = [e for e in os.listdir(self.store.store_dir) if e.startswith("v")]
+        self.assertEqual(len(versions), 1)
+
+    def test_staleness_is_checked_at_most_once_per_interval(self):
+        self.store.build()
+        with patch.object(self.store, "is_stale", return_value=False) as is_stale:
+            for _ in range(5):
+                self.store.load()
+            self.assertEqual(is_stale.call_count, 1)
+
+            # 自己写入的行让下一次 load 立即检查
+            self.store.append_rows("概念A", pd.DataFrame({"日期": ["2024-01-05"], "收盘价": [13.0]}))
+            self.store.load()
+            self.assertEqual(is_stale.call_count, 2)
+
+    def test_date_slice_and_last_dates(self):
+        panel = self.store.load()
+        rows = panel.date_slice("20240103", "2024-01-04")
+        self.assertEqual((rows.start, rows.stop), (1, 3))
+        self.assertEqual(panel.last_valid_dates(), {"概念A": "2024-01-04", "概念B": "2024-01-04"})
+
+    def test_append_rows_merges_and_reports_last_date(self):
+        self.assertEqual(self.store.read_last_date("概念A"), datetime.date(2024, 1, 4))
+        tail = pd.DataFrame({
+            "日期": ["2024-01-04", "2024-01-05"],
+            "开盘价": [11, 12], "最高价": [12, 13], "最低价": [10, 11],
+            "收盘价": [12.5, 13.0], "成交量": [300, 400], "成交额": [3000, 4000],
+        })
+        self.assertEqual(self.store.append_rows("概念A", tail), 1)
+        self.assertEqual(self.store.read_last_date("概念A"), datetime.date(2024, 1, 5))
+
+        panel = self.store.load()
+        close = panel.field("close")[:, panel.concept_index("概念A")]
+        # 重复日期以新数据为准
+        np.testing.assert_allclose(close[-2:], [12.5, 13.0])
+        self.assertIsNone(self.store.read_last_date("不存在"))
+
+    def test_sanitized_names_keep_their_original_name(self):
+        tail = pd.DataFrame({"日期": ["2024-01-05"], "收盘价": [5.0]})
+        self.assertEqual(self.store.append_rows("A/B", tail), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.source, "A_B.csv")))
+        # 同步、面板与分析使用同一个概念名
+        self.assertIn("A/B", self.store.source_files())
+        self.assertEqual(self.store.read_last_date("A/B"), datetime.date(2024, 1, 5))
+        panel = self.store.load()
+        self.assertEqual(panel.last_valid_dates()["A/B"], "2024-01-05")
+        self.assertNotIn("A_B", panel.concepts)
+
+    def test_partial_last_row_is_ignored(self):
+        # 追加被中断: 末行没有换行
+        with open(os.path.join(self.source, "概念A.csv"), "a", encoding="utf-8") as f:
+            f.write("2024-01-05,12,13")
+        self.assertEqual(self.store.read_last_date("概念A"), datetime.date(2024, 1, 4))
+
+
+class TestConceptHistorySync(unittest.TestCase):
+    """AKShareMeta.sync_ths_concept_histories 只请求缺失尾部。"""
+
+    def setUp(self):
+        from modules.core.akshare_data import AkShareDataModule
+        from modules.core.akshare_data import base as ak_base
+        from modules.core.akshare_data.dictionary import meta as ak_meta
+        self.ak_base, self.ak_meta = ak_base, ak_meta
+
+        self.root = tempfile.mkdtemp()
+        source = os.path.join(self.root, "ths")
+        os.makedirs(source)
+        with open(os.path.join(source, "旧概念.csv"), "w", encoding="utf-8") as f:
+            f.write(HEADER + "2024-01-02,1,1,1,1,1,1\n")
+        with open(os.path.join(source, "最新概念.csv"), "w", encoding="utf-8") as f:
+            f.write(HEADER + "2024-01-05,1,1,1,1,1,1\n")
+
+        self.module = AkShareDataModule()
+        self.module._concept_store = ConceptHistoryStore(source_dir=source, store_dir=os.path.join(self.root, "panel"))
+        self.module.ths_concepts_path = os.path.join(self.root, "ths_concepts.csv")
+        self.module.sync_concepts_and_sectors = MagicMock()
+        self.module._last_closed_date = MagicMock(return_value=datetime.date(2024, 1, 5))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_only_missing_tail_is_requested(self):
+        fake_ak = MagicMock()
+        fake_ak.stock_board_concept_index_ths.return_value = pd.DataFrame({
+            "日期": ["2024-01-03", "2024-01-04", "2024-01-05"],
+            "开盘价": [2, 3, 4], "最高价": [2, 3, 4], "最低价": [2, 3, 4],
+            "收盘价": [2, 3, 4], "成交量": [2, 3, 4], "成交额": [2, 3, 4],
+        })
+        with patch.object(self.ak_base, "ak", fake_ak), patch.object(self.ak_meta, "ak", fake_ak):
+            stats = self.module.sync_ths_concept_histories(max_workers=2, rate_per_sec=100)
+
+        fake_ak.stock_board_concept_index_ths.assert_called_once_with(
+            symbol="旧概念", start_date="20240103", end_date="20240105")
+        self.assertEqual(stats, {"updated": 1, "skipped": 1, "failed": 0, "rows": 3})
+
+        panel = self.module._concept_store.load(auto_build=False)
+        self.assertEqual(panel.last_valid_dates()["旧概念"], "2024-01-05")
+
+
+if __name__ == '__main__':
+    unittest.main()
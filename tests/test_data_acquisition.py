@@ -1,6 +1,7 @@
 import pytest
 import sys
 import os
+import shutil
 import logging
 import pandas as pd
 from unittest.mock import MagicMock
@@ -64,10 +65,13 @@ def test_sina_data_module(mock_ctx):
     else:
         print("- get_snapshot: WARNING (Returned empty, check network or Sina availability)")
 
-def test_stock_info_module(mock_ctx):
+def test_stock_info_module(mock_ctx, tmp_path):
     """Test StockInfoModule for metadata fetching (Sector, Industry)."""
     print("\n[DataTest] StockInfoModule")
-    module = StockInfoModule(mock_ctx)
+    db_path = str(tmp_path / "stock_info.db")
+    if os.path.exists(StockInfoModule.default_db_path):
+        shutil.copy(StockInfoModule.default_db_path, db_path)
+    module = StockInfoModule(mock_ctx, db_path=db_path)
     module.initialize(mock_ctx) # StockInfo needs DB init
     
     # Test individual info (e.g., Moutai)
@@ -0,0 +1,171 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.context import Context
+from vibe_core.services.file_watcher import InotifyWatcher, PollingWatcher, create_watcher
+from vibe_core.services.module_loader import ModuleLoaderService
+
+PACKAGE_INIT = '''
+from vibe_core.module import VibeModule
+
+class WatchedModule(VibeModule):
+    def configure(self):
+        pass
+'''
+
+
+class Collector:
+    def __init__(self):
+        self.batches = []
+        self.event = threading.Event()
+
+    def __call__(self, paths):
+        self.batches.append(paths)
+        self.event.set()
+
+    def wait(self, timeout=3.0):
+        ok = self.event.wait(timeout)
+        self.event.clear()
+        return ok
+
+
+class WatcherCases:
+    """两种实现共用的用例。"""
+
+    def make_watcher(self, root, callback):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, "pkg", "realtime"))
+        self.submodule = os.path.join(self.root, "pkg", "realtime", "limit.py")
+        with open(self.submodule, "w") as f:
+            f.write("X = 1\n")
+        self.collector = Collector()
+        self.watcher = self.make_watcher(self.root, self.collector)
+        self.watcher.start()
+
+    def tearDown(self):
+        self.watcher.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_submodule_edit_is_reported_once(self):
+        # 连续多次写入在去抖窗口内合并为一次回调
+        for i in range(3):
+            with open(self.submodule, "w") as f:
+                f.write(f"X = {i + 2}\n")
+        self.assertTrue(self.collector.wait())
+        self.assertEqual(self.collector.batches, [{self.submodule}])
+
+    def test_ignores_bytecode_and_hidden_files(self):
+        os.makedirs(os.path.join(self.root, "pkg", "__pycache__"))
+        with open(os.path.join(self.root, "pkg", "__pycache__", "limit.cpython-311.pyc"), "w") as f:
+            f.write("x")
+        with open(os.path.join(self.root, "pkg", ".limit.py.swp"), "w") as f:
+            f.write("x")
+        self.assertFalse(self.collector.wait(timeout=0.8))
+
+
+@unittest.skipUnless(InotifyWatcher.available(), "inotify not available")
+class TestInotifyWatcher(WatcherCases, unittest.TestCase):
+    def make_watcher(self, root, callback):
+        return InotifyWatcher([root], callback, debounce=0.1)
+
+    def test_new_package_directory_is_watched(self):
+        new_pkg = os.path.join(self.root, "new_pkg")
+        os.makedirs(new_pkg)
+        with open(os.path.join(new_pkg, "__init__.py"), "w") as f:
+            f.write("")
+        self.assertTrue(self.collector.wait())
+        self.collector.batches.clear()
+
+        # 新目录建立监视后，其中的后续修改同样可见
+        start = time.perf_counter()
+        with open(os.path.join(new_pkg, "helper.py"), "w") as f:
+            f.write("Y = 1\n")
+        self.assertTrue(self.collector.wait())
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIn(os.path.join(new_pkg, "helper.py"), self.collector.batches[0])
+
+    def test_idle_select_blocks_until_stop(self):
+        from vibe_core.services import file_watcher
+        timeouts = []
+        real_select = file_watcher.select.select
+
+        def recording_select(r, w, x, timeout=None):
+            timeouts.append(timeout)
+            return real_select(r, w, x, timeout)
+
+        watcher = InotifyWatcher([self.root], self.collector, debounce=0.1)
+        with patch.object(file_watcher.select, "select", recording_select):
+            watcher.start()
+            time.sleep(0.3)
+            # 空闲时只有一次无超时的 select，不会周期性唤醒
+            self.assertEqual(timeouts, [None])
+            thread = watcher._thread
+            start = time.perf_counter()
+            watcher.stop()
+        self.assertLess(time.perf_counter() - start, 0.2)
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(watcher._wake_w)
+
+
+class TestPollingWatcher(WatcherCases, unittest.TestCase):
+    def make_watcher(self, root, callback):
+        return PollingWatcher([root], callback, debounce=0.1, interval=0.1)
+
+    def test_edit_with_same_size_is_detected(self):
+        stat = os.stat(self.submodule)
+        with open(self.submodule, "w") as f:
+            f.write("X = 9\n")
+        os.utime(self.submodule, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertTrue(self.collector.wait())
+
+
+class TestLoaderWatch(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.package = os.path.join(self.root, "watched_pkg")
+        os.makedirs(os.path.join(self.package, "realtime"))
+        with open(os.path.join(self.package, "__init__.py"), "w") as f:
+            f.write(PACKAGE_INIT)
+        self.submodule = os.path.join(self.package, "realtime", "limit.py")
+        with open(self.submodule, "w") as f:
+            f.write("X = 1\n")
+        self.loader = ModuleLoaderService(Context())
+        self.loader.watch_dirs = [self.root]
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_submodule_change_reloads_package(self):
+        self.assertTrue(self.loader._scan_definitions())
+        self.assertIn("WatchedModule", self.loader.available_classes)
+        first = self.loader.available_classes["WatchedModule"]
+        self.assertFalse(self.loader._scan_definitions())
+
+        # 只改包内子模块 (不动 __init__.py) 也应触发重新加载
+        mtime = os.path.getmtime(self.submodule) + 5
+        os.utime(self.submodule, (mtime, mtime))
+        self.assertTrue(self.loader._scan_definitions())
+        self.assertIsNot(self.loader.available_classes["WatchedModule"], first)
+
+    def test_create_watcher_prefers_inotify(self):
+        watcher = create_watcher([self.root], lambda paths: None)
+        expected = InotifyWatcher if InotifyWatcher.available() else PollingWatcher
+        self.assertIsInstance(watcher, expected)
+        watcher.start()
+        watcher.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
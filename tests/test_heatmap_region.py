@@ -1,6 +1,7 @@
 import pytest
 import sys
 import os
+import shutil
 import logging
 import pandas as pd
 import time
@@ -10,6 +11,7 @@ from unittest.mock import MagicMock
 sys.path.append(os.getcwd())
 
 from vibe_core.context import Context
+from vibe_core.clock import get_clock
 from vibe_core.data.hybrid import HybridDataProvider
 from modules.core.akshare_data import AkShareDataModule
 from modules.core.stock_info import StockInfoModule
@@ -25,21 +27,27 @@ class MockContext:
         self.data = None 
         self.broadcast_ui = MagicMock()
         self.register_cron = MagicMock()
+        self.clock = get_clock()
 
 @pytest.fixture
-def full_ctx():
+def full_ctx(tmp_path):
     ctx = MockContext()
     hybrid = HybridDataProvider()
     ctx.data = hybrid
     
     ak_mod = AkShareDataModule(ctx)
-    info_mod = StockInfoModule(ctx)
+    # 复制仓库中的库到临时目录，迁移与写入不改动受版本控制的文件
+    db_path = str(tmp_path / "stock_info.db")
+    if os.path.exists(StockInfoModule.default_db_path):
+        shutil.copy(StockInfoModule.default_db_path, db_path)
+    info_mod = StockInfoModule(ctx, db_path=db_path)
     info_mod.initialize(ctx)
     
     hybrid.register_provider("akshare", ak_mod)
     hybrid.register_provider("stock_info", info_mod)
     
-    return ctx
+    yield ctx
+    info_mod.on_stop()
 
 def test_region_pie_module(full_ctx):
     print("\n[ModuleTest] RegionPieModule")
@@ -0,0 +1,96 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from modules.core.local_data import LocalDataModule
+
+DAILY_MD = """# 27_历史日线
+
+| ts_code | trade_date | open | close | vol |
+| --- | --- | --- | --- | --- |
+| 600519.SH | 20240103 | 1700.0 | 1710.5 | 100 |
+| 000001.SZ | 20240102 | 9.5 | 9.6 | 2000 |
+| 000001.SZ | 20240104 | 9.7 | 9.8 | 2100 |
+| 000001.SZ | 20240103 | 9.6 | 9.7 |  |
+"""
+
+
+class TestLocalDataModule(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "tushare")
+        os.makedirs(self.root)
+        with open(os.path.join(self.root, "27_历史日线.md"), "w", encoding="utf-8") as f:
+            f.write(DAILY_MD)
+        self.module = self.make_module()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_module(self):
+        module = LocalDataModule()
+        module.context = MagicMock()
+        module.root_path = self.root
+        module.cache_dir = os.path.join(self.tmp.name, "cache")
+        module.bar_store = MagicMock()
+        module.bar_store.load.return_value = None
+        return module
+
+    def test_typed_sorted_table(self):
+        df = self.module.get_table("daily")
+        self.assertEqual(df["ts_code"].tolist(), ["000001.SZ"] * 3 + ["600519.SH"])
+        self.assertEqual(df["trade_date"].tolist()[:3], ["20240102", "20240103", "20240104"])
+        self.assertTrue(pd.api.types.is_float_dtype(df["close"]))
+        self.assertTrue(pd.api.types.is_numeric_dtype(df["vol"]))
+        self.assertTrue(pd.isna(df["vol"].iloc[1]))
+
+    def test_indexed_lookups(self):
+        self.assertEqual(self.module.get_price("000001.SZ", "20240103"), 9.7)
+        self.assertEqual(self.module.get_price("600519.SH", "2024-01-03"), 1710.5)
+        self.assertIsNone(self.module.get_price("000001.SZ", "20240105"))
+        self.assertIsNone(self.module.get_price("300750.SZ", "20240103"))
+
+        hist = self.module.get_history("000001.SZ", "20240103", "20240110")
+        self.assertEqual(hist["trade_date"].tolist(), ["20240103", "20240104"])
+        self.assertTrue(self.module.get_history("000001.SZ", "20230101", "20231231").empty)
+
+    def test_parsed_once_and_cached_on_disk(self):
+        with patch.object(LocalDataModule, "_read_markdown_table", wraps=self.module._read_markdown_table) as parse:
+            for _ in range(5):
+                self.module.get_price("000001.SZ", "20240102")
+            self.module.get_table("daily")
+            self.assertEqual(parse.call_count, 1)
+
+            # 新实例直接读取 pickle 缓存，不再解析 Markdown
+            other = self.make_module()
+            self.assertEqual(other.get_price("000001.SZ", "20240104"), 9.8)
+            self.assertEqual(parse.call_count, 1)
+
+    def test_bar_store_preferred(self):
+        panel = MagicMock()
+        panel.symbol_index.return_value = 0
+        panel.price.return_value = 12.3
+        self.module.bar_store.load.return_value = panel
+        self.assertEqual(self.module.get_price("000001.SZ", "20240102"), 12.3)
+
+    def test_tushare_sync_rebuilds_the_shared_store(self):
+        from modules.core.tushare_data import TushareDataModule
+        # 同步与查询使用同一个存储实例，查询方无需重新构造即可看到新日期
+        store = LocalDataModule().bar_store
+        tushare = TushareDataModule()
+        tushare.pro = MagicMock()
+        with patch("modules.core.tushare_data.DailyBackfill") as backfill, \
+                patch.object(store, "build") as build:
+            backfill.return_value.run.return_value = {"fetched": 1}
+            tushare.sync_daily_data("20240102", "20240102")
+        build.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.metrics import MetricsRegistry, registry, DATA_CACHE, DATA_CALL_SECONDS
+from vibe_core.data.aggregator import DataAggregator
+from vibe_core.data.hybrid import HybridDataProvider
+
+
+def series(name, **labels):
+    for s in registry.snapshot()[name]["series"]:
+        if all(s["labels"].get(k) == v for k, v in labels.items()):
+            return s
+    return None
+
+
+class TestRegistry(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        reg = MetricsRegistry()
+        calls = reg.counter("x_total", "Calls", ("method",))
+        calls.labels("get").inc()
+        calls.labels("get").inc(2)
+        latency = reg.histogram("x_seconds", "Latency", ("method",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.labels('a"b').observe(value)
+
+        text = reg.render()
+        self.assertIn("# TYPE x_total counter", text)
+        self.assertIn('x_total{method="get"} 3', text)
+        self.assertIn('x_seconds_bucket{method="a\\"b",le="0.1"} 1', text)
+        self.assertIn('x_seconds_bucket{method="a\\"b",le="1"} 2', text)
+        self.assertIn('x_seconds_bucket{method="a\\"b",le="+Inf"} 3', text)
+        self.assertIn('x_seconds_count{method="a\\"b"} 3', text)
+
+        snap = reg.snapshot()["x_seconds"]["series"][0]
+        self.assertEqual(snap["p50"], 1.0)
+        self.assertAlmostEqual(snap["avg"], 5.55 / 3)
+
+        # 同名不同类型视为冲突
+        with self.assertRaises(ValueError):
+            reg.histogram("x_total", labels=("method",))
+        with self.assertRaises(ValueError):
+            calls.labels("a", "b")
+
+    def test_recording_overhead_is_small(self):
+        child = MetricsRegistry().histogram("y_seconds", labels=("m",))
+        n = 100_000
+        start = time.perf_counter()
+        for _ in range(n):
+            child.labels("get").observe(0.001)
+        per_call = (time.perf_counter() - start) / n
+        self.assertLess(per_call, 20e-6)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_aggregator_cache_results(self):
+        provider = MagicMock()
+        provider.__class__.__name__ = "MetricsTestProvider"
+        provider.get_table.return_value = pd.DataFrame({"a": range(5)})
+        agg = DataAggregator(provider, cache_ttl=60)
+        agg.get_table("t")
+        agg.get_table("t")
+        agg.get_table("t")
+        hits = DATA_CACHE.labels("MetricsTestProvider", "get_table_t", "hit").value
+        misses = DATA_CACHE.labels("MetricsTestProvider", "get_table_t", "miss").value
+        self.assertEqual((hits, misses), (2, 1))
+        rows = series("vibe_data_payload_rows", provider="MetricsTestProvider", method="get_table_t")
+        self.assertEqual(rows["count"], 1)
+        self.assertEqual(rows["sum"], 5)
+
+    def test_hybrid_times_routed_calls(self):
+        provider = MagicMock()
+        provider.get_limit_up_pool.return_value = pd.DataFrame({"代码": ["000001", "000002"]})
+        hybrid = HybridDataProvider()
+        hybrid.register_provider("akshare", provider)
+        before = DATA_CALL_SECONDS.labels("akshare", "get_limit_up_pool").count
+        hybrid.get_limit_up_pool()
+        self.assertEqual(DATA_CALL_SECONDS.labels("akshare", "get_limit_up_pool").count, before + 1)
+
+    def test_metrics_endpoint_and_widget_summary(self):
+        from vibe_core.server.server import get_metrics
+        from modules.prod.system_metrics import SystemMetricsModule
+
+        response = asyncio.run(get_metrics())
+        self.assertIn(b"vibe_data_call_seconds", response.body)
+
+        DATA_CALL_SECONDS.labels("widget_test", "slow_call").observe(1000.0)
+        module = SystemMetricsModule()
+        module.context = MagicMock()
+        summary = module.summary()
+        top = summary["data_calls"][0]
+        self.assertEqual((top["provider"], top["method"]), ("widget_test", "slow_call"))
+        self.assertEqual(top["p95_ms"], 30000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
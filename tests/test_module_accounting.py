@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.accounting import ModuleAccounting, accounting, state_size
+from vibe_core.context import Context
+from vibe_core.data.hybrid import HybridDataProvider
+from vibe_core.event import Event
+from vibe_core.module import VibeModule
+from vibe_core.services.module_loader import ModuleLoaderService
+
+
+class BusyModule(VibeModule):
+    def __init__(self):
+        super().__init__()
+        self.cache = {"frame": pd.DataFrame({"a": np.zeros(10_000)})}
+
+    def configure(self):
+        pass
+
+    def on_event(self, event):
+        self.process()
+
+    def process(self):
+        self.context.data.get_table("t")
+        deadline = time.thread_time() + 0.02
+        while time.thread_time() < deadline:
+            pass
+        time.sleep(0.02)
+        self.context.broadcast_ui("busy_widget", {"x": 1})
+
+    def get_ui_config(self):
+        return {"id": "busy_widget", "name": "Busy", "component": "BusyWidget"}
+
+
+class TestAccounting(unittest.TestCase):
+    def test_wrap_measures_cpu_wall_and_errors(self):
+        acc = ModuleAccounting()
+
+        def work(fail=False):
+            time.sleep(0.02)
+            if fail:
+                raise ValueError("boom")
+
+        wrapped = acc.wrap("m", work)
+        wrapped()
+        with self.assertRaises(ValueError):
+            wrapped(fail=True)
+        stats = acc.stats("m").to_dict()
+        self.assertEqual((stats["calls"], stats["errors"]), (2, 1))
+        self.assertGreaterEqual(stats["wall_seconds"], 0.04)
+        # 睡眠不占 CPU
+        self.assertLess(stats["cpu_seconds"], stats["wall_seconds"])
+        self.assertIsNone(acc.current())
+
+    def test_state_size_counts_frames_once(self):
+        frame = pd.DataFrame({"a": np.zeros(1000)})
+        single = state_size({"x": frame})
+        self.assertGreaterEqual(single, 8000)
+        self.assertLess(state_size({"x": frame, "y": frame, "z": [frame]}) - single, 1000)
+        # 共享对象 (Context、数据层) 不计入模块
+        self.assertEqual(state_size(Context()), 0)
+
+
+class TestLoaderAccounting(unittest.TestCase):
+    def setUp(self):
+        self.ctx = Context()
+        self.ctx.data = HybridDataProvider()
+        provider = MagicMock()
+        provider.get_table.return_value = pd.DataFrame()
+        self.ctx.data.register_provider("local", provider)
+        self.loader = ModuleLoaderService(self.ctx)
+        self.loader.available_classes["BusyModule"] = BusyModule
+
+    def tearDown(self):
+        self.loader._stop_instance("busy_1")
+
+    def test_instance_usage_is_attributed(self):
+        self.loader._start_instance("busy_1", "BusyModule", {})
+        module = self.loader.active_instances["busy_1"]
+        module.on_event(Event(event_type="TIMER", topic="timer"))
+        module.on_event(Event(event_type="TIMER", topic="timer"))
+
+        # 推送在事件循环中序列化，这里直接模拟 WebSocketManager 的记账
+        accounting.record_broadcast("busy_widget", 100)
+
+        row = next(r for r in accounting.report() if r["id"] == "busy_1")
+        # initialize 计一次，两次 on_event (内部的 process 不重复计)
+        self.assertEqual(row["calls"], 3)
+        self.assertEqual(row["data_calls"], 2)
+        self.assertGreaterEqual(row["cpu_seconds"], 0.04)
+        self.assertGreaterEqual(row["wall_seconds"], 0.08)
+        self.assertEqual((row["broadcasts"], row["broadcast_bytes"]), (1, 100))
+        self.assertEqual(row["class"], "BusyModule")
+        self.assertGreaterEqual(row["state_bytes"], 80_000)
+
+        # 模块代码之外的数据调用不计入任何实例
+        self.ctx.data.get_table("t")
+        self.assertEqual(accounting.stats("busy_1").data_calls, 2)
+
+    def test_modules_endpoint(self):
+        from vibe_core.server.server import get_modules
+        self.loader._start_instance("busy_1", "BusyModule", {})
+        rows = json.loads(asyncio.run(get_modules()).body)
+        self.assertIn("busy_1", [r["id"] for r in rows])
+
+        self.loader._stop_instance("busy_1")
+        rows = json.loads(asyncio.run(get_modules(state=False)).body)
+        self.assertNotIn("busy_1", [r["id"] for r in rows])
+
+    def test_metrics_widget_rows_match_endpoint(self):
+        from vibe_core.server.server import get_modules
+        from modules.prod.system_metrics import SystemMetricsModule
+        self.loader._start_instance("busy_1", "BusyModule", {})
+        self.loader.active_instances["busy_1"].on_event(None)
+
+        widget = SystemMetricsModule()
+        widget.context = self.ctx
+        pushed = widget.summary()["modules"]
+        rows = json.loads(asyncio.run(get_modules()).body)[:widget.top_n]
+        # 看板表格首屏取 /api/modules，之后用推送刷新，两者行格式必须一致
+        self.assertEqual([r["id"] for r in pushed], [r["id"] for r in rows])
+        busy = next(r for r in pushed if r["id"] == "busy_1")
+        for key in ("calls", "cpu_seconds", "avg_wall_ms", "max_wall_ms", "data_calls", "broadcast_bytes", "state_bytes"):
+            self.assertIn(key, busy)
+            self.assertIn(key, next(r for r in rows if r["id"] == "busy_1"))
+        self.loader._stop_instance("busy_1")
+
+
+if __name__ == '__main__':
+    unittest.main()
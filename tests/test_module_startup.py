@@ -0,0 +1,206 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import unittest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.accounting import accounting
+from vibe_core.context import Context
+from vibe_core.module import VibeModule
+from vibe_core.services.module_loader import ModuleLoaderService
+
+STARTED = {}
+
+
+class SlowModule(VibeModule):
+    """configure 中模拟一次网络请求"""
+    dependencies = []
+    delay = 0.2
+
+    def configure(self):
+        start = time.perf_counter()
+        time.sleep(self.delay)
+        STARTED[self.name] = (start, time.perf_counter())
+
+    def on_event(self, event):
+        pass
+
+
+class FeedA(SlowModule):
+    pass
+
+
+class FeedB(SlowModule):
+    pass
+
+
+class FeedC(SlowModule):
+    pass
+
+
+class Dashboard(SlowModule):
+    dependencies = ["FeedA"]
+
+
+class Orphan(SlowModule):
+    dependencies = ["MissingModule"]
+
+
+class LazyFeed(SlowModule):
+    lazy = True
+
+
+class LazyPanel(SlowModule):
+    lazy = True
+    dependencies = ["LazyFeed"]
+
+    def get_ui_config(self):
+        return {"id": "lazy_panel", "name": "Lazy", "component": "LazyPanelWidget"}
+
+
+class EagerPanel(SlowModule):
+    dependencies = ["LazyFeed"]
+
+
+class GatedPanel(SlowModule):
+    """启动时阻塞在 gate 上，模拟耗时的按需激活"""
+    lazy = True
+    configured = 0
+    entered = threading.Event()
+    gate = threading.Event()
+
+    def configure(self):
+        type(self).configured += 1
+        self.entered.set()
+        self.gate.wait(3)
+
+    def get_ui_config(self):
+        return {"id": "gated_panel", "component": "GatedPanelWidget"}
+
+
+class BrokenPanel(SlowModule):
+    delay = 0
+
+    def configure(self):
+        raise RuntimeError("feed unavailable")
+
+    def get_ui_config(self):
+        return {"id": "broken_panel", "component": "BrokenPanelWidget"}
+
+
+def make_loader(*classes):
+    loader = ModuleLoaderService(Context(), max_workers=8)
+    for cls in classes:
+        loader.available_classes[cls.__name__] = cls
+    return loader
+
+
+def item(cls, **extra):
+    return {"id": cls.__name__, "module": cls.__name__, "config": {}, **extra}
+
+
+class TestParallelStartup(unittest.TestCase):
+    def setUp(self):
+        STARTED.clear()
+
+    def test_independent_instances_start_concurrently(self):
+        loader = make_loader(FeedA, FeedB, FeedC, Dashboard, Orphan)
+        start = time.perf_counter()
+        pending = loader._start_ready([item(Dashboard), item(FeedA), item(FeedB), item(FeedC), item(Orphan)])
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([i["id"] for i in pending], ["Orphan"])
+        self.assertEqual(set(loader.active_instances), {"FeedA", "FeedB", "FeedC", "Dashboard"})
+        # 三个无依赖实例并行 (0.2s)，依赖 FeedA 的 Dashboard 随后启动 (0.2s)；串行需要 0.8s
+        self.assertLess(elapsed, 0.6)
+        self.assertGreaterEqual(STARTED["Dashboard"][0], STARTED["FeedA"][1])
+
+    def test_single_worker_is_serial(self):
+        loader = make_loader(FeedA, Dashboard)
+        loader.max_workers = 1
+        loader._start_ready([item(Dashboard), item(FeedA)])
+        self.assertEqual(set(loader.active_instances), {"FeedA", "Dashboard"})
+
+    def test_failed_start_leaves_no_registrations(self):
+        loader = make_loader(FeedA, BrokenPanel)
+        loader._start_ready([item(FeedA), item(BrokenPanel)])
+        self.assertEqual(set(loader.active_instances), {"FeedA"})
+        # 不留下消息路由与资源统计中的幽灵实例
+        self.assertNotIn("broken_panel", loader.context._module_registry)
+        self.assertNotIn("BrokenPanel", [row["id"] for row in accounting.report()])
+        self.assertIn("FeedA", [row["id"] for row in accounting.report()])
+        loader._stop_instance("FeedA")
+
+
+class TestLazyStartup(unittest.TestCase):
+    def setUp(self):
+        STARTED.clear()
+
+    def test_lazy_instance_starts_on_widget_subscription(self):
+        loader = make_loader(FeedA, LazyFeed, LazyPanel)
+        loader._instantiate_modules()
+        self.assertIn("FeedA", loader.active_instances)
+        self.assertNotIn("LazyPanel", loader.active_instances)
+        self.assertEqual(set(loader.lazy_instances), {"LazyFeed", "LazyPanel"})
+
+        self.assertFalse(loader.activate_widget("unknown_widget"))
+        # 仪表盘订阅通过 Context 路由到 loader
+        asyncio.run(loader.context.handle_client_message({"type": "subscribe", "widget_id": "lazy_panel"}))
+
+        deadline = time.time() + 3
+        while "LazyPanel" not in loader.active_instances and time.time() < deadline:
+            time.sleep(0.01)
+        # 延迟加载的依赖一并启动，且先于依赖方
+        self.assertIn("LazyPanel", loader.active_instances)
+        self.assertIn("LazyFeed", loader.active_instances)
+        self.assertGreaterEqual(STARTED["LazyPanel"][0], STARTED["LazyFeed"][1])
+        self.assertEqual(loader.lazy_instances, {})
+        self.assertFalse(loader.activate_widget("lazy_panel"))
+
+        for iid in list(loader.active_instances):
+            loader._stop_instance(iid)
+
+    def test_eager_dependant_starts_its_lazy_dependency(self):
+        loader = make_loader(LazyFeed, LazyPanel, EagerPanel)
+        loader._instantiate_modules()
+        # 非延迟实例依赖延迟实例: 依赖被提前启动，而不是让依赖方永远等待
+        self.assertEqual(set(loader.active_instances), {"LazyFeed", "EagerPanel"})
+        self.assertGreaterEqual(STARTED["EagerPanel"][0], STARTED["LazyFeed"][1])
+        self.assertEqual(set(loader.lazy_instances), {"LazyPanel"})
+        self.assertEqual(set(loader._lazy_widgets.values()), {"LazyPanel"})
+
+        for iid in list(loader.active_instances):
+            loader._stop_instance(iid)
+
+    def test_reload_during_activation_does_not_requeue_instance(self):
+        GatedPanel.configured = 0
+        GatedPanel.entered.clear()
+        GatedPanel.gate.clear()
+        loader = make_loader(FeedA, GatedPanel)
+        loader._instantiate_modules()
+        self.assertTrue(loader.activate_widget("gated_panel"))
+        self.assertTrue(GatedPanel.entered.wait(3))
+
+        # 激活尚未完成时热重载再次对账: 不应把它放回延迟集合
+        loader._instantiate_modules()
+        self.assertNotIn("GatedPanel", loader.lazy_instances)
+        self.assertFalse(loader.activate_widget("gated_panel"))
+
+        GatedPanel.gate.set()
+        deadline = time.time() + 3
+        while "GatedPanel" not in loader.active_instances and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertIn("GatedPanel", loader.active_instances)
+        self.assertEqual(GatedPanel.configured, 1)
+        self.assertEqual(loader._activating, set())
+
+        for iid in list(loader.active_instances):
+            loader._stop_instance(iid)
+
+
+if __name__ == '__main__':
+    unittest.main()
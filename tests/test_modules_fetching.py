@@ -137,3 +137,41 @@ def test_limit_up_monitor_task(mock_context, data_module):
 
     except Exception as e:
         pytest.fail(f"LimitUpMonitor._run_task failed: {e}")
+
+
+def test_intraday_limit_pools_are_cached(monkeypatch):
+    """炸板/跌停池与涨停池一样在 TTL 内复用，历史日期不缓存。"""
+    from modules.core.akshare_data import base
+    from modules.core.akshare_data.realtime import limit
+    from vibe_core.clock import VirtualClock, set_clock
+    from modules.beta.market_heatmap import MarketHeatmapModule
+
+    fake_ak = MagicMock()
+    fake_ak.stock_zt_pool_zbgc_em.return_value = pd.DataFrame({"代码": ["000001"]})
+    fake_ak.stock_dt_pool_em.return_value = pd.DataFrame({"代码": ["000002"]})
+    monkeypatch.setattr(base, "ak", fake_ak)
+    monkeypatch.setattr(limit, "ak", fake_ak)
+    clock = set_clock(VirtualClock(datetime.datetime(2026, 1, 13, 10, 0), speed=0))
+    try:
+        board = AkShareDataModule(MockContext())
+        for _ in range(3):
+            assert board.get_broken_limit_pool()["代码"].tolist() == ["000001"]
+            assert board.get_limit_down_pool()["代码"].tolist() == ["000002"]
+        assert fake_ak.stock_zt_pool_zbgc_em.call_count == 1
+        assert fake_ak.stock_dt_pool_em.call_count == 1
+
+        board.get_broken_limit_pool("20260112")
+        board.get_broken_limit_pool("20260112")
+        assert fake_ak.stock_zt_pool_zbgc_em.call_count == 3
+
+        # 按热力图的真实轮询间隔推进: 下一次轮询仍命中缓存
+        interval = MarketHeatmapModule().interval
+        clock.advance(interval)
+        board.get_limit_down_pool()
+        assert fake_ak.stock_dt_pool_em.call_count == 1
+
+        clock.advance(board.pool_cache_ttl - interval)
+        board.get_limit_down_pool()
+        assert fake_ak.stock_dt_pool_em.call_count == 2
+    finally:
+        set_clock(None)
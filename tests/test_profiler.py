@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+import unittest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.profiler import StackSampler, module_of
+
+# 编译到 modules/ 路径下的忙循环，模拟一个模块的热点
+BUSY_SOURCE = '''
+def busy(stop):
+    x = 0
+    while not stop.is_set():
+        for i in range(1000):
+            x += i * i
+'''
+
+
+def make_busy(filename):
+    namespace = {}
+    exec(compile(BUSY_SOURCE, filename, "exec"), namespace)
+    return namespace["busy"]
+
+
+class TestProfiler(unittest.TestCase):
+    def test_module_of(self):
+        self.assertEqual(module_of("/srv/vibe/modules/beta/market_heatmap/__init__.py"), "market_heatmap")
+        self.assertEqual(module_of("C:\\vibe\\modules\\prod\\tushare_sync.py"), "tushare_sync")
+        self.assertIsNone(module_of("/srv/vibe/vibe_core/context.py"))
+
+    def test_samples_attribute_busy_module_and_skip_idle(self):
+        stop = threading.Event()
+        busy = make_busy(os.path.join(os.getcwd(), "modules", "beta", "hot_module", "__init__.py"))
+        worker = threading.Thread(target=busy, args=(stop,), name="scheduler:HotModule", daemon=True)
+        idle = threading.Thread(target=stop.wait, name="idle-waiter", daemon=True)
+        worker.start()
+        idle.start()
+
+        sampler = StackSampler(interval=0.002)
+        sampler.start()
+        time.sleep(0.3)
+        sampler.stop()
+        stop.set()
+        worker.join()
+
+        summary = sampler.summary()
+        self.assertGreater(summary["samples"], 10)
+        modules = {m["module"]: m["samples"] for m in summary["by_module"]}
+        self.assertIn("hot_module", modules)
+        self.assertTrue(any(f["frame"].startswith("busy (") for f in summary["top_functions"]))
+
+        folded = sampler.folded()
+        self.assertIn("scheduler:HotModule;", folded)
+        self.assertNotIn("idle-waiter", folded)
+        line = folded.splitlines()[0]
+        self.assertTrue(line.rsplit(" ", 1)[1].isdigit())
+
+    def test_profile_endpoint(self):
+        from vibe_core.server.server import get_profile
+        response = asyncio.run(get_profile(format="json", seconds=0.1, interval_ms=2))
+        summary = json.loads(response.body)
+        self.assertFalse(summary["running"])
+        self.assertGreaterEqual(summary["elapsed"], 0.1)
+        folded = asyncio.run(get_profile(format="folded"))
+        self.assertIn("attachment", folded.headers["content-disposition"])
+
+
+if __name__ == '__main__':
+    unittest.main()
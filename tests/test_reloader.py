@@ -0,0 +1,177 @@
+import gc
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import weakref
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.context import Context
+from vibe_core.services.module_loader import ModuleLoaderService
+from vibe_core.services.reloader import ModuleReloader
+
+PACKAGE_INIT = '''
+from vibe_core.module import VibeModule
+from .adapter import Adapter
+from .helpers import VERSION
+
+
+class ReloadModule(VibeModule, Adapter):
+    def __init__(self):
+        super().__init__()
+        self.counter = 0
+
+    def on_event(self, event):
+        self.counter += 1
+
+    def migrate_state(self, previous):
+        self.counter = previous.counter
+'''
+
+ADAPTER = '''
+from .realtime.limit import Board
+
+
+class Adapter(Board):
+    pass
+'''
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def bump(path):
+    mtime = os.path.getmtime(path) + 5
+    os.utime(path, (mtime, mtime))
+
+
+class ReloaderCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.package = os.path.join(self.root, "beta", "reload_pkg")
+        self.init = os.path.join(self.package, "__init__.py")
+        write(self.init, PACKAGE_INIT)
+        write(os.path.join(self.package, "adapter.py"), ADAPTER)
+        write(os.path.join(self.package, "helpers.py"), "VERSION = 1\n")
+        write(os.path.join(self.package, "realtime", "limit.py"), "class Board:\n    LIMIT = 1\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class TestModuleReloader(ReloaderCase):
+    def setUp(self):
+        super().setUp()
+        self.reloader = ModuleReloader()
+
+    def tearDown(self):
+        self.reloader.unload(self.init)
+        super().tearDown()
+
+    def test_only_changed_submodules_are_reexecuted(self):
+        root = self.reloader.load(self.init)
+        name = root.__name__
+        self.assertEqual(name, "vibe_mod_beta_reload_pkg")
+        helpers = sys.modules[f"{name}.helpers"]
+        limit = sys.modules[f"{name}.realtime.limit"]
+
+        write(os.path.join(self.package, "realtime", "limit.py"), "class Board:\n    LIMIT = 2\n")
+        bump(os.path.join(self.package, "realtime", "limit.py"))
+        root = self.reloader.load(self.init)
+
+        self.assertEqual(root.ReloadModule.LIMIT, 2)
+        # 未变化且不依赖变化模块的子模块被复用
+        self.assertIs(sys.modules[f"{name}.helpers"], helpers)
+        self.assertIs(root.helpers, helpers)
+        # 变化的子模块与引用它的 adapter 重新执行
+        self.assertIsNot(sys.modules[f"{name}.realtime.limit"], limit)
+
+    def test_repeated_reloads_keep_a_flat_footprint(self):
+        root = self.reloader.load(self.init)
+        old = weakref.ref(root)
+        del root
+        modules, path = len(sys.modules), list(sys.path)
+        for _ in range(5):
+            bump(os.path.join(self.package, "helpers.py"))
+            self.reloader.load(self.init)
+        gc.collect()
+        self.assertEqual(len(sys.modules), modules)
+        self.assertEqual(sys.path, path)
+        self.assertIsNone(old())
+
+        self.reloader.unload(self.init)
+        self.assertFalse([m for m in sys.modules if m.startswith("vibe_mod_beta_reload_pkg")])
+
+    def test_sys_path_imports_are_tracked(self):
+        legacy = os.path.join(self.root, "beta", "legacy_pkg")
+        init = os.path.join(legacy, "__init__.py")
+        write(init, "import os, sys\nsys.path.append(os.path.dirname(__file__))\nfrom legacy_helper import VALUE\n")
+        write(os.path.join(legacy, "legacy_helper.py"), "VALUE = 1\n")
+        path_len = len(sys.path)
+        for value in (2, 3):
+            write(os.path.join(legacy, "legacy_helper.py"), f"VALUE = {value}\n")
+            bump(os.path.join(legacy, "legacy_helper.py"))
+            self.assertEqual(self.reloader.load(init).VALUE, value)
+        self.assertEqual(len(sys.path), path_len + 1)
+        self.reloader.unload(init)
+        self.assertEqual(len(sys.path), path_len)
+        self.assertNotIn("legacy_helper", sys.modules)
+
+    def test_normally_imported_package_files_are_left_alone(self):
+        # 同一目录下的文件已被进程以常规名称导入 (如 modules.core.akshare_data.base)
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("external_helpers", os.path.join(self.package, "helpers.py"))
+        external = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(external)
+        sys.modules["external_helpers"] = external
+        try:
+            self.reloader.load(self.init)
+            bump(os.path.join(self.package, "helpers.py"))
+            self.reloader.load(self.init)
+            self.reloader.unload(self.init)
+            self.assertIs(sys.modules.get("external_helpers"), external)
+        finally:
+            sys.modules.pop("external_helpers", None)
+
+    def test_failed_import_leaves_nothing_behind(self):
+        write(self.init, PACKAGE_INIT + "\nraise RuntimeError('broken')\n")
+        with self.assertRaises(RuntimeError):
+            self.reloader.load(self.init)
+        self.assertFalse([m for m in sys.modules if m.startswith("vibe_mod_beta_reload_pkg")])
+
+
+class TestLoaderReload(ReloaderCase):
+    def test_running_instance_is_restarted_with_migrated_state(self):
+        loader = ModuleLoaderService(Context())
+        loader.watch_dirs = [os.path.join(self.root, "beta")]
+        try:
+            loader._scan_definitions()
+            loader._start_instance("reload_1", "ReloadModule", {"x": 1})
+            old = loader.active_instances["reload_1"]
+            old.on_event(None)
+            old.on_event(None)
+
+            write(os.path.join(self.package, "helpers.py"), "VERSION = 2\n")
+            bump(os.path.join(self.package, "helpers.py"))
+            self.assertTrue(loader._scan_definitions())
+
+            new = loader.active_instances["reload_1"]
+            self.assertIsNot(new, old)
+            self.assertIs(type(new), loader.available_classes["ReloadModule"])
+            self.assertEqual(new.counter, 2)
+            self.assertEqual(new.config["x"], 1)
+            self.assertEqual(sys.modules["vibe_mod_beta_reload_pkg"].VERSION, 2)
+        finally:
+            for iid in list(loader.active_instances):
+                loader._stop_instance(iid)
+            loader.reloader.unload(self.init)
+
+
+if __name__ == '__main__':
+    unittest.main()
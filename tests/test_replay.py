@@ -0,0 +1,100 @@
+import os
+import sys
+import shutil
+import tempfile
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.clock import VirtualClock
+from vibe_core.data.bar_store import get_bar_store
+from vibe_core.data.hybrid import HybridDataProvider
+from vibe_core.data.replay import ReplayDataProvider, TimedArchive
+
+DAY = datetime.datetime(2026, 1, 19)
+
+
+def pool(codes):
+    return pd.DataFrame({"代码": codes, "名称": [f"S{c}" for c in codes], "连板数": [1] * len(codes),
+                         "涨跌幅": [10.0] * len(codes)})
+
+
+class TestReplayProvider(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.clock = VirtualClock(DAY.replace(hour=9, minute=20), speed=0)
+        limit = TimedArchive(os.path.join(self.tmp, "limit"), "limit_up")
+        limit.write(pool(["000001"]), DAY.replace(hour=9, minute=30))
+        limit.write(pool(["000001", "600519"]), DAY.replace(hour=10))
+        limit.write(pool(["300750"]), DAY.replace(year=2026, day=16, hour=15))
+
+        recorder_dir = os.path.join(self.tmp, "realtime")
+        os.makedirs(recorder_dir)
+        pd.DataFrame([
+            {"code": "600519", "name": "茅台", "price": 1500.0, "change": 0.5, "open": 1490, "high": 1501,
+             "low": 1489, "vol": 100, "timestamp": DAY.replace(hour=9, minute=31).isoformat()},
+            {"code": "000001", "name": "平安", "price": 10.0, "change": 1.0, "open": 9.9, "high": 10.1,
+             "low": 9.8, "vol": 200, "timestamp": DAY.replace(hour=9, minute=31).isoformat()},
+            {"code": "600519", "name": "茅台", "price": 1510.0, "change": 1.2, "open": 1490, "high": 1511,
+             "low": 1489, "vol": 300, "timestamp": DAY.replace(hour=9, minute=32).isoformat()},
+        ]).to_csv(os.path.join(recorder_dir, "20260119.csv"), index=False)
+
+        sectors_path = os.path.join(self.tmp, "em_sectors.csv")
+        pd.DataFrame({"板块名称": ["银行"], "涨跌幅": [0.3]}).to_csv(sectors_path, index=False)
+
+        self.provider = ReplayDataProvider(clock=self.clock, limit_dir=os.path.join(self.tmp, "limit"),
+                                           sector_dir=os.path.join(self.tmp, "sectors"),
+                                           recorder_dir=recorder_dir, sectors_path=sectors_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_limit_pool_follows_clock(self):
+        self.assertTrue(self.provider.get_limit_up_pool().empty)
+        self.clock.set(DAY.replace(hour=9, minute=45))
+        self.assertEqual(self.provider.get_limit_up_pool()["代码"].tolist(), ["000001"])
+        self.clock.set(DAY.replace(hour=14))
+        self.assertEqual(self.provider.get_limit_up_pool()["代码"].tolist(), ["000001", "600519"])
+        # 历史日期取当日最后一份，代码保持字符串 (前导 0)
+        self.assertEqual(self.provider.get_limit_up_pool("20260116")["代码"].tolist(), ["300750"])
+
+    def test_snapshots_as_of_clock(self):
+        self.clock.set(DAY.replace(hour=9, minute=31, second=30))
+        self.assertEqual(self.provider.get_price("600519.SH"), 1500.0)
+        self.clock.set(DAY.replace(hour=9, minute=40))
+        snapshot = self.provider.get_snapshot(["600519.SH", "000001.SZ", "000002.SZ"])
+        self.assertEqual({row["code"]: row["price"] for row in snapshot}, {"600519": 1510.0, "000001": 10.0})
+        full = self.provider.get_full_snapshot()
+        self.assertEqual(sorted(full["代码"]), ["000001", "600519"])
+        self.assertIn("最新价", full.columns)
+
+    def test_sectors_archive_and_fallback(self):
+        self.assertEqual(self.provider.get_em_sectors()["板块名称"].tolist(), ["银行"])
+        self.provider.sectors.write(pd.DataFrame({"板块名称": ["半导体"], "涨跌幅": [2.0]}), DAY.replace(hour=9, minute=25))
+        self.clock.set(DAY.replace(hour=9, minute=30))
+        self.assertEqual(self.provider.get_em_sectors()["板块名称"].tolist(), ["半导体"])
+
+    def test_history_reuses_one_store_up_to_replay_day(self):
+        self.assertIs(self.provider.bar_store, get_bar_store())
+        with patch.object(self.provider.bar_store, "get_history", return_value=pd.DataFrame()) as history:
+            self.provider.get_history("600519.SH", "2026-01-01", "20260131")
+            self.provider.get_history("000001.SZ", None, None)
+        self.assertEqual(history.call_args_list[0].args, ("600519.SH", "20260101", "20260119"))
+        self.assertEqual(history.call_args_list[1].args, ("000001.SZ", None, "20260119"))
+
+    def test_pinned_registration_in_hybrid(self):
+        hybrid = HybridDataProvider()
+        for name in ("akshare", "sina"):
+            hybrid.register_provider(name, self.provider, pinned=True)
+        hybrid.register_provider("akshare", MagicMock())  # 数据模块加载时的注册被忽略
+        self.clock.set(DAY.replace(hour=10, minute=30))
+        self.assertEqual(len(hybrid.get_limit_up_pool()), 2)
+        self.assertEqual(len(hybrid.get_snapshot(["600519"])), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
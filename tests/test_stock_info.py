@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import tempfile
+import threading
+import datetime
+import unittest
+import pandas as pd
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from modules.core.stock_info import StockInfoModule
+
+
+def make_info(name, province, industry):
+    return {
+        "org_short_name_cn": name,
+        "provincial_name": province,
+        "affiliate_industry": {"ind_code": "BK0000", "ind_name": industry},
+        "listed_date": 1001520000000,
+    }
+
+
+class TestStockInfoMany(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.root, "stock_info.db")
+        today = datetime.date.today().isoformat()
+
+        writer = self.make_module()
+        writer._save_to_db("SH600519", today, make_info("贵州茅台", "贵州省", "白酒"))
+        writer._save_to_db("SZ000001", today, make_info("平安银行", "广东省", "银行"))
+        writer._save_to_db("SZ000002", "2000-01-01", make_info("万科A", "广东省", "房地产"))
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def make_module(self):
+        module = StockInfoModule(db_path=self.db_path)
+        module._init_db()
+        return module
+
+    def test_batch_lookup_fields_and_order(self):
+        module = self.make_module()
+        df = module.get_stock_info_many(["000001", 600519, "000002", "300750"])
+
+        self.assertEqual(list(df["code"]), ["000001", "600519", "000002", "300750"])
+        self.assertEqual(list(df["province"][:2]), ["广东省", "贵州省"])
+        self.assertEqual(df.loc[1, "industry"], "白酒")
+        self.assertEqual(df.loc[1, "listed_date"], "2001-09-27")
+        # 过期和库中不存在的都视为缺失
+        self.assertTrue(df["province"][2:].isna().all())
+        module.close()
+
+    def test_misses_are_queried_once(self):
+        module = self.make_module()
+        module.get_stock_info_many(["600519"])
+
+        statements = []
+        module._get_conn().set_trace_callback(statements.append)
+        module.get_stock_info_many(["600519", "300750", "688001"])
+        module.get_stock_info_many(["600519", "300750", "688001"])
+        selects = [s for s in statements if s.startswith("SELECT")]
+        self.assertEqual(len(selects), 1)
+        self.assertIn("IN (", selects[0])
+
+        # 其他写入方写入后，通过 _save_to_db 写入的记录立即可见
+        module._save_to_db("SZ300750", datetime.date.today().isoformat(), make_info("宁德时代", "福建省", "电池"))
+        self.assertEqual(module.get_stock_info_many(["300750"]).loc[0, "province"], "福建省")
+        module.close()
+
+    def test_region_pie_uses_batch_lookup(self):
+        from modules.beta.region_pie import RegionPieModule
+        module = self.make_module()
+        context = MagicMock()
+        context.data.get_limit_up_pool.return_value = pd.DataFrame({"代码": ["600519", "000001", "000002"]})
+        context.data.get_stock_info_many.side_effect = module.get_stock_info_many
+
+        pie = RegionPieModule(context)
+        pie.process()
+
+        context.data.get_stock_info.assert_not_called()
+        channel, payload = context.broadcast_ui.call_args[0]
+        self.assertEqual(channel, "region_pie")
+        self.assertEqual(sorted(p["name"] for p in payload), ["广东省", "贵州省"])
+        # 过期的 000002 交给后台预取队列
+        context.data.prefetch_stock_info.assert_called_once_with(["000002"], priority=0)
+        module.close()
+
+
+class TestStockInfoPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.module = StockInfoModule(db_path=os.path.join(self.root, "stock_info.db"))
+        self.module._init_db()
+        self.module.prefetch_workers = 1
+        self.module.prefetch_rate = 1000
+        self.module.save_many({"SH600519": make_info("贵州茅台", "贵州省", "白酒")})
+
+        self.fetched = []
+
+        def fake_fetch(code):
+            self.fetched.append(code)
+            data = make_info(code, "浙江省", "测试")
+            self.module._save_to_db(self.module._format_symbol_for_xq(code), datetime.date.today().isoformat(), data)
+            return data
+        self.module._fetch_remote = fake_fetch
+
+    def tearDown(self):
+        self.module.stop_prefetch()
+        self.module.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def wait_idle(self, timeout=5.0):
+        deadline = datetime.datetime.now() + datetime.timedelta(seconds=timeout)
+        while self.module.prefetch_pending() and datetime.datetime.now() < deadline:
+            threading.Event().wait(0.01)
+        self.assertEqual(self.module.prefetch_pending(), 0)
+
+    def test_priority_dedup_and_fresh_skip(self):
+        # 先入队、后启动工作线程，便于检查处理顺序
+        with patch.object(StockInfoModule, "start_prefetch"):
+            self.assertEqual(self.module.prefetch_stock_info(["000001", "000002", "600519"], priority=9), 2)
+            self.assertEqual(self.module.prefetch_stock_info(["000001"], priority=9), 0)
+            self.assertEqual(self.module.prefetch_stock_info(["000002", "300750"], priority=0), 2)
+        self.module.start_prefetch()
+        self.wait_idle()
+
+        self.assertEqual(self.fetched, ["000002", "300750", "000001"])
+        self.assertEqual(self.module.prefetch_stats["fetched"], 3)
+        self.assertEqual(self.module.get_stock_info_many(["300750"]).loc[0, "province"], "浙江省")
+
+    def test_refresh_requeues_records_near_expiry(self):
+        near = (datetime.date.today() - datetime.timedelta(days=self.module.cache_validity_days - 1)).isoformat()
+        self.module.save_many({"SZ000001": make_info("平安银行", "广东省", "银行")}, near)
+        self.assertEqual(self.module.schedule_refresh(), 1)
+        self.wait_idle()
+        self.assertEqual(self.fetched, ["000001"])
+
+
+class TestStockInfoSchema(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.root, "stock_info.db")
+        # 旧版表结构: 只有 JSON blob
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TABLE stock_detail (symbol TEXT PRIMARY KEY, updated_at TEXT, data TEXT)")
+            conn.executemany("INSERT INTO stock_detail VALUES (?, ?, ?)", [
+                ("SH600519", "2026-01-01", json.dumps(make_info("贵州茅台", "贵州省", "白酒"), ensure_ascii=False)),
+                ("SZ002594", "2026-01-01", json.dumps(make_info("比亚迪", "广东省", "汽车整车"), ensure_ascii=False)),
+                ("SZ000001", "2026-01-01", json.dumps({"org_short_name_cn": "平安银行"}, ensure_ascii=False)),
+            ])
+        self.module = StockInfoModule(db_path=self.db_path)
+        self.module._init_db()
+
+    def tearDown(self):
+        self.module.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_db_path_from_instance_config(self):
+        module = StockInfoModule()
+        self.assertEqual(module.db_path, StockInfoModule.default_db_path)
+        module.config = {"db_path": os.path.join(self.root, "configured.db")}
+        with patch.object(StockInfoModule, "_ensure_code_map"), patch.object(StockInfoModule, "warm_cache"):
+            module.initialize(MagicMock())
+        module.on_stop()
+        self.assertEqual(module.db_path, os.path.join(self.root, "configured.db"))
+        with sqlite3.connect(module.db_path) as conn:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        self.assertEqual(tables, {"stock_detail", "stock_code_name"})
+
+    def test_migration_backfills_typed_columns(self):
+        conn = self.module._get_conn()
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 1)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        row = conn.execute("SELECT code, province, industry, industry_code FROM stock_detail WHERE symbol='SH600519'").fetchone()
+        self.assertEqual(row, ("600519", "贵州省", "白酒", "BK0000"))
+
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT symbol FROM stock_detail WHERE province='广东省'").fetchall()
+        self.assertIn("idx_stock_detail_province", str(plan))
+
+    def test_cross_sectional_queries(self):
+        self.assertEqual(list(self.module.query_stocks(province="广东省")["code"]), ["002594"])
+        self.assertEqual(list(self.module.query_stocks(missing="province")["name"]), ["平安银行"])
+        self.assertEqual(len(self.module.load_summary()), 3)
+        with self.assertRaises(ValueError):
+            self.module.query_stocks(missing="data")
+
+    def test_bulk_upsert(self):
+        self.module.save_many({
+            "SZ000001": make_info("平安银行", "广东省", "银行"),
+            "SZ300750": make_info("宁德时代", "福建省", "电池"),
+        }, "2026-02-01")
+        self.assertEqual(len(self.module.query_stocks(province="广东省")), 2)
+        self.assertEqual(self.module.query_stocks(industry="电池").loc[0, "updated_at"], "2026-02-01")
+        self.assertEqual(self.module._get_from_db("SZ300750")["provincial_name"], "福建省")
+
+
+class TestStockCodeNames(unittest.TestCase):
+    PAIRS = [("600519", "贵州茅台"), ("000001", "平安银行"), ("000002", "万科A"), ("600036", "招商银行")]
+    INITIALS = {"贵州茅台": "gzmt", "平安银行": "payh", "万科A": "wka", "招商银行": "zsyh"}
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.root, "stock_info.db")
+        writer = self.make_module()
+        with patch.object(StockInfoModule, "_initials", staticmethod(lambda name: self.INITIALS[name])):
+            writer.save_code_names(self.PAIRS)
+        writer.close()
+        self.module = self.make_module()
+
+    def tearDown(self):
+        self.module.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def make_module(self):
+        module = StockInfoModule(db_path=self.db_path)
+        module._init_db()
+        return module
+
+    def test_loaded_from_local_table_without_network(self):
+        import modules.core.stock_info as stock_info
+        with patch.object(stock_info, "ak", None):
+            self.assertEqual(self.module.get_stock_name("600519"), "贵州茅台")
+        self.assertEqual(self.module._code_name_map["平安银行"], "000001")
+        self.assertEqual(self.module._code_names_date, datetime.date.today().isoformat())
+
+    def test_prefix_and_pinyin_search(self):
+        search = lambda q, limit=10: [r["code"] for r in self.module.search_stocks(q, limit)]
+        self.assertEqual(search("600"), ["600036", "600519"])
+        self.assertEqual(search("000", 1), ["000001"])
+        self.assertEqual(search("GZ"), ["600519"])
+        self.assertEqual(search("平安"), ["000001"])
+        # 名称前缀不足时补充包含匹配
+        self.assertEqual(search("银行"), ["000001", "600036"])
+        self.assertEqual(search(" "), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import sys
+import re
+import json
+import asyncio
+import unittest
+from starlette.requests import Request
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from vibe_core.context import Context
+from vibe_core.module import VibeModule
+from vibe_core.services.module_loader import ModuleLoaderService
+from vibe_core.server.server import app, get_ui_registry
+from modules.core.tushare_data import TushareDataModule
+from modules.prod.system_metrics import SystemMetricsModule
+
+
+class PanelModule(VibeModule):
+    def on_event(self, event):
+        pass
+
+    def get_ui_config(self):
+        return {"id": "panel", "component": "PanelWidget", "title": "Panel", "script_path": "widget.js"}
+
+
+class LazyChartModule(PanelModule):
+    lazy = True
+
+    def get_ui_config(self):
+        return {"id": "lazy_chart", "component": "ChartWidget", "script_path": ""}
+
+
+class CountingModule(PanelModule):
+    created = 0
+
+    def __init__(self):
+        super().__init__()
+        type(self).created += 1
+
+    def get_ui_config(self):
+        return {"id": "counting", "component": "PanelWidget"}
+
+
+class ClassConfigModule(CountingModule):
+    created = 0
+
+    @classmethod
+    def get_ui_config(cls):
+        return {"id": "class_config", "component": "PanelWidget"}
+
+
+class NamedModule(PanelModule):
+    lazy = True
+
+    def get_ui_config(self):
+        # 组件 ID 取自实例名 (即实例 ID)
+        return {"id": f"{self.name}_chart", "component": "ChartWidget"}
+
+
+def registered_components(script):
+    """widget.js 中写入 window.VibeComponentRegistry 的组件名"""
+    with open(script, encoding="utf-8") as f:
+        return set(re.findall(r"VibeComponentRegistry\[['\"]([\w-]+)['\"]\]\s*=", f.read()))
+
+
+def request(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": "/api/modules/ui_registry", "headers": headers})
+
+
+class TestUIRegistry(unittest.TestCase):
+    def setUp(self):
+        self.loader = ModuleLoaderService(Context())
+        self.loader.available_classes.update({"PanelModule": PanelModule, "LazyChartModule": LazyChartModule})
+        self.loader.path_to_class_name[os.path.join("modules", "beta", "panel", "__init__.py")] = "PanelModule"
+        app.state.module_loader = self.loader
+
+    def tearDown(self):
+        del app.state.module_loader
+        for iid in list(self.loader.active_instances):
+            self.loader._stop_instance(iid)
+
+    def registry(self):
+        return json.loads(self.loader.ui_registry()[0])
+
+    def test_registry_is_cached_and_invalidated(self):
+        self.loader._start_instance("PanelModule", "PanelModule", {})
+        first = self.loader.ui_registry()
+        self.assertIs(self.loader.ui_registry(), first)
+        self.assertEqual(self.registry(), [{"id": "panel", "component": "PanelWidget", "title": "Panel",
+                                            "script_path": "/modules/beta/panel/widget.js"}])
+
+        # 新实例: 组件 ID 加实例后缀，ETag 变化
+        self.loader._start_instance("main", "PanelModule", {})
+        second = self.loader.ui_registry()
+        self.assertNotEqual(second[1], first[1])
+        self.assertEqual([c["id"] for c in self.registry()], ["panel", "panel_main"])
+
+        self.loader._stop_instance("main")
+        self.assertEqual(self.loader.ui_registry()[1], first[1])
+
+    def test_lazy_instances_are_listed_before_they_start(self):
+        self.loader._set_lazy_instances({"LazyChartModule": {"id": "LazyChartModule", "module": "LazyChartModule"}})
+        self.assertEqual([c["id"] for c in self.registry()], ["lazy_chart"])
+        self.assertEqual(self.registry()[0]["script_path"], "")
+
+    def test_default_widget_ids_are_computed_once_per_definition(self):
+        self.loader.available_classes.update({"CountingModule": CountingModule, "ClassConfigModule": ClassConfigModule})
+        CountingModule.created = ClassConfigModule.created = 0
+        for iid in ("a", "b", "c"):
+            self.loader._start_instance(iid, "CountingModule", {})
+            self.loader._start_instance(f"cls_{iid}", "ClassConfigModule", {})
+        # 每个实例各一次 + 默认组件 ID 一次；classmethod 形式不需要实例化
+        self.assertEqual(CountingModule.created, 4)
+        self.assertEqual(ClassConfigModule.created, 3)
+        self.assertIn("counting_b", [c["id"] for c in self.registry()])
+
+        # 定义重新加载后重新计算
+        self.loader._class_widget_ids.pop("CountingModule")
+        self.loader._start_instance("d", "CountingModule", {})
+        self.assertEqual(CountingModule.created, 6)
+
+    def test_lazy_widget_ids_match_started_instance(self):
+        self.loader.available_classes["NamedModule"] = NamedModule
+        self.loader._set_lazy_instances({"alpha": {"id": "alpha", "module": "NamedModule", "config": {}}})
+        lazy_ids = [c["id"] for c in self.registry()]
+        self.assertEqual(lazy_ids, ["alpha_chart"])
+
+        self.loader._activate("alpha")
+        self.assertIn("alpha", self.loader.active_instances)
+        self.assertEqual([c["id"] for c in self.registry()], lazy_ids)
+
+    def test_endpoint_supports_conditional_requests(self):
+        self.loader._start_instance("PanelModule", "PanelModule", {})
+        response = asyncio.run(get_ui_registry(request()))
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["etag"]
+        self.assertEqual(json.loads(response.body)[0]["id"], "panel")
+
+        not_modified = asyncio.run(get_ui_registry(request(f'W/{etag}, "other"')))
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.body, b"")
+
+        self.loader._stop_instance("PanelModule")
+        changed = asyncio.run(get_ui_registry(request(etag)))
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(json.loads(changed.body), [])
+
+
+class TestModuleWidgets(unittest.TestCase):
+    """仪表盘按 script_path 加载脚本，再以 component 在注册表中查找组件"""
+
+    def assert_widget_resolves(self, module_cls):
+        module_dir = os.path.dirname(sys.modules[module_cls.__module__].__file__)
+        configs = module_cls().get_ui_config()
+        for config in configs if isinstance(configs, list) else [configs]:
+            self.assertTrue(config.get("title"))
+            script = os.path.join(module_dir, config["script_path"])
+            self.assertTrue(os.path.exists(script))
+            self.assertIn(config["component"], registered_components(script))
+
+    def test_tushare_sync_widget(self):
+        self.assert_widget_resolves(TushareDataModule)
+
+    def test_system_metrics_widget(self):
+        self.assert_widget_resolves(SystemMetricsModule)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,6 +17,7 @@ from vibe_core.services.web_service import WebServerService
 from vibe_core.services.module_loader import ModuleLoaderService
 from vibe_core.data.hybrid import HybridDataProvider
 import time
+import datetime
 import threading
 import uvicorn
 import yaml
@@ -142,12 +143,65 @@ def cmd_backtest(args):
         print("Error: Could not load module")
         return
 
+    codes = [c.strip() for c in args.codes.split(",") if c.strip()] if args.codes else []
     engine = BacktestEngine(
         modules=[module],
         start_str=args.start,
-        end_str=args.end
+        end_str=args.end,
+        codes=codes,
+        cash=args.cash
     )
-    engine.run()
+    result = engine.run()
+    if not result.trades.empty:
+        print(result.trades.tail(20).to_string(index=False))
+
+def cmd_backtest_sweep(args):
+    """Run a parameter sweep for a module across all CPU cores"""
+    from vibe_core.backtest.sweep import (SWEEP_CONFIG_KEY, load_module_class, load_module_config,
+                                          parse_param, run_sweep)
+    path = args.path
+    if not os.path.exists(path):
+        print(f"Error: File not found {path}")
+        return
+
+    cls = load_module_class(path)
+    if not cls:
+        print("Error: Could not load module")
+        return
+
+    # 网格优先级: --param > --grid 文件 > config/modules/<Class>.yaml 的 sweep 段
+    base_config = load_module_config(cls.__name__)
+    grid = dict(base_config.pop(SWEEP_CONFIG_KEY, None) or {})
+    if args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            grid.update(yaml.safe_load(f) or {})
+    try:
+        for text in args.param or []:
+            grid.update(parse_param(text))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    if not grid:
+        print(f"Error: Empty parameter grid. Use --param/--grid or a '{SWEEP_CONFIG_KEY}' section in config/modules/{cls.__name__}.yaml")
+        return
+
+    codes = [c.strip() for c in args.codes.split(",") if c.strip()] if args.codes else []
+    total = 1
+    for values in grid.values():
+        total *= len(values) if isinstance(values, (list, tuple)) else 1
+    done = [0]
+
+    def on_result(row):
+        done[0] += 1
+        status = row.get("error") or f"return={row.get('total_return', float('nan')):.4f}"
+        print(f"[{done[0]}/{total}] run {row['run']}: {status}")
+
+    table = run_sweep(path, grid, args.start, args.end, codes=codes, cash=args.cash,
+                      max_workers=args.workers, base_config=base_config, on_result=on_result)
+    print(table.head(args.top).to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"Results saved to {args.output}")
 
 def load_config(path="config/config.yaml"):
     if not os.path.exists(path):
@@ -171,6 +225,15 @@ def cmd_run(args):
     
     # 0. Load Config
     config = load_config()
+
+    # 0.1 Replay mode: 虚拟时钟驱动 context.now、调度器与缓存 TTL
+    if args.replay:
+        from vibe_core.clock import VirtualClock, set_clock
+        text = args.replay.strip()
+        start = datetime.datetime.strptime(text if len(text) > 10 else f"{text} 09:15", "%Y-%m-%d %H:%M")
+        set_clock(VirtualClock(start, speed=args.speed))
+        config.setdefault("system", {})["mode"] = "replay"
+        print(f"Replay mode: virtual clock starts at {start} ({args.speed}x)")
     server_conf = config.get("server", {})
     host = server_conf.get("host", "0.0.0.0")
     port = server_conf.get("port", 8000)
@@ -183,11 +246,22 @@ def cmd_run(args):
     # Modules will register themselves into this provider.
     ctx.data = HybridDataProvider()
     print("Data Provider Registry initialized.")
+
+    # 1.2 Replay mode: 录制数据占用 akshare/sina 名称，数据模块加载后也不会联网
+    if args.replay:
+        from vibe_core.data.replay import ReplayDataProvider
+        replay = ReplayDataProvider()
+        for name in ("akshare", "sina"):
+            ctx.data.register_provider(name, replay, pinned=True)
+
+    # Expose the live context to HTTP handlers (e.g. /api/stocks/search)
+    app.state.context = ctx
     
     # 2. Create Services
     sched_service = SchedulerService()
     web_service = WebServerService(host=host, port=port)
     loader_service = ModuleLoaderService(ctx) # Automatic module loader
+    app.state.module_loader = loader_service # UI registry served from loader state
     
     # 3. Inject Dependencies
     ctx._scheduler = sched_service.scheduler
@@ -241,9 +315,26 @@ def main():
     parser_backtest.add_argument("path", help="Path to module file")
     parser_backtest.add_argument("--start", required=True, help="Start time (YYYY-MM-DD HH:MM)")
     parser_backtest.add_argument("--end", required=True, help="End time (YYYY-MM-DD HH:MM)")
+    parser_backtest.add_argument("--codes", default="", help="Comma separated stock codes to replay, e.g. 600519.SH,000001.SZ")
+    parser_backtest.add_argument("--cash", type=float, default=1_000_000.0, help="Initial cash")
+
+    # Command: backtest-sweep
+    parser_sweep = subparsers.add_parser("backtest-sweep", help="Run a parameter sweep in parallel")
+    parser_sweep.add_argument("path", help="Path to module file")
+    parser_sweep.add_argument("--start", required=True, help="Start time (YYYY-MM-DD HH:MM)")
+    parser_sweep.add_argument("--end", required=True, help="End time (YYYY-MM-DD HH:MM)")
+    parser_sweep.add_argument("--codes", default="", help="Comma separated stock codes to replay")
+    parser_sweep.add_argument("--cash", type=float, default=1_000_000.0, help="Initial cash")
+    parser_sweep.add_argument("--grid", help="YAML/JSON file with {param: [values]}")
+    parser_sweep.add_argument("--param", action="append", help="Grid entry key=v1,v2 (repeatable)")
+    parser_sweep.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser_sweep.add_argument("--top", type=int, default=20, help="Rows of the result table to print")
+    parser_sweep.add_argument("--output", help="Save the full result table as CSV")
 
     # Command: run
     parser_run = subparsers.add_parser("run", help="Start the system in live mode")
+    parser_run.add_argument("--replay", help="Replay mode: start the virtual clock at YYYY-MM-DD [HH:MM] (default 09:15)")
+    parser_run.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier, e.g. 100")
 
     args = parser.parse_args()
 
@@ -255,6 +346,8 @@ def main():
         cmd_list(args)
     elif args.command == "backtest":
         cmd_backtest(args)
+    elif args.command == "backtest-sweep":
+        cmd_backtest_sweep(args)
     elif args.command == "run":
         cmd_run(args)
     else:
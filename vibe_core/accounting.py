@@ -0,0 +1,208 @@
+import sys
+import time
+import threading
+import functools
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+class ModuleStats:
+    """单个模块实例的累计开销。"""
+
+    __slots__ = ("calls", "errors", "cpu_seconds", "wall_seconds", "max_wall", "last_wall",
+                 "data_calls", "broadcasts", "broadcast_bytes", "_lock")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cpu_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.max_wall = 0.0
+        self.last_wall = 0.0
+        self.data_calls = 0
+        self.broadcasts = 0
+        self.broadcast_bytes = 0
+        self._lock = threading.Lock()
+
+    def add_call(self, cpu: float, wall: float, failed: bool):
+        with self._lock:
+            self.calls += 1
+            self.errors += failed
+            self.cpu_seconds += cpu
+            self.wall_seconds += wall
+            self.last_wall = wall
+            if wall > self.max_wall:
+                self.max_wall = wall
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "wall_seconds": round(self.wall_seconds, 4),
+            "avg_wall_ms": round(self.wall_seconds * 1000 / self.calls, 2) if self.calls else None,
+            "max_wall_ms": round(self.max_wall * 1000, 2),
+            "last_wall_ms": round(self.last_wall * 1000, 2),
+            "data_calls": self.data_calls,
+            "broadcasts": self.broadcasts,
+            "broadcast_bytes": self.broadcast_bytes,
+        }
+
+
+def state_size(obj: Any, max_depth: int = 6, max_objects: int = 200_000) -> int:
+    """
+    估算对象持有的内存 (字节)。DataFrame/ndarray 按数据缓冲区计，容器递归，
+    同一对象只计一次；模块、类、函数与 Context 等共享对象不计入。
+    超过 max_depth 层或遍历 max_objects 个对象后不再深入，结果偏小但开销有界。
+    """
+    seen = set()
+
+    def size(o, depth):
+        if id(o) in seen or depth > max_depth or len(seen) >= max_objects:
+            return 0
+        seen.add(id(o))
+        if pd is not None and isinstance(o, (pd.DataFrame, pd.Series)):
+            usage = o.memory_usage(index=True, deep=False)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        if np is not None and isinstance(o, np.ndarray):
+            return int(o.nbytes)
+        if isinstance(o, (type, type(sys), threading.Thread)) or callable(o) and not isinstance(o, (dict, list)):
+            return 0
+        if type(o).__name__ in ("Context", "BacktestContext", "HybridDataProvider", "DataAggregator"):
+            return 0
+        total = sys.getsizeof(o, 0)
+        if isinstance(o, dict):
+            total += sum(size(k, depth + 1) + size(v, depth + 1) for k, v in list(o.items()))
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            total += sum(size(v, depth + 1) for v in list(o))
+        elif hasattr(o, "__dict__") and not isinstance(o, (str, bytes)):
+            total += size(vars(o), depth + 1)
+        return total
+
+    return size(obj, 0)
+
+
+class ModuleAccounting:
+    """
+    按模块实例统计开销: on_event 的 CPU 时间 (time.thread_time) 与墙钟耗时、数据调用次数、推送字节数。
+    模块代码运行期间把当前实例记在线程局部变量中，数据层与推送据此归属，不需要模块配合。
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, ModuleStats] = {}
+        self._widgets: Dict[str, str] = {}  # widget_id -> instance_id
+        self._instances: Dict[str, Any] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def stats(self, instance_id: str) -> ModuleStats:
+        stats = self._stats.get(instance_id)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(instance_id, ModuleStats())
+        return stats
+
+    def track(self, instance_id: str, instance: Any):
+        """登记运行中的实例 (用于报告类名与状态内存)，并从零开始计数。"""
+        with self._lock:
+            self._stats[instance_id] = ModuleStats()
+            self._instances[instance_id] = instance
+
+    def forget(self, instance_id: str):
+        with self._lock:
+            self._stats.pop(instance_id, None)
+            self._instances.pop(instance_id, None)
+            self._widgets = {w: i for w, i in self._widgets.items() if i != instance_id}
+
+    def current(self) -> Optional[str]:
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def wrap(self, instance_id: str, func: Callable) -> Callable:
+        """
+        包装模块方法 (如 on_event)，每次调用计入该实例。
+        同一实例内的嵌套调用 (on_event 内部调用 process) 直接透传，不重复计数。
+        """
+        local = self._local
+
+        @functools.wraps(func)
+        def accounted(*args, **kwargs):
+            stack = getattr(local, "stack", None)
+            if stack is None:
+                stack = local.stack = []
+            elif stack and stack[-1] == instance_id:
+                return func(*args, **kwargs)
+            stats = self.stats(instance_id)
+            stack.append(instance_id)
+            cpu0, wall0 = time.thread_time(), time.perf_counter()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                stack.pop()
+                stats.add_call(time.thread_time() - cpu0, time.perf_counter() - wall0, failed)
+
+        return accounted
+
+    def record_data_call(self):
+        instance_id = self.current()
+        if instance_id is not None:
+            stats = self.stats(instance_id)
+            with stats._lock:
+                stats.data_calls += 1
+
+    def bind_widget(self, widget_id: str, instance_id: Optional[str] = None):
+        """登记组件归属；不指定实例时使用当前正在运行的模块，且只在组件首次出现时登记。"""
+        if instance_id is None:
+            if widget_id in self._widgets:
+                return
+            instance_id = self.current()
+        if instance_id is not None:
+            self._widgets[widget_id] = instance_id
+
+    def record_broadcast(self, widget_id: str, nbytes: int):
+        instance_id = self._widgets.get(widget_id)
+        if instance_id is not None:
+            stats = self.stats(instance_id)
+            with stats._lock:
+                stats.broadcasts += 1
+                stats.broadcast_bytes += nbytes
+
+    def report(self, include_state: bool = True) -> List[dict]:
+        """
+        各实例的累计开销，按 CPU 时间降序。
+        :param include_state: 是否遍历实例属性估算状态内存 (按需计算，模块多时有一定开销)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            instances = dict(self._instances)
+        rows = []
+        for iid, st in stats.items():
+            row = {"id": iid, **st.to_dict()}
+            module = instances.get(iid)
+            if module is not None:
+                row["class"] = type(module).__name__
+                category = getattr(module, "category", None)
+                row["category"] = getattr(category, "value", category)
+                if include_state:
+                    try:
+                        row["state_bytes"] = state_size(vars(module))
+                    except Exception:
+                        row["state_bytes"] = None
+            rows.append(row)
+        rows.sort(key=lambda r: r["cpu_seconds"], reverse=True)
+        return rows
+
+
+accounting = ModuleAccounting()
@@ -1,18 +1,37 @@
 import datetime
-from typing import List, Any
+import logging
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
 from vibe_core.context import Context
 from vibe_core.event import Event
 from vibe_core.module import VibeModule
 from vibe_core.data.factory import DataFactory
+from vibe_core.data.bar_store import get_bar_store
+from .feed import BarFeed, QuoteBatch
+from .portfolio import Portfolio
+from .schedule import CronSpec, SimScheduler
+
 
 class BacktestContext(Context):
-    def __init__(self, start_time: datetime.datetime, end_time: datetime.datetime):
+    """
+    回测上下文。
+    now 返回模拟时间；register_cron 注册到模拟调度器；下单接口转发给模拟账户；
+    broadcast_ui 只保留每个组件最后一次的数据，不推送 WebSocket。
+    """
+
+    def __init__(self, start_time: datetime.datetime, end_time: datetime.datetime, data: Any = None):
         super().__init__()
         self._current_time = start_time
         self.start_time = start_time
         self.end_time = end_time
-        self.data = DataFactory.create_provider({"system": {"mode": "backtest"}})
+        self.data = data if data is not None else DataFactory.create_provider({"system": {"mode": "backtest"}})
         self.output_log: List[str] = []
+        self.ui_state: Dict[str, Any] = {}
+        self.scheduler = SimScheduler(lambda day: self.calendar.is_trading_day(day))
+        self.portfolio: Optional[Portfolio] = None
+        self.quotes: Optional[QuoteBatch] = None
 
     @property
     def now(self):
@@ -22,40 +41,151 @@ class BacktestContext(Context):
         self._current_time = dt
 
     def register_cron(self, module, cron_expr):
-        # In backtest, we might ignore complex crons or approximate them
-        pass
+        """
+        interval:N  -> 在行情时间点上每 N 秒最多触发一次
+        cron:<5 段> 或直接 5 段表达式 -> 交易日的精确模拟时刻触发
+        """
+        def trigger(when: datetime.datetime):
+            module.on_event(Event("TIMER", "cron", {}, when.timestamp()))
+
+        try:
+            if cron_expr.startswith("interval:"):
+                self.scheduler.add_interval(int(cron_expr.split(":")[1]), trigger, tag=module.name)
+            else:
+                spec = CronSpec(cron_expr[len("cron:"):] if cron_expr.startswith("cron:") else cron_expr)
+                self.scheduler.add_cron(spec, trigger, self._current_time, tag=module.name)
+        except Exception as e:
+            self.logger.error(f"Failed to register backtest trigger '{cron_expr}' for {module.name}: {e}")
+
+    def deregister_module(self, module_name: str):
+        self.scheduler.cancel(module_name)
+
+    def broadcast_ui(self, widget_id: str, data: Any):
+        self.ui_state[widget_id] = data
+
+    # --- 交易接口 ---
+
+    def price(self, code: str, field: str = "close") -> Optional[float]:
+        """当前 bar 的价格 (不会看到未来数据)。"""
+        return self.quotes.price(code, field) if self.quotes is not None else None
+
+    def order(self, code: str, shares: int):
+        return self.portfolio.order(code, shares, self._current_time)
+
+    def order_target(self, code: str, target: int):
+        return self.portfolio.order_target(code, target, self._current_time)
+
+    def order_target_percent(self, code: str, percent: float):
+        return self.portfolio.order_target_percent(code, percent, self._current_time)
+
+
+@dataclass
+class BacktestResult:
+    equity: pd.DataFrame                      # index=time, columns=[cash, market_value, equity]
+    trades: pd.DataFrame
+    stats: Dict[str, float] = field(default_factory=dict)
+
 
 class BacktestEngine:
-    def __init__(self, modules: List[VibeModule], start_str: str, end_str: str):
+    """
+    事件驱动回测引擎。
+    1. 按时间顺序回放行情 (BarFeed)，同一时间戳的全部股票打包为一个 QUOTE 事件；
+    2. 每根 bar 之前按模拟时间执行到期的 cron 任务，bar 上执行 interval 任务；
+    3. 模拟账户在下一根 bar 撮合订单，逐 bar 向量化盯市记录权益曲线；
+    4. 行情只包含交易日，非交易时段不产生任何事件。
+    """
+
+    def __init__(self, modules: List[VibeModule], start_str: str, end_str: str,
+                 codes: Optional[Sequence[str]] = None, feed: Optional[BarFeed] = None,
+                 cash: float = 1_000_000.0, data: Any = None, verbose: bool = True):
         self.modules = modules
-        self.start = datetime.datetime.strptime(start_str, "%Y-%m-%d %H:%M")
-        self.end = datetime.datetime.strptime(end_str, "%Y-%m-%d %H:%M")
-        self.ctx = BacktestContext(self.start, self.end)
+        self.verbose = verbose
+        self.start = _parse_time(start_str, datetime.time(0, 0))
+        self.end = _parse_time(end_str, datetime.time(23, 59))
+        self.ctx = BacktestContext(self.start, self.end, data=data)
+        self.logger = logging.getLogger("vibe.backtest")
+        self.feed = (feed if feed is not None else self._load_feed(codes or [])).between(self.start, self.end).trading_only()
+        self.ctx.portfolio = Portfolio(self.feed.symbols, cash)
+
+    def _load_feed(self, codes: Sequence[str]) -> BarFeed:
+        return load_daily_feed(codes, self.start, self.end)
+
+    def _print(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def run(self) -> BacktestResult:
+        self._print(f"Starting Backtest from {self.start} to {self.end}: {len(self.feed)} bars x {len(self.feed.symbols)} symbols")
+        ctx, portfolio, scheduler = self.ctx, self.ctx.portfolio, self.ctx.scheduler
 
-    def run(self):
-        print(f"Starting Backtest from {self.start} to {self.end}")
-        
         # Initialize modules
         for mod in self.modules:
-            mod.initialize(self.ctx)
-            print(f"Initialized {mod.name}")
-
-        # Time Loop (e.g., 1 minute step)
-        curr = self.start
-        step = datetime.timedelta(minutes=1)
-        
-        while curr <= self.end:
-            self.ctx.set_time(curr)
-            
-            # 1. Generate Quote Event (Simulated)
-            # In a real impl, we would read from self.ctx.data.get_price(curr)
-            # Here we just emit a generic TICK event
-            evt = Event(event_type="QUOTE", topic="market.tick", timestamp=curr.timestamp())
-            
-            # 2. Dispatch to modules
+            mod.initialize(ctx)
+            self._print(f"Initialized {mod.name}")
+
+        n = len(self.feed)
+        cash = np.empty(n)
+        value = np.empty(n)
+        for k, batch in enumerate(self.feed):
+            # 1. 截至本 bar 的 cron 任务 (如 09:25 选股、16:00 收盘后任务)
+            scheduler.run_crons_until(batch.time, ctx.set_time)
+            ctx.set_time(batch.time)
+
+            # 2. 撮合挂单并盯市
+            portfolio.on_bar(batch)
+            ctx.quotes = batch
+
+            # 3. 定时任务与行情事件
+            scheduler.run_intervals(batch.time)
+            evt = Event(event_type="QUOTE", topic="market.tick",
+                        payload={"time": batch.time, "quotes": batch}, timestamp=batch.time.timestamp())
             for mod in self.modules:
-                mod.on_event(evt)
-            
-            curr += step
-            
-        print("Backtest Complete.")
+                try:
+                    mod.on_event(evt)
+                except Exception as e:
+                    mod.on_error(e)
+
+            cash[k] = portfolio.cash
+            value[k] = portfolio.market_value
+
+        # 行情结束后到 end 为止的 cron 任务
+        scheduler.run_crons_until(self.end, ctx.set_time)
+
+        for mod in self.modules:
+            mod.on_stop()
+
+        result = self._result(cash, value)
+        self._print(f"Backtest Complete. {result.stats}")
+        return result
+
+    def _result(self, cash: np.ndarray, value: np.ndarray) -> BacktestResult:
+        equity = cash + value
+        frame = pd.DataFrame({"cash": cash, "market_value": value, "equity": equity},
+                             index=pd.DatetimeIndex(self.feed.times, name="time"))
+        initial = self.ctx.portfolio.initial_cash
+        stats = {"bars": int(len(equity)), "trades": len(self.ctx.portfolio.trades)}
+        if len(equity):
+            peak = np.maximum.accumulate(equity)
+            stats.update({
+                "final_equity": float(equity[-1]),
+                "total_return": float(equity[-1] / initial - 1.0),
+                "max_drawdown": float((equity / peak - 1.0).min()),
+            })
+        return BacktestResult(frame, self.ctx.portfolio.trades_frame(), stats)
+
+
+def load_daily_feed(codes: Sequence[str], start: datetime.datetime, end: datetime.datetime) -> BarFeed:
+    """默认行情: 从本地日线存储读取。"""
+    panel = get_bar_store().load()
+    if panel is None:
+        logging.getLogger("vibe.backtest").warning("Daily bar store is empty, backtest has no quotes.")
+        return BarFeed(np.array([], dtype="datetime64[s]"), [], {})
+    return BarFeed.from_bar_panel(panel, codes, start.strftime("%Y%m%d"), end.strftime("%Y%m%d"))
+
+
+def _parse_time(text: str, default_time: datetime.time) -> datetime.datetime:
+    """'YYYY-MM-DD HH:MM' 或 'YYYY-MM-DD' (取 default_time)。"""
+    text = text.strip()
+    if len(text) <= 10:
+        return datetime.datetime.combine(datetime.date.fromisoformat(text), default_time)
+    return datetime.datetime.strptime(text, "%Y-%m-%d %H:%M")
@@ -0,0 +1,156 @@
+import os
+import json
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from vibe_core.data.bar_store import BarPanel
+from vibe_core.data.calendar import get_trading_calendar
+
+FEED_FIELDS: Tuple[str, ...] = ("open", "high", "low", "close", "vol")
+
+# 日线 bar 的时间戳取收盘时刻
+DAILY_BAR_TIME = datetime.time(15, 0)
+
+
+class QuoteBatch:
+    """
+    同一时间戳的全部行情 (一个 QUOTE 事件)。
+    字段为与 symbols 对齐的 NumPy 行，NaN 表示该股票此刻没有 bar (停牌/未上市)。
+    """
+
+    __slots__ = ("time", "symbols", "fields", "_pos")
+
+    def __init__(self, time: datetime.datetime, symbols: List[str], fields: Dict[str, np.ndarray], pos: Dict[str, int]):
+        self.time = time
+        self.symbols = symbols
+        self.fields = fields
+        self._pos = pos
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.fields["close"]
+
+    @property
+    def valid(self) -> np.ndarray:
+        return ~np.isnan(self.fields["close"])
+
+    def price(self, code: str, field: str = "close") -> Optional[float]:
+        i = self._pos.get(code)
+        if i is None:
+            return None
+        value = self.fields[field][i]
+        return None if np.isnan(value) else float(value)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """{code: {open, high, low, close, vol}}，只包含有 bar 的股票。"""
+        rows = np.flatnonzero(self.valid)
+        return {self.symbols[i]: {name: float(arr[i]) for name, arr in self.fields.items()} for i in rows}
+
+
+class BarFeed:
+    """
+    按时间排序的行情流。
+    所有股票对齐到同一时间轴，每个字段为 (time, symbol) float64 矩阵；
+    迭代时每个时间戳产出一个 QuoteBatch，只是矩阵的一行视图，不逐股票构造对象。
+    """
+
+    def __init__(self, times: np.ndarray, symbols: Sequence[str], fields: Dict[str, np.ndarray]):
+        self.times = np.asarray(times, dtype="datetime64[s]")
+        self.symbols = list(symbols)
+        self.fields = fields
+        self._pos = {code: i for i, code in enumerate(self.symbols)}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __iter__(self) -> Iterator[QuoteBatch]:
+        times = self.times.astype(datetime.datetime)
+        for row, t in enumerate(times):
+            yield QuoteBatch(t, self.symbols, {name: arr[row] for name, arr in self.fields.items()}, self._pos)
+
+    def between(self, start: Optional[datetime.datetime] = None, end: Optional[datetime.datetime] = None) -> "BarFeed":
+        lo = 0 if start is None else int(np.searchsorted(self.times, np.datetime64(start, "s"), side="left"))
+        hi = len(self.times) if end is None else int(np.searchsorted(self.times, np.datetime64(end, "s"), side="right"))
+        return self._rows(slice(lo, hi))
+
+    def trading_only(self) -> "BarFeed":
+        """去掉落在非交易日的 bar。"""
+        calendar = get_trading_calendar(auto_refresh=False)
+        days = self.times.astype("datetime64[D]")
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        keep_day = np.fromiter((calendar.is_trading_day(d) for d in unique_days), dtype=bool, count=len(unique_days))
+        rows = np.flatnonzero(keep_day[inverse])
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            return self._rows(slice(int(rows[0]), int(rows[-1]) + 1))
+        return self._rows(rows)
+
+    def _rows(self, rows) -> "BarFeed":
+        """
+        按行选取。没有行被去掉时返回自身，连续区间用切片 (视图)，
+        这样 mmap 加载的行情在工作进程中不会被复制成私有内存；只有不连续的行才拷贝。
+        """
+        if isinstance(rows, slice):
+            lo, hi, _ = rows.indices(len(self.times))
+            if lo == 0 and hi == len(self.times):
+                return self
+        return BarFeed(self.times[rows], self.symbols, {n: a[rows] for n, a in self.fields.items()})
+
+    # --- 跨进程共享 ---
+
+    def save(self, directory: str):
+        """保存为 .npy (每个字段一个文件)，供其他进程以 mmap 方式只读加载。"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "times.npy"), self.times)
+        for name, arr in self.fields.items():
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(arr))
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"symbols": self.symbols, "fields": list(self.fields)}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "BarFeed":
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        fields = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in meta["fields"]}
+        return cls(np.load(os.path.join(directory, "times.npy")), meta["symbols"], fields)
+
+    # --- 构建 ---
+
+    @classmethod
+    def from_bar_panel(cls, panel: BarPanel, codes: Sequence[str], start: Optional[str] = None,
+                       end: Optional[str] = None) -> "BarFeed":
+        """由日线存储构建 (每个交易日一根 bar，时间戳为 15:00)。"""
+        cols = panel.date_slice(start, end)
+        known = [c for c in codes if panel.symbol_index(c) >= 0]
+        rows = np.array([panel.symbol_index(c) for c in known], dtype=np.int64)
+        times = panel.dates[cols].astype("datetime64[s]") + np.timedelta64(DAILY_BAR_TIME.hour * 3600, "s")
+        fields = {}
+        for name in FEED_FIELDS:
+            if name in panel.fields and len(rows):
+                fields[name] = np.asarray(panel.fields[name][rows, cols], dtype=np.float64).T.copy()
+            else:
+                fields[name] = np.full((len(times), len(known)), np.nan)
+        return cls(times, known, fields)
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], time_column: Optional[str] = None) -> "BarFeed":
+        """
+        由每只股票一个 DataFrame (如分钟线) 构建。
+        :param time_column: 时间列名；None 时使用 DatetimeIndex
+        """
+        symbols = list(frames.keys())
+        stamps = {}
+        for code, df in frames.items():
+            t = pd.to_datetime(df[time_column] if time_column else df.index)
+            stamps[code] = np.asarray(t, dtype="datetime64[s]")
+        times = np.unique(np.concatenate(list(stamps.values()))) if stamps else np.array([], dtype="datetime64[s]")
+
+        fields = {name: np.full((len(times), len(symbols)), np.nan) for name in FEED_FIELDS}
+        for col, code in enumerate(symbols):
+            df = frames[code]
+            rows = np.searchsorted(times, stamps[code])
+            for name in FEED_FIELDS:
+                if name in df.columns:
+                    fields[name][rows, col] = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+        return cls(times, symbols, fields)
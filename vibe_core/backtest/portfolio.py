@@ -0,0 +1,172 @@
+import datetime
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Sequence
+from .feed import QuoteBatch
+
+TRADE_COLUMNS = ["time", "code", "shares", "price", "amount", "fee"]
+
+
+@dataclass
+class Order:
+    code: str
+    shares: int          # 正数买入，负数卖出
+    submitted: datetime.datetime
+
+
+@dataclass
+class Trade:
+    time: datetime.datetime
+    code: str
+    shares: int
+    price: float
+    amount: float
+    fee: float
+
+
+class Portfolio:
+    """
+    模拟账户 (A 股规则)。
+    - 市价单在提交后的下一根有行情的 bar 以开盘价成交 (避免用到当根收盘价的未来信息)，含滑点；
+    - 买入按 lot_size 向下取整并受现金约束，卖出受 T+1 可卖数量约束；
+    - 佣金 commission_rate (最低 min_commission)，卖出另收印花税 stamp_tax。
+    持仓为与行情 symbols 对齐的 NumPy 数组，逐 bar 盯市是一次向量点积。
+    """
+
+    commission_rate = 0.00025
+    min_commission = 5.0
+    stamp_tax = 0.0005
+    slippage = 0.0005
+    lot_size = 100
+    t_plus_one = True
+
+    def __init__(self, symbols: Sequence[str], cash: float = 1_000_000.0):
+        self.symbols = list(symbols)
+        self._pos = {code: i for i, code in enumerate(self.symbols)}
+        self.initial_cash = float(cash)
+        self.cash = float(cash)
+        self.positions = np.zeros(len(self.symbols), dtype=np.int64)
+        self.last_price = np.full(len(self.symbols), np.nan)
+        self._mark = np.zeros(len(self.symbols))  # last_price 的 NaN 置 0，用于盯市
+        self.pending: List[Order] = []
+        self.trades: List[Trade] = []
+        self._bought_today = np.zeros(len(self.symbols), dtype=np.int64)
+        self._day: Optional[datetime.date] = None
+
+    # --- 查询 ---
+
+    def position(self, code: str) -> int:
+        i = self._pos.get(code)
+        return 0 if i is None else int(self.positions[i])
+
+    def sellable(self, code: str) -> int:
+        i = self._pos.get(code)
+        if i is None:
+            return 0
+        return int(self.positions[i] - (self._bought_today[i] if self.t_plus_one else 0))
+
+    @property
+    def market_value(self) -> float:
+        return float(np.dot(self.positions, self._mark))
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self.market_value
+
+    def holdings(self) -> Dict[str, int]:
+        return {self.symbols[i]: int(self.positions[i]) for i in np.flatnonzero(self.positions)}
+
+    # --- 下单 ---
+
+    def order(self, code: str, shares: int, now: datetime.datetime) -> Optional[Order]:
+        if code not in self._pos or int(shares) == 0:
+            return None
+        order = Order(code, int(shares), now)
+        self.pending.append(order)
+        return order
+
+    def order_target(self, code: str, target: int, now: datetime.datetime) -> Optional[Order]:
+        return self.order(code, int(target) - self.position(code), now)
+
+    def order_target_percent(self, code: str, percent: float, now: datetime.datetime) -> Optional[Order]:
+        """按最新价把持仓调整到总权益的 percent。"""
+        i = self._pos.get(code)
+        if i is None or np.isnan(self.last_price[i]) or self.last_price[i] <= 0:
+            return None
+        target = int(self.equity * percent / self.last_price[i])
+        return self.order_target(code, target, now)
+
+    # --- 撮合 ---
+
+    def _fee(self, amount: float, selling: bool) -> float:
+        fee = max(self.min_commission, amount * self.commission_rate)
+        if selling:
+            fee += amount * self.stamp_tax
+        return fee
+
+    def on_bar(self, batch: QuoteBatch):
+        """新 bar 到达: 换日重置 T+1、撮合挂单、更新最新价。"""
+        day = batch.time.date()
+        if day != self._day:
+            self._day = day
+            self._bought_today[:] = 0
+
+        if self.pending:
+            opens = batch.fields.get("open", batch.close)
+            waiting = []
+            for order in self.pending:
+                i = self._pos[order.code]
+                price = opens[i] if not np.isnan(opens[i]) else batch.close[i]
+                if np.isnan(price) or price <= 0:
+                    waiting.append(order)  # 停牌，留到下一根有行情的 bar
+                    continue
+                if not self._fill(order, i, float(price), batch.time):
+                    waiting.append(order)
+            self.pending = waiting
+
+        valid = batch.valid
+        self.last_price[valid] = batch.close[valid]
+        self._mark[valid] = batch.close[valid]
+
+    def _fill(self, order: Order, i: int, price: float, now: datetime.datetime) -> bool:
+        """成交返回 True；卖单因 T+1 暂不可卖时返回 False 继续挂单，其余无法成交的订单作废。"""
+        if order.shares > 0:
+            price *= 1 + self.slippage
+            lots = order.shares // self.lot_size
+            # 现金不足时减少手数
+            affordable = int(self.cash // (price * self.lot_size * (1 + self.commission_rate)))
+            lots = min(lots, affordable)
+            shares = lots * self.lot_size
+            while shares > 0 and shares * price + self._fee(shares * price, False) > self.cash:
+                shares -= self.lot_size
+            if shares <= 0:
+                return True
+            amount = shares * price
+            fee = self._fee(amount, False)
+            self.cash -= amount + fee
+            self.positions[i] += shares
+            self._bought_today[i] += shares
+        else:
+            price *= 1 - self.slippage
+            available = self.positions[i] - (self._bought_today[i] if self.t_plus_one else 0)
+            if available <= 0:
+                return self.positions[i] <= 0
+            shares = min(-order.shares, int(available))
+            if shares < available:
+                # 非清仓的卖出按整手
+                shares = shares // self.lot_size * self.lot_size
+            if shares <= 0:
+                return True
+            amount = shares * price
+            fee = self._fee(amount, True)
+            self.cash += amount - fee
+            self.positions[i] -= shares
+            shares = -shares
+        self.trades.append(Trade(now, order.code, int(shares), price, abs(shares) * price, fee))
+        return True
+
+    def trades_frame(self) -> pd.DataFrame:
+        if not self.trades:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        return pd.DataFrame([asdict(t) for t in self.trades], columns=TRADE_COLUMNS)
@@ -0,0 +1,111 @@
+import datetime
+import heapq
+import itertools
+from typing import Callable, List, Optional, Set, Tuple
+
+# (最小值, 最大值) 依次为 分 时 日 月 周 (0=周一 ... 6=周日，与 datetime.weekday 一致；7 也视为周日)
+CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_field(text: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part in ("*", ""):
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end or step <= 0:
+            raise ValueError(f"Invalid cron field '{text}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSpec:
+    """
+    标准 5 段 cron 表达式 (分 时 日 月 周)，支持 *、a-b、a,b、*/n。
+    周字段按 crontab 习惯 0/7 为周日、1 为周一。
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, dows = (
+            _parse_field(f, low, high) for f, (low, high) in zip(fields, CRON_RANGES))
+        # 转为 datetime.weekday(): 周一=0 ... 周日=6
+        self.weekdays = {(d - 1) % 7 for d in dows}
+
+    def _day_matches(self, day: datetime.date) -> bool:
+        return day.month in self.months and day.day in self.days and day.weekday() in self.weekdays
+
+    def next_after(self, dt: datetime.datetime) -> datetime.datetime:
+        """严格晚于 dt 的下一个触发时刻 (分钟精度)。日/时不匹配时整日/整小时跳过。"""
+        t = dt.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        for _ in range(366 * 24 * 60):
+            if not self._day_matches(t.date()):
+                t = datetime.datetime.combine(t.date() + datetime.timedelta(days=1), datetime.time())
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += datetime.timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+
+class SimScheduler:
+    """
+    模拟时间下的定时任务。
+    - interval:N  只在行情时间点上触发: 距上次触发 >= N 秒的第一根 bar 时执行一次，
+                  隔夜/周末/节假日的空档不会补跑成千上万次；
+    - cron 表达式 在精确的模拟时刻触发，但跳过非交易日。
+    """
+
+    def __init__(self, is_trading_day: Optional[Callable[[datetime.date], bool]] = None):
+        self.is_trading_day = is_trading_day or (lambda day: day.weekday() < 5)
+        self._intervals: List[list] = []  # [seconds, callback, tag, last_fired]
+        self._crons: List[Tuple[datetime.datetime, int, CronSpec, Callable, Optional[str]]] = []
+        self._seq = itertools.count()
+
+    def add_interval(self, seconds: float, callback: Callable[[datetime.datetime], None], tag: Optional[str] = None):
+        self._intervals.append([float(seconds), callback, tag, None])
+
+    def add_cron(self, spec: CronSpec, callback: Callable[[datetime.datetime], None],
+                 start: datetime.datetime, tag: Optional[str] = None):
+        heapq.heappush(self._crons, (self._next_cron(spec, start), next(self._seq), spec, callback, tag))
+
+    def cancel(self, tag: str):
+        self._intervals = [job for job in self._intervals if job[2] != tag]
+        self._crons = [job for job in self._crons if job[4] != tag]
+        heapq.heapify(self._crons)
+
+    def _next_cron(self, spec: CronSpec, after: datetime.datetime) -> datetime.datetime:
+        t = spec.next_after(after)
+        while not self.is_trading_day(t.date()):
+            t = spec.next_after(datetime.datetime.combine(t.date(), datetime.time(23, 59)))
+        return t
+
+    def run_crons_until(self, until: datetime.datetime, set_time: Callable[[datetime.datetime], None]):
+        """按时间顺序执行 <= until 的全部 cron 任务。"""
+        while self._crons and self._crons[0][0] <= until:
+            when, _, spec, callback, tag = heapq.heappop(self._crons)
+            set_time(when)
+            callback(when)
+            heapq.heappush(self._crons, (self._next_cron(spec, when), next(self._seq), spec, callback, tag))
+
+    def run_intervals(self, now: datetime.datetime):
+        for job in list(self._intervals):
+            seconds, callback, _, last = job
+            if last is None or (now - last).total_seconds() >= seconds:
+                job[3] = now
+                callback(now)
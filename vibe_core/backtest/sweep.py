@@ -0,0 +1,148 @@
+import os
+import datetime
+import shutil
+import logging
+import tempfile
+import itertools
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+import pandas as pd
+import yaml
+
+from vibe_core.module import VibeModule
+from vibe_core.data.factory import DataFactory
+from .engine import BacktestEngine, load_daily_feed, _parse_time
+from .feed import BarFeed
+
+logger = logging.getLogger("vibe.backtest.sweep")
+
+# 模块配置 (config/modules/<Class>.yaml) 中描述参数网格的键
+SWEEP_CONFIG_KEY = "sweep"
+
+
+def load_module_class(path: str) -> Optional[Type[VibeModule]]:
+    """从文件加载第一个 VibeModule 子类 (不实例化)。"""
+    try:
+        spec = importlib.util.spec_from_file_location("sweep_module", path)
+        if spec and spec.loader:
+            mod = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(mod)
+            for attribute_name in dir(mod):
+                attribute = getattr(mod, attribute_name)
+                if isinstance(attribute, type) and issubclass(attribute, VibeModule) and attribute is not VibeModule:
+                    return attribute
+    except Exception as e:
+        logger.error(f"Failed to load module {path}: {e}")
+    return None
+
+
+def load_module_config(class_name: str, config_dir: str = os.path.join("config", "modules")) -> Dict[str, Any]:
+    """读取 config/modules/<Class>.yaml，与实盘加载器使用同一份配置。"""
+    path = os.path.join(config_dir, f"{class_name}.yaml")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def parse_param(text: str) -> Dict[str, List[Any]]:
+    """'key=v1,v2,v3' -> {key: [v1, v2, v3]}，值按 YAML 解析 (数字/布尔/字符串)。"""
+    key, sep, values = text.partition("=")
+    if not sep or not key.strip():
+        raise ValueError(f"Invalid sweep parameter '{text}', expected key=v1,v2")
+    return {key.strip(): [yaml.safe_load(v) for v in values.split(",") if v.strip()]}
+
+
+def expand_grid(grid: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """参数网格的笛卡尔积；标量视为只有一个取值。"""
+    if not grid:
+        return [{}]
+    keys = list(grid)
+    values = [v if isinstance(v, (list, tuple)) else [v] for v in grid.values()]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def apply_params(module: VibeModule, params: Dict[str, Any]):
+    """参数写入 module.config；模块已有同名属性 (如 interval) 时同时覆盖属性。"""
+    for key, value in params.items():
+        module.config[key] = value
+        if hasattr(module, key):
+            setattr(module, key, value)
+
+
+# --- 工作进程 ---
+# 每个进程只加载一次: 行情以 mmap 只读映射 (各进程共享同一份页缓存)，数据源与模块类也只构建一次。
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(path: str, feed_dir: str, base_config: Dict[str, Any]):
+    # 数百组并行回测时只保留告警及以上日志
+    for name in ("", "vibe"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    _worker["module_class"] = load_module_class(path)
+    _worker["feed"] = BarFeed.load(feed_dir, mmap=True)
+    _worker["data"] = DataFactory.create_provider({"system": {"mode": "backtest"}})
+    _worker["base_config"] = base_config
+
+
+def _run_one(task: Dict[str, Any]) -> Dict[str, Any]:
+    params = task["params"]
+    row: Dict[str, Any] = {"run": task["run"], **params}
+    try:
+        cls = _worker["module_class"]
+        if cls is None:
+            raise RuntimeError("module class not found")
+        module = cls()
+        apply_params(module, {**_worker["base_config"], **params})
+        engine = BacktestEngine([module], task["start"], task["end"], feed=_worker["feed"],
+                                cash=task["cash"], data=_worker["data"], verbose=False)
+        row.update(engine.run().stats)
+        row["error"] = None
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def run_sweep(path: str, grid: Dict[str, Any], start: str, end: str,
+              codes: Optional[Sequence[str]] = None, feed: Optional[BarFeed] = None,
+              cash: float = 1_000_000.0, max_workers: Optional[int] = None,
+              base_config: Optional[Dict[str, Any]] = None,
+              on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> pd.DataFrame:
+    """
+    对模块做参数扫描: 网格中每组参数跑一次完整回测，分发到进程池并行执行。
+    行情只构建一次并写成 .npy，各工作进程以 mmap 方式共享，不逐进程复制。
+    :param grid: {参数名: [取值...]}
+    :param max_workers: 进程数，默认 CPU 核数
+    :param on_result: 每完成一组回调一次 (进度输出)
+    :return: 每组参数一行 (参数列 + 回测统计)，按 total_return 降序
+    """
+    combos = expand_grid(grid)
+    start_time, end_time = _parse_time(start, datetime.time(0, 0)), _parse_time(end, datetime.time(23, 59))
+    if feed is None:
+        feed = load_daily_feed(codes or [], start_time, end_time)
+    # 先裁剪到回测区间的交易日再落盘，工作进程中引擎的 between/trading_only 直接返回 mmap 视图
+    feed = feed.between(start_time, end_time).trading_only()
+
+    tasks = [{"run": i, "params": p, "start": start, "end": end, "cash": cash} for i, p in enumerate(combos)]
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(tasks)))
+    feed_dir = tempfile.mkdtemp(prefix="vibe_sweep_")
+    rows = []
+    try:
+        feed.save(feed_dir)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(path, feed_dir, dict(base_config or {}))) as pool:
+            futures = [pool.submit(_run_one, task) for task in tasks]
+            for future in as_completed(futures):
+                row = future.result()
+                rows.append(row)
+                if on_result:
+                    on_result(row)
+    finally:
+        shutil.rmtree(feed_dir, ignore_errors=True)
+
+    table = pd.DataFrame(rows).sort_values("run").reset_index(drop=True)
+    if "total_return" in table.columns:
+        table = table.sort_values("total_return", ascending=False, na_position="last", kind="stable")
+    return table.reset_index(drop=True)
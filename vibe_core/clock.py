@@ -0,0 +1,95 @@
+import time
+import datetime
+import threading
+from typing import Optional
+
+
+class SystemClock:
+    """真实时钟 (默认)。"""
+
+    speed = 1.0
+
+    def time(self) -> float:
+        return time.time()
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def sleep(self, seconds: float):
+        time.sleep(max(0.0, seconds))
+
+
+class VirtualClock:
+    """
+    虚拟时钟 (回放模式)。
+    从 start 开始按 speed 倍速随真实时间流逝，例如 speed=100 时真实 1 秒等于虚拟 100 秒；
+    speed=0 为暂停，只能通过 advance/set 手动推进 (测试与单步调试)。
+    sleep 按虚拟时间计算，时钟被调快、跳转或手动推进时等待中的线程会被及时唤醒。
+    """
+
+    def __init__(self, start: datetime.datetime, speed: float = 1.0):
+        self._cond = threading.Condition()
+        self._base_virtual = start.timestamp()
+        self._base_real = time.monotonic()
+        self._speed = float(speed)
+
+    def _elapsed(self) -> float:
+        return (time.monotonic() - self._base_real) * self._speed
+
+    def _rebase(self, virtual: float):
+        self._base_virtual = virtual
+        self._base_real = time.monotonic()
+
+    @property
+    def speed(self) -> float:
+        return self._speed
+
+    def set_speed(self, speed: float):
+        with self._cond:
+            self._rebase(self._base_virtual + self._elapsed())
+            self._speed = float(speed)
+            self._cond.notify_all()
+
+    def time(self) -> float:
+        with self._cond:
+            return self._base_virtual + self._elapsed()
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.time())
+
+    def set(self, dt: datetime.datetime):
+        """跳到指定时刻 (允许回拨)。"""
+        with self._cond:
+            self._rebase(dt.timestamp())
+            self._cond.notify_all()
+
+    def advance(self, seconds: float):
+        with self._cond:
+            self._rebase(self._base_virtual + self._elapsed() + seconds)
+            self._cond.notify_all()
+
+    def sleep(self, seconds: float):
+        """阻塞到虚拟时间前进 seconds 秒。"""
+        with self._cond:
+            target = self._base_virtual + self._elapsed() + max(0.0, seconds)
+            while True:
+                remaining = target - (self._base_virtual + self._elapsed())
+                if remaining <= 0:
+                    return
+                # 暂停时无限等待 advance/set 唤醒
+                self._cond.wait(remaining / self._speed if self._speed > 0 else None)
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    """全局时钟。实盘为 SystemClock，回放模式下由 set_clock 换成 VirtualClock。"""
+    return _clock
+
+
+def set_clock(clock: Optional[object] = None):
+    """替换全局时钟；None 恢复真实时钟。"""
+    global _clock
+    _clock = clock if clock is not None else SystemClock()
+    return _clock
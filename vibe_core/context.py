@@ -2,6 +2,8 @@ from typing import Any, Callable, Dict, List
 import logging
 from .module import VibeModule
 from .storage import CSVStorageService
+from .clock import get_clock
+from .accounting import accounting
 
 # Import singleton manager. Note: This creates a dependency on vibe_core.server.
 # In a strictly decoupled architecture we might use dependency injection,
@@ -66,23 +68,43 @@ class Context:
         self._scheduler: Any = None
         self._event_bus: Any = None
         self._module_registry: Dict[str, VibeModule] = {}
+        self._subscribe_handlers: List[Callable[[str], Any]] = []
 
     def register_module_instance(self, module_id: str, instance: VibeModule):
         """Register a module instance to handle messages for a specific ID."""
         self._module_registry[module_id] = instance
         self.logger.info(f"Registered module route: {module_id} -> {instance.name}")
 
+    def deregister_module_instance(self, module_id: str, instance: VibeModule):
+        """Remove a message route, if it still points to this instance."""
+        if self._module_registry.get(module_id) is instance:
+            del self._module_registry[module_id]
+
     def broadcast_ui(self, widget_id: str, data: Any):
         """
         Broadcast data to a specific UI widget.
         """
+        accounting.bind_widget(widget_id)
         self.output.dashboard(widget_id, data)
         
+    def on_widget_subscribe(self, handler: Callable[[str], Any]):
+        """Register a callback for dashboard widget subscriptions (e.g. to start lazy modules)."""
+        self._subscribe_handlers.append(handler)
+
     async def handle_client_message(self, message: Dict):
         """
         Route message from WebSocket to appropriate module.
         Expected msg: { "moduleId": "...", ... }
+        or a widget subscription: { "type": "subscribe", "widget_id": "..." }
         """
+        if message.get("type") == "subscribe":
+            for handler in self._subscribe_handlers:
+                try:
+                    handler(message.get("widget_id"))
+                except Exception as e:
+                    self.logger.error(f"Error handling subscription to {message.get('widget_id')}: {e}")
+            return
+
         module_id = message.get("moduleId")
         if not module_id: return
 
@@ -111,8 +133,7 @@ class Context:
                     # Create a wrapper that injects a Timer event
                     def trigger():
                         from .event import Event
-                        import time
-                        evt = Event("TIMER", "cron", {}, time.time())
+                        evt = Event("TIMER", "cron", {}, self.clock.time())
                         module.on_event(evt)
                     
                     # Pass module.name as tag for cleanup later
@@ -141,11 +162,21 @@ class Context:
         # In a real implementation, this would delegate to self._event_bus
         self.logger.info(f"Subscribed {module.name} to '{topic}'")
 
+    @property
+    def calendar(self):
+        """共享交易日历 (见 vibe_core.data.calendar)。"""
+        from .data.calendar import get_trading_calendar
+        return get_trading_calendar()
+
+    @property
+    def clock(self):
+        """全局时钟 (见 vibe_core.clock)，回放模式下为虚拟时钟。"""
+        return get_clock()
+
     @property
     def now(self):
         """
         Returns the current system time.
-        In Backtest mode, this returns the simulated time.
+        In Backtest mode, this returns the simulated time; in replay mode, the virtual clock time.
         """
-        import datetime
-        return datetime.datetime.now()
+        return self.clock.now()
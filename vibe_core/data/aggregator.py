@@ -5,6 +5,8 @@ import pandas as pd
 from typing import Optional, List, Dict, Any, Callable
 from collections import defaultdict
 from .provider import IDataProvider, DataDimension, SyncPolicy, DataCategory
+from vibe_core.clock import get_clock
+from vibe_core.metrics import DATA_CACHE, DATA_CALL_ERRORS, DATA_CALL_SECONDS, DATA_PAYLOAD_ROWS, payload_size
 
 class DataAggregator(IDataProvider):
     """
@@ -35,7 +37,7 @@ class DataAggregator(IDataProvider):
         # 日志统计
         self._log_stats = defaultdict(int)
         self._first_log_done = set()
-        self._last_summary_time = time.time()
+        self._last_summary_time = get_clock().time()
         self._log_lock = threading.Lock()
 
     # --- 代理属性 ---
@@ -65,7 +67,7 @@ class DataAggregator(IDataProvider):
         初次立即打印 INFO，后续仅计数，每分钟汇总。
         """
         with self._log_lock:
-            now = time.time()
+            now = get_clock().time()
             provider_name = self._provider.__class__.__name__
             full_tag = f"{provider_name}:{tag}"
             
@@ -100,12 +102,14 @@ class DataAggregator(IDataProvider):
         """
         # 0. 记录活动
         self._smart_log(log_tag, f"Key={key}")
+        provider_name = self._provider.__class__.__name__
 
         # 1. 快速检查缓存 (读)
         with self._cache_lock:
             if not force_refresh and key in self._cache:
                 data, ts = self._cache[key]
-                if time.time() - ts < self._cache_ttl:
+                if get_clock().time() - ts < self._cache_ttl:
+                    DATA_CACHE.labels(provider_name, log_tag, "hit").inc()
                     return data
 
         # 2. 获取该 Key 对应的执行锁 (SingleFlight)
@@ -120,21 +124,27 @@ class DataAggregator(IDataProvider):
             with self._cache_lock:
                 if not force_refresh and key in self._cache:
                     data, ts = self._cache[key]
-                    if time.time() - ts < self._cache_ttl:
+                    if get_clock().time() - ts < self._cache_ttl:
                         # self._logger.debug(f"Cache hit for {key} (waited)")
+                        DATA_CACHE.labels(provider_name, log_tag, "coalesced").inc()
                         return data
 
             # 真的需要执行请求了
             # self._logger.debug(f"Executing real fetch for {key}")
+            DATA_CACHE.labels(provider_name, log_tag, "miss").inc()
+            start = time.perf_counter()
             try:
                 result = fetch_func()
+                DATA_CALL_SECONDS.labels(provider_name, log_tag).observe(time.perf_counter() - start)
+                DATA_PAYLOAD_ROWS.labels(provider_name, log_tag).observe(payload_size(result))
                 
                 # 写入缓存
                 with self._cache_lock:
-                    self._cache[key] = (result, time.time())
+                    self._cache[key] = (result, get_clock().time())
                 
                 return result
             except Exception as e:
+                DATA_CALL_ERRORS.labels(provider_name, log_tag).inc()
                 self._logger.error(f"Error fetching {key}: {e}")
                 raise e
             finally:
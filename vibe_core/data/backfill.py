@@ -0,0 +1,139 @@
+import os
+import time
+import logging
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Optional
+from .calendar import TradingCalendar, DateLike, get_trading_calendar, day_strings
+from .ratelimit import TokenBucket
+
+# Tushare 超出每分钟配额时的报错关键字
+QUOTA_MARKERS = ("每分钟最多访问", "最多访问该接口", "rate limit", "too many requests")
+
+
+def is_quota_error(error: Exception) -> bool:
+    text = str(error).lower()
+    return any(marker in text for marker in QUOTA_MARKERS)
+
+
+def write_csv_atomic(df: pd.DataFrame, path: str):
+    """写入临时文件后 os.replace，中途失败不会留下半个 CSV。"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+class DailyBackfill:
+    """
+    按交易日分片的历史补数引擎。
+    1. 由交易日历展开区间内的交易日，跳过本地已有文件的日期；
+    2. 有界线程池并发抓取，所有线程共享一个按分钟计的令牌桶；
+    3. 失败按指数退避重试，配额类错误至少等待 quota_wait 秒；
+    4. 每个日期的 CSV 原子写入；
+    5. 通过 on_progress 回调汇报进度 (最多每 progress_interval 秒一次，结束时必报)。
+    """
+
+    max_retries = 3
+    backoff = 2.0
+    quota_wait = 60.0
+    progress_interval = 1.0
+
+    def __init__(self, fetch: Callable[[str], pd.DataFrame], path_for: Callable[[str], str],
+                 calls_per_minute: float = 200, max_workers: int = 4,
+                 exists: Optional[Callable[[str], bool]] = None,
+                 on_progress: Optional[Callable[[Dict], None]] = None,
+                 calendar: Optional[TradingCalendar] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        :param fetch: 交易日 (YYYYMMDD) -> DataFrame
+        :param path_for: 交易日 -> 保存路径
+        :param exists: 判断某日是否已落盘，默认检查 path_for 是否存在
+        """
+        self.fetch = fetch
+        self.path_for = path_for
+        self.exists = exists or (lambda day: os.path.exists(path_for(day)))
+        self.bucket = TokenBucket.per_minute(calls_per_minute)
+        self.max_workers = max(1, int(max_workers))
+        self.on_progress = on_progress
+        self.calendar = calendar
+        self.logger = logger or logging.getLogger("vibe.data.backfill")
+        self.sleep = time.sleep
+        self._progress_lock = threading.Lock()
+        self._last_report = 0.0
+
+    def _fetch_with_retry(self, day: str) -> pd.DataFrame:
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return self.fetch(day)
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                wait = self.backoff * (2 ** attempt)
+                if is_quota_error(e):
+                    wait = max(wait, self.quota_wait)
+                self.logger.warning(f"Fetch {day} failed ({e}), retry {attempt + 1}/{self.max_retries} in {wait:.0f}s")
+                self.sleep(wait)
+
+    def _sync_day(self, day: str) -> int:
+        df = self._fetch_with_retry(day)
+        if df is None or df.empty:
+            return 0
+        write_csv_atomic(df, self.path_for(day))
+        return len(df)
+
+    def _report(self, stats: Dict, force: bool = False):
+        if self.on_progress is None:
+            return
+        with self._progress_lock:
+            now = time.monotonic()
+            if not force and now - self._last_report < self.progress_interval:
+                return
+            self._last_report = now
+            payload = dict(stats)
+        try:
+            self.on_progress(payload)
+        except Exception as e:
+            self.logger.debug(f"Progress callback failed: {e}")
+
+    def run(self, start: DateLike, end: DateLike, force: bool = False) -> Dict:
+        """
+        执行补数。
+        :return: {total, skipped, done, fetched, empty, failed, rows, failed_days, status}
+        """
+        calendar = self.calendar or get_trading_calendar()
+        all_days = day_strings(calendar.trading_days_between(start, end))
+        todo = all_days if force else [d for d in all_days if not self.exists(d)]
+        stats = {
+            "start": str(start), "end": str(end), "status": "running",
+            "total": len(todo), "skipped": len(all_days) - len(todo),
+            "done": 0, "fetched": 0, "empty": 0, "failed": 0, "rows": 0,
+            "current": None, "failed_days": [],
+        }
+        self.logger.info(f"Backfill {start}~{end}: {len(todo)} trading days to fetch, {stats['skipped']} already stored")
+        self._report(stats, force=True)
+
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(todo))) as pool:
+                futures = {pool.submit(self._sync_day, day): day for day in todo}
+                for future in as_completed(futures):
+                    day = futures[future]
+                    try:
+                        rows = future.result()
+                        stats["rows"] += rows
+                        stats["fetched" if rows else "empty"] += 1
+                    except Exception as e:
+                        stats["failed"] += 1
+                        stats["failed_days"].append(day)
+                        self.logger.error(f"Backfill {day} failed: {e}")
+                    stats["done"] += 1
+                    stats["current"] = day
+                    self._report(stats)
+
+        stats["failed_days"].sort()
+        stats["status"] = "failed" if stats["failed"] else "completed"
+        self._report(stats, force=True)
+        self.logger.info(f"Backfill {start}~{end} finished: {stats}")
+        return stats
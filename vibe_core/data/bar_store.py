@@ -0,0 +1,358 @@
+import os
+import re
+import json
+import time
+import glob
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+from .board_index import _clean_code
+from .concept_store import _iso, _remove_old_versions
+from .calendar import get_trading_calendar
+
+BAR_FIELDS: Tuple[str, ...] = ("open", "high", "low", "close", "pre_close", "pct_chg", "vol", "amount")
+
+# AKShare 全市场快照列 -> 日线字段 (成交额为元，入库时换算为千元与 Tushare 一致)
+AKSHARE_FIELD_MAP = {
+    "今开": "open",
+    "最高": "high",
+    "最低": "low",
+    "最新价": "close",
+    "昨收": "pre_close",
+    "涨跌幅": "pct_chg",
+    "成交量": "vol",
+    "成交额": "amount",
+}
+
+# 日期文件名: daily_20240102.csv (Tushare) / akshare_20240102.csv (AKShare 收盘快照)
+SOURCE_PATTERN = re.compile(r"^(daily|akshare)_(\d{8})\.csv$")
+# 同一天有多个来源时优先 Tushare
+SOURCE_PRIORITY = {"daily": 0, "akshare": 1}
+
+# 价格为两位小数、成交额可达 1e8 千元，float32 (约 7 位有效数字) 会丢精度，统一用 float64
+BAR_DTYPE = np.float64
+
+
+class BarPanel:
+    """
+    日线面板 (只读视图)。
+    每个字段一块 (symbol, date) float64 矩阵，按股票行优先存储，
+    单只股票的历史是一段连续内存，get_history 只是一次行切片。
+    股票未上市/停牌的日期为 NaN。
+    """
+
+    def __init__(self, fields: Dict[str, np.ndarray], dates: np.ndarray, symbols: Sequence[str]):
+        self.fields = fields
+        self.dates = dates
+        self.symbols = list(symbols)
+        self._symbol_pos: Dict[str, int] = {code: i for i, code in enumerate(self.symbols)}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.symbols), len(self.dates)
+
+    def symbol_index(self, code: str) -> int:
+        return self._symbol_pos.get(_clean_code(code), -1)
+
+    def field(self, name: str) -> np.ndarray:
+        """返回某个字段的 (symbol, date) 矩阵。"""
+        return self.fields[name]
+
+    def date_slice(self, start: Optional[str] = None, end: Optional[str] = None) -> slice:
+        """按日期闭区间 [start, end] 计算列切片 (二分查找)。"""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(_iso(start), "D"), side="left"))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(_iso(end), "D"), side="right"))
+        return slice(lo, hi)
+
+    def history(self, code: str, start: Optional[str] = None, end: Optional[str] = None,
+                fields: Sequence[str] = BAR_FIELDS) -> pd.DataFrame:
+        """
+        单只股票的日线 (按日期升序，去掉无收盘价的日期)。
+        :return: DataFrame[ts_code, trade_date(YYYYMMDD), open, high, low, close, pre_close, pct_chg, vol, amount]
+        """
+        row = self.symbol_index(code)
+        if row < 0:
+            return pd.DataFrame()
+        cols = self.date_slice(start, end)
+        data = {name: np.asarray(self.fields[name][row, cols], dtype=np.float64) for name in fields}
+        valid = ~np.isnan(data["close"]) if "close" in data else np.ones(cols.stop - cols.start, dtype=bool)
+        dates = self.dates[cols][valid]
+        df = pd.DataFrame({name: values[valid] for name, values in data.items()})
+        df.insert(0, "trade_date", [d.replace("-", "") for d in np.datetime_as_string(dates, unit="D")])
+        df.insert(0, "ts_code", code)
+        return df
+
+    def price(self, code: str, date: str, field: str = "close") -> Optional[float]:
+        row = self.symbol_index(code)
+        cols = self.date_slice(date, date)
+        if row < 0 or cols.stop <= cols.start:
+            return None
+        value = float(self.fields[field][row, cols.start])
+        return None if np.isnan(value) else value
+
+    def cross_section(self, date: str, field: str = "close") -> pd.Series:
+        """某日全部股票的某个字段 (index 为 6 位代码)。"""
+        cols = self.date_slice(date, date)
+        if cols.stop <= cols.start:
+            return pd.Series(dtype=np.float64)
+        values = np.asarray(self.fields[field][:, cols.start], dtype=np.float64)
+        return pd.Series(values, index=self.symbols).dropna()
+
+
+class DailyBarStore:
+    """
+    全市场日线的列式存储。
+    把按日期分文件的 CSV (data/daily/daily_*.csv、data/storage/stock/post_market/{daily,akshare}_*.csv)
+    合并为每个字段一个 (symbol, date) 矩阵，以 .npy 保存并内存映射加载。
+    增量构建: 只读取新增或修改过的日期文件，旧数据直接从现有面板拷贝。
+    与 ConceptHistoryStore 相同，每次构建写入新的版本目录并最后替换 meta.json，
+    其他实例 (LocalDataModule、回测、回放) 仍映射的旧文件不会被覆盖。
+
+    目录结构:
+        {store_dir}/{version}/{field}.npy  # (symbol, date) float64
+        {store_dir}/{version}/dates.npy    # datetime64[D]
+        {store_dir}/meta.json              # 字段、股票代码、每个日期的源文件签名、当前版本
+    """
+
+    # load(auto_build=True) 扫描源目录的最小间隔 (秒)，避免逐只股票查询时反复 stat 全部文件
+    stale_check_interval = 30.0
+
+    def __init__(self, source_dirs: Sequence[str] = (os.path.join("data", "daily"),
+                                                      os.path.join("data", "storage", "stock", "post_market")),
+                 store_dir: str = os.path.join("data", "storage", "bars", "daily")):
+        self.source_dirs = list(source_dirs)
+        self.store_dir = store_dir
+        self.logger = logging.getLogger("vibe.data.bar_store")
+        self._lock = threading.Lock()
+        self._panel: Optional[BarPanel] = None
+        self._panel_stamp: Optional[float] = None
+        self._checked_at: Optional[float] = None
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.store_dir, "meta.json")
+
+    def _data_dir(self, meta: Optional[Dict] = None) -> str:
+        """meta 指向的版本目录 (早期版本没有 version 字段，文件直接位于 store_dir)。"""
+        meta = self._read_meta() if meta is None else meta
+        version = (meta or {}).get("version")
+        return os.path.join(self.store_dir, version) if version else self.store_dir
+
+    @property
+    def dates_path(self) -> str:
+        return os.path.join(self._data_dir(), "dates.npy")
+
+    def field_path(self, name: str) -> str:
+        return os.path.join(self._data_dir(), f"{name}.npy")
+
+    # --- 源文件 ---
+
+    def source_files(self) -> Dict[str, str]:
+        """
+        日期 (YYYYMMDD) -> CSV 路径；同一天有多个来源时取优先级最高的。
+        非交易日的快照 (如周末运行的 AKShare 存档，只是上一交易日的重复) 不入库。
+        """
+        calendar = get_trading_calendar()
+        best: Dict[str, Tuple[int, str]] = {}
+        for directory in self.source_dirs:
+            for path in glob.glob(os.path.join(directory, "*.csv")):
+                m = SOURCE_PATTERN.match(os.path.basename(path))
+                if not m or not calendar.is_trading_day(m.group(2)):
+                    continue
+                rank = SOURCE_PRIORITY[m.group(1)]
+                if m.group(2) not in best or rank < best[m.group(2)][0]:
+                    best[m.group(2)] = (rank, path)
+        return {day: path for day, (_, path) in sorted(best.items())}
+
+    def _signature(self, files: Dict[str, str]) -> Dict[str, List]:
+        return {day: [path, os.path.getmtime(path)] for day, path in files.items()}
+
+    @staticmethod
+    def read_csv(path: str) -> pd.DataFrame:
+        """读取一个日期文件，返回 index 为 6 位代码、列为 BAR_FIELDS 的 DataFrame。"""
+        df = pd.read_csv(path, dtype={"代码": str, "ts_code": str})
+        if "ts_code" in df.columns:
+            codes = df["ts_code"]
+        elif "代码" in df.columns:
+            df = df.rename(columns=AKSHARE_FIELD_MAP)
+            if "amount" in df.columns:
+                df["amount"] = pd.to_numeric(df["amount"], errors="coerce") / 1000.0
+            codes = df["代码"]
+        else:
+            return pd.DataFrame(columns=list(BAR_FIELDS))
+        out = pd.DataFrame({
+            name: pd.to_numeric(df[name], errors="coerce") if name in df.columns else np.nan
+            for name in BAR_FIELDS
+        })
+        out.index = [_clean_code(c) for c in codes]
+        return out[~out.index.duplicated(keep="last")]
+
+    def _read_meta(self) -> Optional[Dict]:
+        if not os.path.exists(self.meta_path):
+            return None
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Failed to read bar store meta: {e}")
+            return None
+
+    def dirty_dates(self) -> List[str]:
+        """尚未入库或源文件已修改的日期。"""
+        meta = self._read_meta() or {}
+        stored = meta.get("source", {})
+        current = self._signature(self.source_files())
+        return [day for day, sig in current.items() if stored.get(day) != sig]
+
+    def is_stale(self) -> bool:
+        meta = self._read_meta()
+        return meta is None or not self._dtype_current(meta) or bool(self.dirty_dates())
+
+    @staticmethod
+    def _dtype_current(meta: Dict) -> bool:
+        # 早期版本以 float32 入库，没有 dtype 字段，需要全量重建
+        return meta.get("dtype") == np.dtype(BAR_DTYPE).name
+
+    # --- 构建 ---
+
+    def build(self, full: bool = False) -> Optional[BarPanel]:
+        """
+        增量入库并原子替换磁盘文件。
+        :param full: 忽略现有面板，从全部 CSV 重建
+        """
+        files = self.source_files()
+        if not files:
+            self.logger.warning(f"No daily CSV found in {self.source_dirs}")
+            return None
+
+        signature = self._signature(files)
+        meta = self._read_meta() or {}
+        old = None if full or not self._dtype_current(meta) else self.load(auto_build=False)
+        stored = {} if old is None else meta.get("source", {})
+        todo = [day for day in files if stored.get(day) != signature[day]]
+
+        frames = {}
+        for day in todo:
+            try:
+                frames[day] = self.read_csv(files[day])
+            except Exception as e:
+                self.logger.error(f"Failed to read {files[day]}: {e}")
+                signature.pop(day)
+
+        new_dates = np.array([np.datetime64(_iso(day), "D") for day in frames], dtype="datetime64[D]")
+        old_dates = old.dates if old is not None else np.array([], dtype="datetime64[D]")
+        dates = np.union1d(old_dates, new_dates)
+        symbol_set = set(old.symbols) if old is not None else set()
+        for df in frames.values():
+            symbol_set.update(df.index)
+        symbols = sorted(symbol_set)
+        symbol_pos = {code: i for i, code in enumerate(symbols)}
+
+        fields = {name: np.full((len(symbols), len(dates)), np.nan, dtype=BAR_DTYPE) for name in BAR_FIELDS}
+        if old is not None and len(old_dates):
+            rows = np.array([symbol_pos[c] for c in old.symbols], dtype=np.int64)
+            cols = np.searchsorted(dates, old_dates)
+            for name in BAR_FIELDS:
+                if name in old.fields:
+                    fields[name][np.ix_(rows, cols)] = old.fields[name]
+        for day, df in frames.items():
+            col = int(np.searchsorted(dates, np.datetime64(_iso(day), "D")))
+            rows = np.fromiter((symbol_pos[c] for c in df.index), dtype=np.int64, count=len(df))
+            for name in BAR_FIELDS:
+                # 被修改的日期整列覆盖 (先清空，避免残留已删除的股票)
+                fields[name][:, col] = np.nan
+                fields[name][rows, col] = df[name].to_numpy(dtype=BAR_DTYPE)
+
+        meta = {
+            "fields": list(BAR_FIELDS),
+            "symbols": symbols,
+            "shape": [len(symbols), len(dates)],
+            "dtype": np.dtype(BAR_DTYPE).name,
+            "source": signature,
+            "version": f"v{time.time_ns()}",
+        }
+        self._write_atomic(fields, dates, meta)
+        with self._lock:
+            # 释放本进程对旧版本的映射，旧目录才能删除
+            self._panel = None
+            old = None
+        _remove_old_versions(self.store_dir, meta["version"], self.logger)
+        self.logger.info(f"Built daily bar store: {len(symbols)} symbols x {len(dates)} dates ({len(frames)} new)")
+        return self.load(auto_build=False)
+
+    def _write_atomic(self, fields: Dict[str, np.ndarray], dates: np.ndarray, meta: Dict):
+        # 数据写入新的版本目录 (不触碰正在被映射的旧文件)，meta 最后替换，读取方以 meta 的 shape 校验各字段
+        data_dir = self._data_dir(meta)
+        os.makedirs(data_dir, exist_ok=True)
+        for name, arr in list(fields.items()) + [("dates", dates)]:
+            with open(os.path.join(data_dir, f"{name}.npy"), "wb") as f:
+                np.save(f, arr)
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, self.meta_path)
+
+    # --- 加载 ---
+
+    def load(self, auto_build: bool = True) -> Optional[BarPanel]:
+        """
+        内存映射加载面板。同一进程内重复调用返回缓存对象，磁盘文件更新后自动重新映射。
+        :param auto_build: 有新的日期文件时先增量入库
+        """
+        if auto_build:
+            now = time.monotonic()
+            if self._checked_at is None or now - self._checked_at >= self.stale_check_interval:
+                self._checked_at = now
+                if self.is_stale():
+                    return self.build()
+
+        if not os.path.exists(self.meta_path):
+            return None
+
+        stamp = os.path.getmtime(self.meta_path)
+        with self._lock:
+            if self._panel is not None and self._panel_stamp == stamp:
+                return self._panel
+
+            meta = self._read_meta()
+            if meta is None:
+                return None
+            data_dir = self._data_dir(meta)
+            try:
+                fields = {name: np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r") for name in meta["fields"]}
+                dates = np.load(os.path.join(data_dir, "dates.npy"))
+            except Exception as e:
+                self.logger.error(f"Failed to load daily bar store: {e}")
+                return None
+
+            if any(list(arr.shape) != meta.get("shape") for arr in fields.values()):
+                self.logger.warning("Daily bar store shape mismatch with meta, rebuild required.")
+                return None
+
+            self._panel = BarPanel(fields, dates, meta["symbols"])
+            self._panel_stamp = stamp
+            return self._panel
+
+    def get_history(self, code: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        panel = self.load()
+        if panel is None:
+            return pd.DataFrame()
+        return panel.history(code, start, end)
+
+
+_shared: Optional[DailyBarStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_bar_store() -> DailyBarStore:
+    """
+    进程内共享的默认日线存储。
+    同步 (build) 与查询使用同一个实例，重建后旧映射随即释放，查询方下次 load 即看到新版本。
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DailyBarStore()
+        return _shared
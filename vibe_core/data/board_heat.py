@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from .board_index import BoardIndex, KIND_INDUSTRY
+
+HEAT_COLUMNS = ["board", "kind", "size", "up", "broken", "down", "weight", "score", "ratio", "leaders"]
+
+
+class BoardHeat:
+    """
+    板块热度聚合。
+    通过 BoardIndex 的 stock -> boards CSR 一次性展开涨停/炸板/跌停池中的全部股票，
+    用 np.bincount 同时得到所有概念和行业的计数与加权分，不做逐行循环。
+
+    权重规则 (与行业热力图一致): 涨幅 > 11% (20cm) 记 2 分，否则 1 分。
+    热度分 score = 涨停加权分 - 0.5 * 炸板数 - 跌停数。
+    """
+
+    broken_penalty = 0.5
+    down_penalty = 1.0
+
+    def __init__(self, index: BoardIndex):
+        self.index = index
+        self.sizes = np.diff(index.board_indptr)
+
+    @staticmethod
+    def limit_weights(df: pd.DataFrame) -> np.ndarray:
+        """涨停股权重: 20cm 记 2 分，10cm 记 1 分。"""
+        if "涨跌幅" not in df.columns:
+            return np.ones(len(df))
+        change = pd.to_numeric(df["涨跌幅"], errors="coerce").fillna(0).to_numpy()
+        return np.where(change > 11, 2.0, 1.0)
+
+    def _expand(self, df: Optional[pd.DataFrame]):
+        """把股票池展开为 (owner, board_ids) 边列表。"""
+        if df is None or df.empty or "代码" not in df.columns:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return self.index.expand_stocks(self.index.stock_ids(df["代码"].astype(str)))
+
+    def _count(self, df: Optional[pd.DataFrame]) -> np.ndarray:
+        _, board_ids = self._expand(df)
+        return np.bincount(board_ids, minlength=self.index.num_boards)
+
+    def _leaders(self, df: pd.DataFrame, owner: np.ndarray, board_ids: np.ndarray, top_k: int) -> Dict[int, List[dict]]:
+        """每个板块内按 (连板数, 涨跌幅) 取前 top_k 只涨停股。"""
+        if top_k <= 0 or len(owner) == 0:
+            return {}
+        streak = pd.to_numeric(df["连板数"], errors="coerce").fillna(1).to_numpy() if "连板数" in df.columns else np.ones(len(df))
+        change = pd.to_numeric(df["涨跌幅"], errors="coerce").fillna(0).to_numpy() if "涨跌幅" in df.columns else np.zeros(len(df))
+        # 按板块分组，组内按强度降序
+        order = np.lexsort((-change[owner], -streak[owner], board_ids))
+        sorted_boards = board_ids[order]
+        group_start = np.r_[0, np.flatnonzero(np.diff(sorted_boards)) + 1]
+        rank = np.arange(len(order)) - np.repeat(group_start, np.diff(np.r_[group_start, len(order)]))
+        keep = order[rank < top_k]
+
+        codes = df["代码"].astype(str).to_numpy()
+        names = df["名称"].astype(str).to_numpy() if "名称" in df.columns else codes
+        leaders: Dict[int, List[dict]] = {}
+        for pos, b in zip(owner[keep], board_ids[keep]):
+            leaders.setdefault(int(b), []).append({
+                "code": codes[pos], "name": names[pos], "boards": int(streak[pos]),
+            })
+        return leaders
+
+    def compute(self, limit_up: Optional[pd.DataFrame], broken: Optional[pd.DataFrame] = None,
+                limit_down: Optional[pd.DataFrame] = None, kind: Optional[int] = None,
+                top_k: int = 3, max_size: Optional[int] = None) -> pd.DataFrame:
+        """
+        汇总全部板块的热度，只返回至少有一只涨停/炸板/跌停股的板块，按 score 降序。
+        :param kind: None 全部; 0 概念; 1 行业
+        :param max_size: 排除成分股过多的泛板块 (如融资融券、深股通)
+        :return: DataFrame[board, kind, size, up, broken, down, weight, score, ratio, leaders]
+        """
+        n = self.index.num_boards
+        owner, board_ids = self._expand(limit_up)
+        up = np.bincount(board_ids, minlength=n)
+        weight = np.bincount(board_ids, weights=self.limit_weights(limit_up)[owner], minlength=n) if len(owner) else np.zeros(n)
+        broken_count = self._count(broken)
+        down_count = self._count(limit_down)
+
+        hit = np.flatnonzero(up + broken_count + down_count)
+        if kind is not None:
+            hit = hit[self.index.board_kinds[hit] == kind]
+        if max_size is not None:
+            hit = hit[self.sizes[hit] <= max_size]
+        if len(hit) == 0:
+            return pd.DataFrame(columns=HEAT_COLUMNS)
+
+        leaders = self._leaders(limit_up, owner, board_ids, top_k)
+        score = weight - self.broken_penalty * broken_count - self.down_penalty * down_count
+        sizes = self.sizes[hit]
+        result = pd.DataFrame({
+            "board": [self.index.boards[i] for i in hit],
+            "kind": np.where(self.index.board_kinds[hit] == KIND_INDUSTRY, "industry", "concept"),
+            "size": sizes,
+            "up": up[hit].astype(int),
+            "broken": broken_count[hit].astype(int),
+            "down": down_count[hit].astype(int),
+            "weight": weight[hit],
+            "score": score[hit],
+            "ratio": np.divide(up[hit], sizes, out=np.zeros(len(hit)), where=sizes > 0),
+            "leaders": [leaders.get(int(i), []) for i in hit],
+        })
+        return result.sort_values(["score", "ratio"], ascending=False).reset_index(drop=True)
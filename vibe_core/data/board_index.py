@@ -0,0 +1,234 @@
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 板块类型
+KIND_CONCEPT = 0
+KIND_INDUSTRY = 1
+
+
+class BoardIndex:
+    """
+    板块 <-> 股票双向索引。
+    股票代码与板块名被映射为连续整数 ID，邻接关系以 CSR (indptr + indices) 存储两份：
+      - board -> stocks: board_indptr / board_indices
+      - stock -> boards: stock_indptr / stock_indices
+    每行内的 ID 已排序，交集/并集可直接用 NumPy 集合运算。
+    """
+
+    def __init__(self, boards: Sequence[str], stocks: Sequence[str],
+                 board_indptr: np.ndarray, board_indices: np.ndarray,
+                 stock_indptr: np.ndarray, stock_indices: np.ndarray,
+                 board_kinds: Optional[np.ndarray] = None):
+        self.boards: List[str] = list(boards)
+        self.stocks: List[str] = list(stocks)
+        self.board_indptr = board_indptr
+        self.board_indices = board_indices
+        self.stock_indptr = stock_indptr
+        self.stock_indices = stock_indices
+        self.board_kinds = board_kinds if board_kinds is not None else np.zeros(len(self.boards), dtype=np.int8)
+        self._board_ids: Dict[str, int] = {name: i for i, name in enumerate(self.boards)}
+        self._stock_ids: Dict[str, int] = {code: i for i, code in enumerate(self.stocks)}
+
+    # --- 构建 ---
+
+    @classmethod
+    def from_mapping(cls, board_stocks: Dict[str, Iterable[str]], industries: Optional[Iterable[str]] = None) -> "BoardIndex":
+        """
+        由 {板块名: [股票代码]} 构建索引。
+        :param industries: 属于行业的板块名 (其余视为概念)
+        """
+        boards = sorted(board_stocks.keys())
+        stock_set = set()
+        for codes in board_stocks.values():
+            stock_set.update(str(c) for c in codes)
+        stocks = sorted(stock_set)
+        stock_ids = {code: i for i, code in enumerate(stocks)}
+
+        # 边列表 (board_id, stock_id)
+        edge_board, edge_stock = [], []
+        for b, name in enumerate(boards):
+            ids = sorted(set(stock_ids[str(c)] for c in board_stocks[name]))
+            edge_board.extend([b] * len(ids))
+            edge_stock.extend(ids)
+        edge_board = np.asarray(edge_board, dtype=np.int32)
+        edge_stock = np.asarray(edge_stock, dtype=np.int32)
+
+        board_indptr, board_indices = _to_csr(edge_board, edge_stock, len(boards))
+        stock_indptr, stock_indices = _to_csr(edge_stock, edge_board, len(stocks))
+
+        kinds = np.zeros(len(boards), dtype=np.int8)
+        if industries:
+            industry_set = set(industries)
+            kinds[[i for i, name in enumerate(boards) if name in industry_set]] = KIND_INDUSTRY
+
+        return cls(boards, stocks, board_indptr, board_indices, stock_indptr, stock_indices, kinds)
+
+    @classmethod
+    def from_json(cls, board_map_path: str, industries: Optional[Iterable[str]] = None) -> "BoardIndex":
+        with open(board_map_path, "r", encoding="utf-8") as f:
+            return cls.from_mapping(json.load(f), industries)
+
+    # --- 二进制读写 ---
+
+    def save(self, path: str):
+        """保存为未压缩的 .npz (原子替换)。"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                boards=np.asarray(self.boards, dtype=str),
+                stocks=np.asarray(self.stocks, dtype=str),
+                board_indptr=self.board_indptr,
+                board_indices=self.board_indices,
+                stock_indptr=self.stock_indptr,
+                stock_indices=self.stock_indices,
+                board_kinds=self.board_kinds,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BoardIndex":
+        with np.load(path) as data:
+            return cls(
+                data["boards"].tolist(), data["stocks"].tolist(),
+                data["board_indptr"], data["board_indices"],
+                data["stock_indptr"], data["stock_indices"],
+                data["board_kinds"],
+            )
+
+    @classmethod
+    def load_or_build(cls, board_map_path: str, index_path: str, industries: Optional[Iterable[str]] = None) -> Optional["BoardIndex"]:
+        """二进制索引比 JSON 新时直接加载，否则从 JSON 重建并保存。"""
+        logger = logging.getLogger("vibe.data.board_index")
+        if os.path.exists(index_path) and (
+                not os.path.exists(board_map_path) or os.path.getmtime(index_path) >= os.path.getmtime(board_map_path)):
+            try:
+                return cls.load(index_path)
+            except Exception as e:
+                logger.warning(f"Failed to load {index_path}, rebuilding: {e}")
+
+        if not os.path.exists(board_map_path):
+            return None
+        index = cls.from_json(board_map_path, industries)
+        try:
+            index.save(index_path)
+        except Exception as e:
+            logger.warning(f"Failed to save board index: {e}")
+        logger.info(f"Built board index: {len(index.boards)} boards, {len(index.stocks)} stocks, {len(index.board_indices)} links")
+        return index
+
+    # --- ID 映射 ---
+
+    @property
+    def num_boards(self) -> int:
+        return len(self.boards)
+
+    @property
+    def num_stocks(self) -> int:
+        return len(self.stocks)
+
+    def board_id(self, name: str) -> int:
+        return self._board_ids.get(name, -1)
+
+    def stock_id(self, code: str) -> int:
+        return self._stock_ids.get(_clean_code(code), -1)
+
+    def stock_ids(self, codes: Iterable[str]) -> np.ndarray:
+        """批量映射股票代码，未知代码为 -1。"""
+        get = self._stock_ids.get
+        return np.fromiter((get(_clean_code(c), -1) for c in codes), dtype=np.int32)
+
+    def board_ids(self, names: Iterable[str]) -> np.ndarray:
+        get = self._board_ids.get
+        return np.fromiter((get(n, -1) for n in names), dtype=np.int32)
+
+    # --- 查询 ---
+
+    def stock_ids_of_board(self, board_id: int) -> np.ndarray:
+        return self.board_indices[self.board_indptr[board_id]:self.board_indptr[board_id + 1]]
+
+    def board_ids_of_stock(self, stock_id: int) -> np.ndarray:
+        return self.stock_indices[self.stock_indptr[stock_id]:self.stock_indptr[stock_id + 1]]
+
+    def stocks_of(self, board: str) -> List[str]:
+        b = self.board_id(board)
+        if b < 0:
+            return []
+        return [self.stocks[i] for i in self.stock_ids_of_board(b)]
+
+    def boards_of(self, code: str) -> List[str]:
+        s = self.stock_id(code)
+        if s < 0:
+            return []
+        return [self.boards[i] for i in self.board_ids_of_stock(s)]
+
+    def intersection(self, board_a: str, board_b: str) -> List[str]:
+        """同时属于两个板块的股票。"""
+        a, b = self.board_id(board_a), self.board_id(board_b)
+        if a < 0 or b < 0:
+            return []
+        common = np.intersect1d(self.stock_ids_of_board(a), self.stock_ids_of_board(b), assume_unique=True)
+        return [self.stocks[i] for i in common]
+
+    def expand_stocks(self, stock_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量展开 stock -> boards 邻接行。
+        :return: (owner, board_ids)，owner[k] 为 board_ids[k] 所属的输入位置
+        """
+        stock_ids = np.asarray(stock_ids, dtype=np.int64)
+        valid = np.flatnonzero(stock_ids >= 0)
+        ids = stock_ids[valid]
+        starts = self.stock_indptr[ids]
+        lengths = self.stock_indptr[ids + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=self.stock_indices.dtype)
+        # 把多个 [start, end) 区间拼接成一个下标数组
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        owner = np.repeat(valid, lengths)
+        return owner, self.stock_indices[offsets]
+
+    def board_counts(self, codes: Sequence[str], weights: Optional[Sequence[float]] = None) -> np.ndarray:
+        """
+        统计一组股票在每个板块中的个数 (或权重和)。
+        :return: 长度为 num_boards 的数组
+        """
+        owner, board_ids = self.expand_stocks(self.stock_ids(codes))
+        w = None if weights is None else np.asarray(weights, dtype=np.float64)[owner]
+        return np.bincount(board_ids, weights=w, minlength=self.num_boards)
+
+    def boards_of_many(self, codes: Sequence[str], kind: Optional[int] = None) -> pd.DataFrame:
+        """一组股票 (如涨停池) 所属板块及命中个数，按个数降序。"""
+        counts = self.board_counts(codes)
+        hit = np.flatnonzero(counts)
+        if kind is not None:
+            hit = hit[self.board_kinds[hit] == kind]
+        df = pd.DataFrame({
+            "board": [self.boards[i] for i in hit],
+            "count": counts[hit].astype(int),
+            "size": np.diff(self.board_indptr)[hit],
+        })
+        return df.sort_values(["count", "size"], ascending=[False, True]).reset_index(drop=True)
+
+
+def _to_csr(rows: np.ndarray, cols: np.ndarray, n_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """边列表转 CSR，行内按列 ID 排序。"""
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32)
+
+
+def _clean_code(code) -> str:
+    """600519.SH / sh600519 / 600519 -> 600519"""
+    code = str(code).strip()
+    if "." in code:
+        code = code.split(".")[0]
+    if len(code) == 8 and code[:2].lower() in ("sh", "sz", "bj"):
+        code = code[2:]
+    return code.zfill(6) if code.isdigit() else code
@@ -0,0 +1,225 @@
+import os
+import datetime
+import logging
+import threading
+import numpy as np
+from typing import Callable, Iterable, List, Optional, Union
+
+DateLike = Union[str, datetime.date, datetime.datetime, np.datetime64]
+
+DEFAULT_CALENDAR_PATH = os.path.join("data", "calendar", "trade_dates.txt")
+
+
+def to_day(value: DateLike) -> np.datetime64:
+    """20240102 / 2024-01-02 / date / datetime / datetime64 -> datetime64[D]"""
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[D]")
+    if isinstance(value, datetime.datetime):
+        return np.datetime64(value.date(), "D")
+    if isinstance(value, datetime.date):
+        return np.datetime64(value, "D")
+    text = str(value).strip()[:10]
+    if len(text) >= 8 and text[:8].isdigit():
+        text = f"{text[:4]}-{text[4:6]}-{text[6:8]}"
+    return np.datetime64(text, "D")
+
+
+def day_strings(days: Iterable[np.datetime64], sep: str = "") -> List[str]:
+    """datetime64[D] 数组 -> ["20240102", ...] (sep="-" 时为 2024-01-02)"""
+    text = np.datetime_as_string(np.asarray(days, dtype="datetime64[D]"), unit="D")
+    return [s.replace("-", sep) for s in text.tolist()]
+
+
+class TradingCalendar:
+    """
+    A 股交易日历。
+    交易日保存为排序的 datetime64[D] 数组，并展开为从首个交易日开始的逐日布尔掩码
+    _open 和累计计数 _rank (截至某日的交易日个数)：
+      - is_trading_day: 掩码直接下标，O(1)
+      - next/prev_trading_day: 由累计计数定位到交易日数组下标，O(1)
+      - trading_days_between: 交易日数组切片
+    日历覆盖范围之外 (或尚未下载日历时) 按周一至周五近似。
+    持久化为纯文本 (每行一个 YYYY-MM-DD)，只有日历不再覆盖未来 refresh_horizon 天时才需要联网刷新。
+    """
+
+    refresh_horizon = 30
+
+    def __init__(self, dates: Optional[Iterable[DateLike]] = None, path: str = DEFAULT_CALENDAR_PATH):
+        self.path = path
+        self.logger = logging.getLogger("vibe.data.calendar")
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._attempted: Optional[np.datetime64] = None
+        self._set_dates(dates if dates is not None else [])
+
+    def _set_dates(self, dates: Iterable[DateLike]):
+        days = np.unique(np.asarray([to_day(d) for d in dates], dtype="datetime64[D]"))
+        if len(days):
+            span = int((days[-1] - days[0]).astype(np.int64)) + 1
+            is_open = np.zeros(span, dtype=bool)
+            is_open[(days - days[0]).astype(np.int64)] = True
+            rank = np.cumsum(is_open, dtype=np.int64)
+        else:
+            is_open = np.zeros(0, dtype=bool)
+            rank = np.zeros(0, dtype=np.int64)
+        # 一次性替换，读线程无需加锁
+        self.dates, self._open, self._rank = days, is_open, rank
+
+    # --- 持久化 ---
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_CALENDAR_PATH) -> "TradingCalendar":
+        calendar = cls(path=path)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    calendar._set_dates(line for line in f.read().split() if line)
+            except Exception as e:
+                calendar.logger.warning(f"Failed to load trade calendar {path}: {e}")
+        return calendar
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(day_strings(self.dates, sep="-")))
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def fetch_remote() -> List[str]:
+        """新浪交易日历 (含当年已公布的未来交易日)。"""
+        import akshare as ak
+        df = ak.tool_trade_date_hist_sina()
+        if df is None or df.empty:
+            return []
+        return df["trade_date"].astype(str).tolist()
+
+    def refresh(self, fetch: Optional[Callable[[], Iterable[DateLike]]] = None) -> int:
+        """联网下载完整日历并持久化，返回交易日个数；失败时保留原日历。"""
+        with self._lock:
+            self._attempted = to_day(datetime.date.today())
+            try:
+                dates = list((fetch or self.fetch_remote)())
+                if not dates:
+                    self.logger.warning("Trade calendar download returned no dates.")
+                    return len(self.dates)
+                self._set_dates(dates)
+                self.save()
+                self.logger.info(f"Trade calendar refreshed: {len(self.dates)} days, last {self.dates[-1]}")
+            except Exception as e:
+                self.logger.error(f"Failed to refresh trade calendar: {e}")
+            return len(self.dates)
+
+    def needs_refresh(self, today: Optional[DateLike] = None) -> bool:
+        """日历为空或不再覆盖 today 之后 refresh_horizon 天时需要刷新；同一天内最多尝试一次。"""
+        today = to_day(today or datetime.date.today())
+        if len(self.dates) and self.dates[-1] >= today + np.timedelta64(self.refresh_horizon, "D"):
+            return False
+        return self._attempted is None or self._attempted < today
+
+    def refresh_async(self, fetch: Optional[Callable[[], Iterable[DateLike]]] = None) -> bool:
+        """后台线程刷新，调用方不等待网络。"""
+        if self._refreshing:
+            return False
+        self._refreshing = True
+
+        def run():
+            try:
+                self.refresh(fetch)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="TradeCalendarRefresh", daemon=True).start()
+        return True
+
+    # --- 查询 ---
+
+    def covers(self, day: DateLike) -> bool:
+        return bool(len(self.dates)) and self.dates[0] <= to_day(day) <= self.dates[-1]
+
+    def _offset(self, day: np.datetime64) -> int:
+        return int((day - self.dates[0]).astype(np.int64)) if len(self.dates) else -1
+
+    def is_trading_day(self, day: DateLike) -> bool:
+        day = to_day(day)
+        offset = self._offset(day)
+        if 0 <= offset < len(self._open):
+            return bool(self._open[offset])
+        return bool(np.is_busday(day))
+
+    def _count_before(self, day: np.datetime64) -> int:
+        """日历内严格早于 day 的交易日个数。"""
+        offset = self._offset(day)
+        if offset <= 0:
+            return 0
+        return int(self._rank[min(offset, len(self._rank)) - 1])
+
+    def next_trading_day(self, day: DateLike) -> datetime.date:
+        """严格晚于 day 的下一个交易日。"""
+        day = to_day(day)
+        if len(self.dates) and day >= self.dates[0] - np.timedelta64(1, "D"):
+            k = self._count_before(day + np.timedelta64(1, "D"))
+            if k < len(self.dates):
+                return self.dates[k].astype(datetime.date)
+        return np.busday_offset(day + np.timedelta64(1, "D"), 0, roll="forward").astype(datetime.date)
+
+    def prev_trading_day(self, day: DateLike) -> datetime.date:
+        """严格早于 day 的上一个交易日。"""
+        day = to_day(day)
+        if len(self.dates) and day <= self.dates[-1] + np.timedelta64(1, "D"):
+            k = self._count_before(day)
+            if k > 0:
+                return self.dates[k - 1].astype(datetime.date)
+        return np.busday_offset(day - np.timedelta64(1, "D"), 0, roll="backward").astype(datetime.date)
+
+    def last_trading_day(self, day: DateLike) -> datetime.date:
+        """不晚于 day 的最近交易日 (day 本身是交易日时返回 day)。"""
+        day = to_day(day)
+        if self.is_trading_day(day):
+            return day.astype(datetime.date)
+        return self.prev_trading_day(day)
+
+    def trading_days_between(self, start: DateLike, end: DateLike) -> np.ndarray:
+        """[start, end] 闭区间内的交易日 (datetime64[D] 数组)；超出日历的部分按工作日补齐。"""
+        start, end = to_day(start), to_day(end)
+        if end < start:
+            return np.empty(0, dtype="datetime64[D]")
+        if not len(self.dates):
+            return _weekdays(start, end)
+        first, last = self.dates[0], self.dates[-1]
+        parts = []
+        if start < first:
+            parts.append(_weekdays(start, min(end, first - np.timedelta64(1, "D"))))
+        if end >= first and start <= last:
+            lo = self._count_before(max(start, first))
+            hi = self._count_before(min(end, last) + np.timedelta64(1, "D"))
+            parts.append(self.dates[lo:hi])
+        if end > last:
+            parts.append(_weekdays(max(start, last + np.timedelta64(1, "D")), end))
+        return np.concatenate(parts) if parts else np.empty(0, dtype="datetime64[D]")
+
+
+def _weekdays(start: np.datetime64, end: np.datetime64) -> np.ndarray:
+    if end < start:
+        return np.empty(0, dtype="datetime64[D]")
+    days = np.arange(start, end + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    return days[np.is_busday(days)]
+
+
+_shared: Optional[TradingCalendar] = None
+_shared_lock = threading.Lock()
+
+
+def get_trading_calendar(auto_refresh: bool = True) -> TradingCalendar:
+    """
+    进程内共享的交易日历。
+    首次调用从磁盘加载；日历过期时在后台线程刷新，查询始终不阻塞在网络上。
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = TradingCalendar.load()
+        calendar = _shared
+    if auto_refresh and calendar.needs_refresh():
+        calendar.refresh_async()
+    return calendar
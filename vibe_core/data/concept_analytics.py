@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Sequence
+from .concept_store import ConceptPanel
+
+
+class ConceptAnalytics:
+    """
+    概念/板块强度分析引擎。
+    所有指标都在 date × concept 收盘价矩阵上一次性向量化计算，覆盖全部概念，
+    结果按参数缓存，面板不变时重复调用不重新计算。
+    """
+
+    def __init__(self, panel: ConceptPanel):
+        self.panel = panel
+        self.concepts: List[str] = panel.concepts
+        self.dates = panel.dates
+        # 复制为内存数组，避免每次计算都访问 mmap
+        self.close = np.asarray(panel.field("close"), dtype=np.float64)
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def _cached(self, key: tuple, func):
+        if key not in self._cache:
+            self._cache[key] = func()
+        return self._cache[key]
+
+    # --- 收益 ---
+
+    def daily_returns(self) -> np.ndarray:
+        """日收益率 (date, concept)，首行为 NaN。"""
+        def calc():
+            out = np.full_like(self.close, np.nan)
+            out[1:] = self.close[1:] / self.close[:-1] - 1.0
+            return out
+        return self._cached(("daily",), calc)
+
+    def rolling_returns(self, window: int) -> np.ndarray:
+        """N 日滚动收益率 close[t] / close[t-N] - 1，前 N 行为 NaN。"""
+        def calc():
+            out = np.full_like(self.close, np.nan)
+            if window < len(self.close):
+                out[window:] = self.close[window:] / self.close[:-window] - 1.0
+            return out
+        return self._cached(("ret", window), calc)
+
+    def benchmark_curve(self, benchmark: Optional[str] = None) -> np.ndarray:
+        """
+        基准净值曲线。
+        :param benchmark: 概念名；None 表示全部概念等权日收益复合而成的指数
+        """
+        def calc():
+            if benchmark is not None:
+                return self.close[:, self.panel.concept_index(benchmark)]
+            daily = self.daily_returns()
+            valid = ~np.isnan(daily)
+            count = valid.sum(axis=1)
+            total = np.where(valid, daily, 0.0).sum(axis=1)
+            mean = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+            return np.cumprod(1.0 + mean)
+        return self._cached(("bench", benchmark), calc)
+
+    def relative_strength(self, window: int, benchmark: Optional[str] = None) -> np.ndarray:
+        """N 日相对强度: 概念 N 日收益 - 基准 N 日收益。"""
+        def calc():
+            curve = self.benchmark_curve(benchmark)
+            bench = np.full(curve.shape, np.nan)
+            if window < len(curve):
+                bench[window:] = curve[window:] / curve[:-window] - 1.0
+            return self.rolling_returns(window) - bench[:, None]
+        return self._cached(("rs", window, benchmark), calc)
+
+    def momentum_rank(self, window: int) -> np.ndarray:
+        """N 日收益的横截面百分位排名 (0~1，越大越强)，NaN 不参与排名。"""
+        def calc():
+            ranks = pd.DataFrame(self.rolling_returns(window)).rank(axis=1, pct=True)
+            return ranks.to_numpy()
+        return self._cached(("rank", window), calc)
+
+    # --- 风险 ---
+
+    def drawdown(self) -> np.ndarray:
+        """相对历史最高收盘价的回撤 (<= 0)。"""
+        def calc():
+            filled = np.where(np.isnan(self.close), -np.inf, self.close)
+            peak = np.maximum.accumulate(filled, axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return self.close / peak - 1.0
+        return self._cached(("dd",), calc)
+
+    def max_drawdown(self, window: Optional[int] = None) -> np.ndarray:
+        """每个概念的最大回撤；指定 window 时只统计最近 window 个交易日。"""
+        def calc():
+            close = self.close if window is None else self.close[-window:]
+            filled = np.where(np.isnan(close), -np.inf, close)
+            peak = np.maximum.accumulate(filled, axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                dd = close / peak - 1.0
+            with np.errstate(invalid="ignore"):
+                return np.nanmin(np.where(np.isfinite(dd), dd, np.nan), axis=0)
+        return self._cached(("mdd", window), calc)
+
+    def correlation(self, window: int = 60, concepts: Optional[Iterable[str]] = None, min_periods: int = 20) -> pd.DataFrame:
+        """最近 window 个交易日日收益率的相关系数矩阵。"""
+        daily = self.daily_returns()[-window:]
+        names = self.concepts
+        if concepts is not None:
+            known = set(self.concepts)
+            names = [c for c in concepts if c in known]
+            daily = daily[:, [self.panel.concept_index(c) for c in names]]
+        return pd.DataFrame(daily, columns=names).corr(min_periods=min_periods)
+
+    # --- 汇总 ---
+
+    def summary(self, windows: Sequence[int] = (5, 20, 60), benchmark: Optional[str] = None,
+                rank_window: int = 20, date: Optional[str] = None) -> pd.DataFrame:
+        """
+        某一日 (默认最新) 全部概念的强度汇总表，按 rank_window 的动量排名降序。
+        列: close, ret_{N}, rs_{N}, rank, drawdown
+        """
+        row = len(self.dates) - 1
+        if date is not None:
+            row = self.panel.date_slice(end=date).stop - 1
+        if row < 0:
+            return pd.DataFrame()
+
+        data = {"close": self.close[row]}
+        for w in windows:
+            data[f"ret_{w}"] = self.rolling_returns(w)[row]
+            data[f"rs_{w}"] = self.relative_strength(w, benchmark)[row]
+        data["rank"] = self.momentum_rank(rank_window)[row]
+        data["drawdown"] = self.drawdown()[row]
+
+        df = pd.DataFrame(data, index=pd.Index(self.concepts, name="concept"))
+        return df.sort_values("rank", ascending=False)
+
+    @staticmethod
+    def rank_snapshot(df: pd.DataFrame, columns: Sequence[str] = ("涨跌幅", "换手率"), name_col: str = "板块名称") -> pd.DataFrame:
+        """
+        对实时板块快照 (如 em_concepts.csv / get_em_concepts) 做横截面百分位排名。
+        东财概念本地没有历史序列，只能在快照上做排名。
+        """
+        if df is None or df.empty or name_col not in df.columns:
+            return pd.DataFrame()
+        out = df.set_index(name_col)
+        cols = [c for c in columns if c in out.columns]
+        ranks = out[cols].apply(pd.to_numeric, errors="coerce").rank(pct=True)
+        ranks.columns = [f"{c}_rank" for c in cols]
+        result = out[cols].join(ranks)
+        if ranks.shape[1]:
+            result["score"] = ranks.mean(axis=1)
+            result = result.sort_values("score", ascending=False)
+        return result
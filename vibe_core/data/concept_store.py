@@ -0,0 +1,390 @@
+import os
+import json
+import glob
+import time
+import shutil
+import logging
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+# CSV 列名 -> 面板字段名
+CSV_FIELD_MAP = {
+    "开盘价": "open",
+    "最高价": "high",
+    "最低价": "low",
+    "收盘价": "close",
+    "成交量": "volume",
+    "成交额": "amount",
+}
+FIELDS: Tuple[str, ...] = tuple(CSV_FIELD_MAP.values())
+DATE_COLUMN = "日期"
+
+
+class ConceptPanel:
+    """
+    概念指数面板 (只读视图)。
+    values 的形状为 (field, date, concept)，每个字段是一块连续的 date × concept 矩阵，
+    因此横截面扫描 (某日全部概念) 和时间序列扫描 (某概念全部日期) 都不需要拷贝。
+    缺失值 (概念上市前) 为 NaN。
+    """
+
+    def __init__(self, values: np.ndarray, dates: np.ndarray, concepts: List[str], fields: Tuple[str, ...] = FIELDS):
+        self.values = values
+        self.dates = dates
+        self.concepts = list(concepts)
+        self.fields = tuple(fields)
+        self._concept_pos: Dict[str, int] = {name: i for i, name in enumerate(self.concepts)}
+        self._field_pos: Dict[str, int] = {name: i for i, name in enumerate(self.fields)}
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.values.shape
+
+    def field(self, name: str) -> np.ndarray:
+        """返回某个字段的 (date, concept) 视图。"""
+        return self.values[self._field_pos[name]]
+
+    def concept(self, name: str) -> np.ndarray:
+        """返回某个概念的 (field, date) 视图。"""
+        return self.values[:, :, self._concept_pos[name]]
+
+    def concept_index(self, name: str) -> int:
+        return self._concept_pos[name]
+
+    def date_slice(self, start: Optional[str] = None, end: Optional[str] = None) -> slice:
+        """按日期闭区间 [start, end] 计算行切片 (二分查找)。"""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(_iso(start), "D"), side="left"))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(_iso(end), "D"), side="right"))
+        return slice(lo, hi)
+
+    def last_valid_dates(self) -> Dict[str, Optional[str]]:
+        """每个概念最后一个有收盘价的日期 (YYYY-MM-DD)，无数据为 None。"""
+        close = self.field("close")
+        valid = ~np.isnan(close)
+        has_any = valid.any(axis=0)
+        # 反向 argmax 得到最后一个 True 的位置
+        last_pos = len(self.dates) - 1 - np.argmax(valid[::-1], axis=0)
+        result = {}
+        for i, name in enumerate(self.concepts):
+            result[name] = str(self.dates[last_pos[i]]) if has_any[i] else None
+        return result
+
+    def to_frame(self, field: str = "close", start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """以 DataFrame 形式返回 date × concept 矩阵 (便于与 pandas 代码衔接)。"""
+        rows = self.date_slice(start, end)
+        return pd.DataFrame(
+            self.field(field)[rows],
+            index=pd.DatetimeIndex(self.dates[rows], name="date"),
+            columns=self.concepts,
+        )
+
+
+class ConceptHistoryStore:
+    """
+    同花顺概念指数历史的列式存储。
+    将 data/concepts/history/ths/*.csv (每个概念一个文件) 合并为一个 float64 面板，
+    以 .npy 二进制保存，加载时使用内存映射 (mmap)，直接返回 NumPy 视图。
+
+    每次构建写入新的版本目录，meta.json 最后原子替换并指向它；
+    正在被 (其他进程) 映射的旧文件不会被覆盖 (Windows 上替换已映射的文件会失败)，
+    旧版本目录在无人映射后的下一次构建时清理。
+
+    目录结构:
+        {store_dir}/{version}/panel.npy   # (field, date, concept) float64
+        {store_dir}/{version}/dates.npy   # datetime64[D]
+        {store_dir}/meta.json             # 字段、概念名、源文件签名、当前版本
+    """
+
+    # load(auto_build=True) 检查源 CSV 的最小间隔 (秒)，避免每次加载都 glob + stat 全部文件
+    stale_check_interval = 30.0
+
+    def __init__(self, source_dir: str = os.path.join("data", "concepts", "history", "ths"),
+                 store_dir: str = os.path.join("data", "concepts", "panel", "ths")):
+        self.source_dir = source_dir
+        self.store_dir = store_dir
+        self.logger = logging.getLogger("vibe.data.concept_store")
+        self._lock = threading.Lock()
+        self._panel: Optional[ConceptPanel] = None
+        self._panel_stamp: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._names_lock = threading.Lock()
+
+    def _data_dir(self, meta: Optional[Dict] = None) -> str:
+        """meta 指向的版本目录 (早期版本没有 version 字段，文件直接位于 store_dir)。"""
+        meta = self._read_meta() if meta is None else meta
+        version = (meta or {}).get("version")
+        return os.path.join(self.store_dir, version) if version else self.store_dir
+
+    @property
+    def panel_path(self) -> str:
+        return os.path.join(self._data_dir(), "panel.npy")
+
+    @property
+    def dates_path(self) -> str:
+        return os.path.join(self._data_dir(), "dates.npy")
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.store_dir, "meta.json")
+
+    # --- 源文件 ---
+
+    @property
+    def names_path(self) -> str:
+        return os.path.join(self.source_dir, "names.json")
+
+    def _read_names(self) -> Dict[str, str]:
+        """文件名 -> 原始概念名 (只记录文件名与概念名不同的概念，如 "A/B" 存为 A_B.csv)。"""
+        if not os.path.exists(self.names_path):
+            return {}
+        try:
+            with open(self.names_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Failed to read concept names: {e}")
+            return {}
+
+    def _remember_name(self, name: str, path: str):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if stem == name:
+            return
+        with self._names_lock:
+            names = self._read_names()
+            if names.get(stem) == name:
+                return
+            names[stem] = name
+            os.makedirs(self.source_dir, exist_ok=True)
+            tmp = self.names_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(names, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.names_path)
+
+    def source_files(self) -> Dict[str, str]:
+        """概念名 -> CSV 路径 (概念名为文件名，文件名经过替换的取 names.json 中的原始名称)。"""
+        names = self._read_names()
+        files = {}
+        for path in glob.glob(os.path.join(self.source_dir, "*.csv")):
+            stem = os.path.splitext(os.path.basename(path))[0]
+            files[names.get(stem, stem)] = path
+        return dict(sorted(files.items()))
+
+    def source_path(self, name: str) -> str:
+        """概念名对应的 CSV 路径 (替换文件名中的路径分隔符)。"""
+        safe = name.replace("/", "_").replace("\\", "_")
+        return os.path.join(self.source_dir, f"{safe}.csv")
+
+    def read_last_date(self, name: str) -> Optional[datetime.date]:
+        """
+        读取某概念本地最后一条记录的日期。
+        只读取文件尾部，不解析整个 CSV；没有换行结尾的末行 (写入被中断) 视为不完整，不计入。
+        """
+        path = self.source_path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - 512))
+                tail = f.read()
+            tail = tail[:tail.rfind(b"\n") + 1]
+            lines = [l for l in tail.decode("utf-8", errors="ignore").splitlines() if l.strip()]
+            if not lines:
+                return None
+            return datetime.date.fromisoformat(_iso(lines[-1].split(",")[0].strip()))
+        except (OSError, ValueError):
+            return None
+
+    def append_rows(self, name: str, df: pd.DataFrame) -> int:
+        """
+        将新行合并进某概念的 CSV (按日期去重，新数据覆盖旧数据)。
+        写入临时文件后 os.replace，保证读取方不会看到写了一半的文件。
+        :return: 新增的行数
+        """
+        if df is None or df.empty or DATE_COLUMN not in df.columns:
+            return 0
+
+        path = self.source_path(name)
+        new = df.copy()
+        new[DATE_COLUMN] = pd.to_datetime(new[DATE_COLUMN]).dt.strftime("%Y-%m-%d")
+        columns = [DATE_COLUMN] + [c for c in CSV_FIELD_MAP if c in new.columns]
+        new = new[columns]
+
+        if os.path.exists(path):
+            old = pd.read_csv(path)
+            before = set(old[DATE_COLUMN].astype(str))
+            merged = pd.concat([old, new], ignore_index=True)
+        else:
+            before = set()
+            merged = new
+
+        merged = merged.drop_duplicates(subset=[DATE_COLUMN], keep="last").sort_values(DATE_COLUMN)
+        added = len(set(new[DATE_COLUMN]) - before)
+
+        os.makedirs(self.source_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        merged.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        self._remember_name(name, path)
+        # 自己写入的变化，下次 load 立即检查
+        self._checked_at = None
+        return added
+
+    def _source_signature(self) -> Dict[str, float]:
+        files = self.source_files()
+        latest = max((os.path.getmtime(p) for p in files.values()), default=0.0)
+        return {"count": len(files), "mtime": latest}
+
+    def _read_meta(self) -> Optional[Dict]:
+        if not os.path.exists(self.meta_path):
+            return None
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Failed to read panel meta: {e}")
+            return None
+
+    def is_stale(self) -> bool:
+        """面板不存在，或源 CSV 数量/修改时间与构建时不一致。"""
+        meta = self._read_meta()
+        data_dir = self._data_dir(meta)
+        if meta is None or not os.path.exists(os.path.join(data_dir, "panel.npy")) \
+                or not os.path.exists(os.path.join(data_dir, "dates.npy")):
+            return True
+        return meta.get("source") != self._source_signature()
+
+    # --- 构建 ---
+
+    @staticmethod
+    def read_csv(path: str) -> pd.DataFrame:
+        """读取单个概念 CSV，返回按日期排序、去重后的 DataFrame (index 为 datetime64)。"""
+        df = pd.read_csv(path)
+        df = df.rename(columns=CSV_FIELD_MAP)
+        df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN])
+        df = df.drop_duplicates(subset=[DATE_COLUMN], keep="last").sort_values(DATE_COLUMN)
+        return df.set_index(DATE_COLUMN)
+
+    def build(self) -> Optional[ConceptPanel]:
+        """从 CSV 重新构建面板并原子替换磁盘文件。"""
+        files = self.source_files()
+        if not files:
+            self.logger.warning(f"No concept CSV found in {self.source_dir}")
+            return None
+
+        signature = self._source_signature()
+        frames = {}
+        for name, path in files.items():
+            try:
+                frames[name] = self.read_csv(path)
+            except Exception as e:
+                self.logger.error(f"Failed to read {path}: {e}")
+
+        concepts = list(frames.keys())
+        all_dates = np.unique(np.concatenate([
+            df.index.values.astype("datetime64[D]") for df in frames.values()
+        ])) if frames else np.array([], dtype="datetime64[D]")
+
+        values = np.full((len(FIELDS), len(all_dates), len(concepts)), np.nan, dtype=np.float64)
+        for col, name in enumerate(concepts):
+            df = frames[name]
+            rows = np.searchsorted(all_dates, df.index.values.astype("datetime64[D]"))
+            for f, field in enumerate(FIELDS):
+                if field in df.columns:
+                    values[f, rows, col] = pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=np.float64)
+
+        meta = {
+            "fields": list(FIELDS),
+            "concepts": concepts,
+            "shape": list(values.shape),
+            "source": signature,
+            "version": f"v{time.time_ns()}",
+        }
+        self._write_atomic(values, all_dates, meta)
+        self.logger.info(f"Built concept panel: {len(concepts)} concepts x {len(all_dates)} dates")
+
+        with self._lock:
+            # 释放本进程对旧版本的映射，旧目录才能删除
+            self._panel = None
+        _remove_old_versions(self.store_dir, meta["version"], self.logger)
+        return self.load(auto_build=False)
+
+    def _write_atomic(self, values: np.ndarray, dates: np.ndarray, meta: Dict):
+        # 数据写入新的版本目录 (不触碰正在被映射的旧文件)，meta 最后替换，读取方以 meta 的 shape 校验面板
+        data_dir = self._data_dir(meta)
+        os.makedirs(data_dir, exist_ok=True)
+        for name, arr in (("panel.npy", values), ("dates.npy", dates)):
+            with open(os.path.join(data_dir, name), "wb") as f:
+                np.save(f, arr)
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, self.meta_path)
+
+    # --- 加载 ---
+
+    def load(self, auto_build: bool = True) -> Optional[ConceptPanel]:
+        """
+        内存映射加载面板。同一进程内重复调用返回缓存对象，磁盘文件更新后自动重新映射。
+        :param auto_build: 面板缺失或过期时自动从 CSV 构建 (每 stale_check_interval 秒最多检查一次源文件)
+        """
+        if auto_build:
+            now = time.monotonic()
+            if self._checked_at is None or now - self._checked_at >= self.stale_check_interval:
+                self._checked_at = now
+                if self.is_stale():
+                    return self.build()
+
+        if not os.path.exists(self.meta_path):
+            return None
+
+        stamp = os.path.getmtime(self.meta_path)
+        with self._lock:
+            if self._panel is not None and self._panel_stamp == stamp:
+                return self._panel
+
+            meta = self._read_meta()
+            if meta is None:
+                return None
+            data_dir = self._data_dir(meta)
+            try:
+                values = np.load(os.path.join(data_dir, "panel.npy"), mmap_mode="r")
+                dates = np.load(os.path.join(data_dir, "dates.npy"))
+            except Exception as e:
+                self.logger.error(f"Failed to load concept panel: {e}")
+                return None
+
+            if list(values.shape) != meta.get("shape"):
+                self.logger.warning("Concept panel shape mismatch with meta, rebuild required.")
+                return None
+
+            self._panel = ConceptPanel(values, dates, meta["concepts"], tuple(meta["fields"]))
+            self._panel_stamp = stamp
+            return self._panel
+
+
+def _remove_old_versions(store_dir: str, current: str, logger: logging.Logger):
+    """
+    删除 store_dir 下除 current 以外的版本目录 (v*) 与早期版本遗留的顶层 .npy；
+    仍被其他进程映射 (Windows 上删除失败) 的留到下次构建。
+    """
+    for entry in os.listdir(store_dir):
+        path = os.path.join(store_dir, entry)
+        try:
+            if os.path.isdir(path) and entry.startswith("v") and entry != current:
+                shutil.rmtree(path)
+            elif os.path.isfile(path) and entry.endswith(".npy"):
+                os.remove(path)
+        except OSError as e:
+            logger.debug(f"Old store version {path} still in use: {e}")
+
+
+def _iso(date: str) -> str:
+    """兼容 YYYYMMDD 与 YYYY-MM-DD。"""
+    date = str(date)
+    if len(date) == 8 and date.isdigit():
+        return f"{date[:4]}-{date[4:6]}-{date[6:]}"
+    return date
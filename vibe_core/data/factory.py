@@ -100,6 +100,8 @@ class DataFactory:
         # Add default routing for get_stock_info to stock_info adapter
         if "get_stock_info" not in routing:
             routing["get_stock_info"] = "stock_info"
+        if "get_stock_info_many" not in routing:
+            routing["get_stock_info_many"] = "stock_info"
         
         return HybridDataProvider(default_provider, providers, routing)
 
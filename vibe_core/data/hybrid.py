@@ -1,7 +1,10 @@
+import time
 import logging
 import pandas as pd
-from typing import Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any
 from .provider import IDataProvider, DataDimension, SyncPolicy, DataCategory
+from vibe_core.metrics import DATA_CALL_ERRORS, DATA_CALL_SECONDS, DATA_PAYLOAD_ROWS, payload_size
+from vibe_core.accounting import accounting
 
 class HybridDataProvider(IDataProvider):
     """
@@ -19,6 +22,7 @@ class HybridDataProvider(IDataProvider):
         self._default = default_provider
         self._providers = providers or {}
         self._routing = routing or {}
+        self._pinned = set()  # 固定的数据源名称，模块加载时的同名注册不会覆盖 (如回放模式)
         
         # 内置默认路由规则 (如果配置未覆盖)
         # 优先使用 AKShare 处理板块、涨跌停、历史数据
@@ -35,9 +39,18 @@ class HybridDataProvider(IDataProvider):
             "sync_daily_data": "akshare",
             "sync_limit_data": "akshare",
             "get_em_sectors": "akshare", # Added explicit routing
+            "get_concept_strength": "akshare",
+            "get_concept_correlation": "akshare",
+            "get_em_concept_strength": "akshare",
+            "get_board_index": "akshare",
+            "get_stock_boards": "akshare",
             
             # Stock Info (Snowball via AKShare)
             "get_stock_info": "stock_info",
+            "get_stock_info_many": "stock_info",
+            "prefetch_stock_info": "stock_info",
+            "search_stocks": "stock_info",
+            "get_stock_name": "stock_info",
             
             # Tushare 特有 (如有)
             "get_income": "tushare",
@@ -64,8 +77,16 @@ class HybridDataProvider(IDataProvider):
     def archive_filename_template(self) -> str:
         return self._default.archive_filename_template if self._default else "data_{date}.csv"
 
-    def register_provider(self, name: str, provider: IDataProvider):
-        """Dynamically register a data provider."""
+    def register_provider(self, name: str, provider: IDataProvider, pinned: bool = False):
+        """
+        Dynamically register a data provider.
+        :param pinned: 固定该名称，之后的普通注册被忽略 (回放数据源占用 akshare/sina 名称时使用)
+        """
+        if name in self._pinned and not pinned:
+            self.logger.info(f"Data provider '{name}' is pinned, ignored registration of {type(provider).__name__}")
+            return
+        if pinned:
+            self._pinned.add(name)
         self._providers[name] = provider
         self.logger.info(f"Registered data provider: {name}")
         # If no default set and this is a good candidate (e.g. sina), set it?
@@ -95,28 +116,58 @@ class HybridDataProvider(IDataProvider):
                 
         raise RuntimeError("No data provider available to handle request.")
 
+    def _provider_name(self, provider: IDataProvider) -> str:
+        for key, p in self._providers.items():
+            if p is provider:
+                return key
+        return "default"
+
+    def _timed(self, method_name: str, provider: IDataProvider, func: Callable) -> Callable:
+        """包装底层调用，记录延迟、返回数据量与异常次数 (见 vibe_core.metrics)。"""
+        name = self._provider_name(provider)
+
+        def call(*args, **kwargs):
+            accounting.record_data_call()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                DATA_CALL_ERRORS.labels(name, method_name).inc()
+                raise
+            DATA_CALL_SECONDS.labels(name, method_name).observe(time.perf_counter() - start)
+            DATA_PAYLOAD_ROWS.labels(name, method_name).observe(payload_size(result))
+            return result
+        return call
+
+    def _call(self, method_name: str, *args):
+        provider = self._get_provider_for(method_name)
+        return self._timed(method_name, provider, getattr(provider, method_name))(*args)
+
     # --- 接口实现 ---
 
     def get_price(self, code: str, date: str = None) -> Optional[float]:
         try:
-            return self._get_provider_for("get_price").get_price(code, date)
+            return self._call("get_price", code, date)
         except: return None
 
     def get_history(self, code: str, start_date: str, end_date: str) -> pd.DataFrame:
         try:
-            return self._get_provider_for("get_history").get_history(code, start_date, end_date)
+            return self._call("get_history", code, start_date, end_date)
         except: return pd.DataFrame()
 
     def get_snapshot(self, codes: List[str]) -> List[dict]:
         try:
-            return self._get_provider_for("get_snapshot").get_snapshot(codes)
+            return self._call("get_snapshot", codes)
         except: return []
 
     def get_table(self, table_name: str, date: Optional[str] = None) -> pd.DataFrame:
         try:
-            return self._get_provider_for("get_table").get_table(table_name, date)
+            return self._call("get_table", table_name, date)
         except: return pd.DataFrame()
 
+    def _wrap(self, name: str, provider: IDataProvider, attr: Any) -> Any:
+        return self._timed(name, provider, attr) if callable(attr) else attr
+
     # --- 魔法转发 ---
     def __getattr__(self, name):
         """
@@ -128,11 +179,11 @@ class HybridDataProvider(IDataProvider):
         # 1. Routing
         if name in self._routing:
             target = self._get_provider_for(name)
-            return getattr(target, name)
+            return self._wrap(name, target, getattr(target, name))
             
         # 2. Default
         if self._default and hasattr(self._default, name):
-            return getattr(self._default, name)
+            return self._wrap(name, self._default, getattr(self._default, name))
             
         # 3. Auto Discovery (Failover)
         # 这允许我们在不配置路由的情况下调用 akshare 特有的方法 (如 get_limit_up_pool)
@@ -141,7 +192,7 @@ class HybridDataProvider(IDataProvider):
                 # 缓存这个发现，下次直接路由
                 self._routing[name] = key
                 # self.logger.info(f"Auto-routed method '{name}' to provider '{key}'")
-                return getattr(provider, name)
+                return self._wrap(name, provider, getattr(provider, name))
         
         # Avoid returning None implicitly if not found, raise Error as expected by Python data model
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}' and no sub-provider has it.")
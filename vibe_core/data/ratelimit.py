@@ -0,0 +1,65 @@
+import time
+import threading
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    令牌桶限流器 (线程安全)。
+    以 rate 的速度补充令牌，最多累积 capacity 个，允许短时突发。
+    多个工作线程共享同一个实例即可对某个外部接口做整体限速。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        :param rate: 每秒补充的令牌数 (即稳态下每秒允许的请求数)
+        :param capacity: 桶容量，默认等于 max(1, rate)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, calls: float, capacity: Optional[float] = None) -> "TokenBucket":
+        """按每分钟调用次数构造 (例如 Tushare 的积分配额)。"""
+        return cls(calls / 60.0, capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """非阻塞获取，令牌不足立即返回 False。"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        阻塞直到获得令牌。
+        :param timeout: 最长等待秒数，None 表示一直等待
+        :return: 是否成功获取
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
@@ -0,0 +1,232 @@
+import os
+import re
+import bisect
+import logging
+import datetime
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from vibe_core.clock import get_clock
+from .provider import IDataProvider, DataDimension, SyncPolicy
+from .bar_store import DailyBarStore, get_bar_store
+
+LIMIT_BACKUP_DIR = os.path.join("data", "storage", "limit_backup")
+SECTOR_BACKUP_DIR = os.path.join("data", "storage", "sector_backup")
+RECORDER_DIR = os.path.join("data", "storage", "stock", "realtime")
+EM_SECTORS_PATH = os.path.join("data", "concepts", "em_sectors.csv")
+
+# 快照字段: 记录器 (英文) -> AKShare stock_zh_a_spot_em (中文)
+SNAPSHOT_COLUMNS = {
+    "code": "代码", "name": "名称", "price": "最新价", "change": "涨跌幅",
+    "open": "今开", "high": "最高", "low": "最低", "vol": "成交量",
+}
+
+
+class TimedArchive:
+    """
+    按时间戳备份的 CSV 目录: {root}/{YYYYMMDD}/{prefix}_{YYYYMMDD}_{HHMMSS}.csv
+    (AKShareLimitBoard 的 limit_backup 即此格式)。
+    at(dt) 返回 dt 时刻及之前最近的一份；目录文件变化 (仍在录制) 时重新扫描。
+    """
+
+    cache_size = 16
+
+    def __init__(self, root: str, prefix: str):
+        self.root = root
+        self.prefix = prefix
+        self._pattern = re.compile(rf"^{re.escape(prefix)}_(\d{{8}})_(\d{{6}})\.csv$")
+        self._index: Dict[str, Tuple[float, List[str], List[str]]] = {}  # day -> (dir mtime, times, paths)
+        self._frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def write(self, df: pd.DataFrame, at: datetime.datetime) -> str:
+        day = at.strftime("%Y%m%d")
+        directory = os.path.join(self.root, day)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.prefix}_{day}_{at.strftime('%H%M%S')}.csv")
+        tmp = path + ".tmp"
+        df.to_csv(tmp, index=False, encoding="utf-8-sig")
+        os.replace(tmp, path)
+        return path
+
+    def _day_index(self, day: str) -> Tuple[List[str], List[str]]:
+        directory = os.path.join(self.root, day)
+        if not os.path.isdir(directory):
+            return [], []
+        mtime = os.path.getmtime(directory)
+        cached = self._index.get(day)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+        entries = sorted((m.group(2), os.path.join(directory, name))
+                         for name in os.listdir(directory)
+                         for m in [self._pattern.match(name)] if m and m.group(1) == day)
+        times = [t for t, _ in entries]
+        paths = [p for _, p in entries]
+        self._index[day] = (mtime, times, paths)
+        return times, paths
+
+    def path_at(self, at: datetime.datetime) -> Optional[str]:
+        with self._lock:
+            times, paths = self._day_index(at.strftime("%Y%m%d"))
+        i = bisect.bisect_right(times, at.strftime("%H%M%S"))
+        return paths[i - 1] if i else None
+
+    def at(self, at: datetime.datetime) -> pd.DataFrame:
+        path = self.path_at(at)
+        if path is None:
+            return pd.DataFrame()
+        with self._lock:
+            df = self._frames.get(path)
+            if df is not None:
+                self._frames.move_to_end(path)
+                return df.copy()
+        try:
+            df = pd.read_csv(path, dtype={"代码": str}, encoding="utf-8-sig")
+        except Exception as e:
+            logging.getLogger("vibe.data.replay").error(f"Failed to read {path}: {e}")
+            return pd.DataFrame()
+        with self._lock:
+            self._frames[path] = df
+            while len(self._frames) > self.cache_size:
+                self._frames.popitem(last=False)
+        return df.copy()
+
+
+class RecorderLog:
+    """
+    MarketDataRecorder 的录制文件 ({root}/{YYYYMMDD}.csv，每行一个代码一次快照)。
+    as_of(dt) 返回每个代码在 dt 及之前的最后一条记录。
+    """
+
+    def __init__(self, root: str = RECORDER_DIR):
+        self.root = root
+        self._days: Dict[str, Tuple[float, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def _load_day(self, day: str) -> pd.DataFrame:
+        path = os.path.join(self.root, f"{day}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._days.get(day)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        try:
+            df = pd.read_csv(path, dtype={"code": str})
+            df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+            df = df.dropna(subset=["timestamp"]).sort_values("timestamp", kind="stable").reset_index(drop=True)
+        except Exception as e:
+            logging.getLogger("vibe.data.replay").error(f"Failed to read {path}: {e}")
+            return pd.DataFrame()
+        with self._lock:
+            self._days[day] = (mtime, df)
+        return df
+
+    def as_of(self, at: datetime.datetime) -> pd.DataFrame:
+        df = self._load_day(at.strftime("%Y%m%d"))
+        if df.empty:
+            return df
+        end = int(df["timestamp"].searchsorted(pd.Timestamp(at), side="right"))
+        return df.iloc[:end].drop_duplicates(subset=["code"], keep="last").reset_index(drop=True)
+
+
+class ReplayDataProvider(IDataProvider):
+    """
+    行情回放数据源。
+    以录制数据按时钟 (vibe_core.clock，回放模式下为虚拟时钟) 回答与 AKShare/Sina 相同的接口，
+    注册到 HybridDataProvider 的 akshare/sina 名下后，整个系统可以完全离线运行:
+    - get_limit_up_pool:  limit_backup 中当前时刻之前最近的一份涨停池
+    - get_snapshot / get_full_snapshot / get_price: MarketDataRecorder 录制的快照
+    - get_em_sectors:     sector_backup 中最近的一份行业板块，缺失时用 data/concepts/em_sectors.csv
+    - get_history:        本地日线存储，截止到回放当日
+    """
+
+    def __init__(self, clock=None, limit_dir: str = LIMIT_BACKUP_DIR, sector_dir: str = SECTOR_BACKUP_DIR,
+                 recorder_dir: str = RECORDER_DIR, sectors_path: str = EM_SECTORS_PATH,
+                 bar_store: Optional[DailyBarStore] = None):
+        self._clock = clock
+        self.limit_pool = TimedArchive(limit_dir, "limit_up")
+        self.sectors = TimedArchive(sector_dir, "em_sectors")
+        self.recorder = RecorderLog(recorder_dir)
+        self.sectors_path = sectors_path
+        # 默认使用进程内共享的日线存储，避免每次 get_history 重新扫描并映射
+        self.bar_store = bar_store if bar_store is not None else get_bar_store()
+        self.logger = logging.getLogger("vibe.data.replay")
+
+    @property
+    def clock(self):
+        return self._clock if self._clock is not None else get_clock()
+
+    @property
+    def data_dimension(self) -> DataDimension:
+        return DataDimension.DATE
+
+    @property
+    def sync_policy(self) -> SyncPolicy:
+        return SyncPolicy.MANUAL
+
+    @property
+    def archive_filename_template(self) -> str:
+        return "replay_{date}.csv"
+
+    def _as_of(self, date: Optional[str]) -> datetime.datetime:
+        """指定的历史日期取当日收盘后的最后一份，当日或未指定时取时钟当前时刻。"""
+        now = self.clock.now()
+        if date:
+            day = datetime.datetime.strptime(date.replace("-", ""), "%Y%m%d")
+            if day.date() < now.date():
+                return day.replace(hour=23, minute=59, second=59)
+        return now
+
+    # --- 涨停池 / 板块 ---
+
+    def get_limit_up_pool(self, date: str = None) -> pd.DataFrame:
+        return self.limit_pool.at(self._as_of(date))
+
+    def get_em_sectors(self) -> pd.DataFrame:
+        df = self.sectors.at(self.clock.now())
+        if df.empty and os.path.exists(self.sectors_path):
+            try:
+                df = pd.read_csv(self.sectors_path)
+            except Exception as e:
+                self.logger.error(f"Failed to read {self.sectors_path}: {e}")
+        return df
+
+    # --- 快照 ---
+
+    def get_full_snapshot(self) -> pd.DataFrame:
+        rows = self.recorder.as_of(self.clock.now())
+        if rows.empty:
+            return pd.DataFrame(columns=list(SNAPSHOT_COLUMNS.values()))
+        cols = [c for c in SNAPSHOT_COLUMNS if c in rows.columns]
+        return rows[cols].rename(columns=SNAPSHOT_COLUMNS)
+
+    def get_snapshot(self, codes: List[str]) -> List[dict]:
+        rows = self.recorder.as_of(self.clock.now())
+        if rows.empty:
+            return []
+        wanted = {str(c).split(".")[0] for c in codes}
+        subset = rows[rows["code"].astype(str).str.split(".").str[0].isin(wanted)]
+        cols = [c for c in SNAPSHOT_COLUMNS if c in subset.columns]
+        return subset[cols].to_dict(orient="records")
+
+    def get_price(self, code: str, date: str = None) -> Optional[float]:
+        snapshot = self.get_snapshot([code])
+        if snapshot and snapshot[0].get("price") is not None:
+            return float(snapshot[0]["price"])
+        return None
+
+    # --- 历史 ---
+
+    def get_history(self, code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """日线不超过回放当日 (避免看到未来)。"""
+        today = self.clock.now().strftime("%Y%m%d")
+        end = min(str(end_date).replace("-", ""), today) if end_date else today
+        return self.bar_store.get_history(code, str(start_date).replace("-", "") if start_date else None, end)
+
+    def get_table(self, table_name: str, date: Optional[str] = None) -> pd.DataFrame:
+        return pd.DataFrame()
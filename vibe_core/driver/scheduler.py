@@ -1,13 +1,17 @@
 import time
 import threading
 from typing import List, Tuple, Callable, Optional
+from vibe_core.clock import get_clock
+from vibe_core.metrics import SCHEDULER_JOB_ERRORS, SCHEDULER_JOB_SECONDS
 
 class SimpleScheduler:
     """
     A very basic scheduler to replace APScheduler for zero-dependency.
     Supports tagging jobs for cancellation.
+    间隔按时钟计算: 回放模式下使用虚拟时钟，倍速运行。
     """
-    def __init__(self):
+    def __init__(self, clock=None):
+        self._clock = clock
         # Job structure: (interval, function, tag, thread_handle)
         self.jobs: List[Tuple[float, Callable, Optional[str], threading.Thread]] = []
         self.running = False
@@ -18,6 +22,9 @@ class SimpleScheduler:
         Add a job that runs every X seconds.
         :param tag: Optional string tag (usually module name) to group jobs.
         """
+        duration = SCHEDULER_JOB_SECONDS.labels(tag or "untagged")
+        errors = SCHEDULER_JOB_ERRORS.labels(tag or "untagged")
+
         def loop():
             while self.running:
                 # Check if this specific job instance is still in the valid jobs list
@@ -25,20 +32,27 @@ class SimpleScheduler:
                 if not self._is_job_valid(tag, func):
                     break
                 
+                start = time.perf_counter()
                 try:
                     func()
                 except Exception as e:
+                    errors.inc()
                     print(f"Scheduler Job Error ({tag}): {e}")
+                duration.observe(time.perf_counter() - start)
                     
-                time.sleep(interval_seconds)
+                self.clock.sleep(interval_seconds)
         
-        t = threading.Thread(target=loop, daemon=True)
+        t = threading.Thread(target=loop, daemon=True, name=f"scheduler:{tag}")
         
         with self._lock:
             self.jobs.append((interval_seconds, func, tag, t))
             if self.running:
                 t.start()
 
+    @property
+    def clock(self):
+        return self._clock if self._clock is not None else get_clock()
+
     def _is_job_valid(self, tag, func):
         """Check if the job is still in the active list (hasn't been cancelled)"""
         with self._lock:
@@ -0,0 +1,258 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 延迟 (秒) 默认分桶: 100us ~ 30s
+LATENCY_BUCKETS: Tuple[float, ...] = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1,
+                                      0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 数据量 (行数 / 字节) 分桶
+SIZE_BUCKETS: Tuple[float, ...] = (1, 10, 100, 1_000, 5_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str = "", labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> object:
+        """按标签值取子指标 (已存在时只是一次字典查找)。"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def items(self):
+        return list(self._children.items())
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_label_text(self.label_names, key)} {child.value:g}" for key, child in self.items()]
+
+    def snapshot(self) -> List[dict]:
+        return [{"labels": dict(zip(self.label_names, key)), "value": child.value} for key, child in self.items()]
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "count", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一格为 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按分桶上界估计分位数 (落在 +Inf 桶时返回最大的有限上界)。"""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            if running >= target:
+                return bound
+        return self.buckets[-1]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, child in self.items():
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), child.counts):
+                running += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _label_text(self.label_names, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            labels = _label_text(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {child.sum:g}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+    def snapshot(self) -> List[dict]:
+        return [{
+            "labels": dict(zip(self.label_names, key)),
+            "count": child.count,
+            "sum": child.sum,
+            "avg": child.sum / child.count if child.count else None,
+            "p50": child.quantile(0.5),
+            "p95": child.quantile(0.95),
+        } for key, child in self.items()]
+
+
+class MetricsRegistry:
+    """
+    进程内指标注册表。
+    记录路径只有一次字典查找 + 一把细粒度锁，可以在生产环境常开；
+    render() 输出 Prometheus 文本格式，snapshot() 输出给仪表盘的 JSON。
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help: str, labels: Sequence[str], **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = cls(name, help, labels, **kwargs)
+                    self._metrics[name] = metric
+        if not isinstance(metric, cls) or metric.label_names != tuple(labels):
+            raise ValueError(f"Metric {name} already registered with a different type or labels")
+        return metric
+
+    def counter(self, name: str, help: str = "", labels: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str = "", labels: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str = "", labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: {"type": metric.kind, "help": metric.help, "series": metric.snapshot()}
+                for name, metric in sorted(self._metrics.items())}
+
+
+registry = MetricsRegistry()
+
+
+def payload_size(result) -> int:
+    """数据调用返回值的大小: DataFrame/列表/字典按行数 (元素数)，字符串/字节按长度，其余按 1。"""
+    if result is None:
+        return 0
+    try:
+        return len(result)
+    except TypeError:
+        return 1
+
+
+# --- 系统内置指标 ---
+
+DATA_CALL_SECONDS = registry.histogram(
+    "vibe_data_call_seconds", "Latency of data provider calls", ("provider", "method"))
+DATA_CALL_ERRORS = registry.counter(
+    "vibe_data_call_errors_total", "Data provider calls that raised", ("provider", "method"))
+DATA_PAYLOAD_ROWS = registry.histogram(
+    "vibe_data_payload_rows", "Rows/items returned by data provider calls", ("provider", "method"),
+    buckets=SIZE_BUCKETS)
+DATA_CACHE = registry.counter(
+    "vibe_data_cache_total", "DataAggregator cache lookups by result (hit/miss/coalesced)",
+    ("provider", "method", "result"))
+SCHEDULER_JOB_SECONDS = registry.histogram(
+    "vibe_scheduler_job_seconds", "Duration of scheduler interval jobs", ("tag",))
+SCHEDULER_JOB_ERRORS = registry.counter(
+    "vibe_scheduler_job_errors_total", "Scheduler jobs that raised", ("tag",))
+WS_SEND_SECONDS = registry.histogram(
+    "vibe_ws_send_seconds", "Latency of sending one WebSocket message to one client")
+WS_MESSAGE_BYTES = registry.histogram(
+    "vibe_ws_message_bytes", "Size of broadcast WebSocket messages", ("widget",), buckets=SIZE_BUCKETS)
+WS_CONNECTIONS = registry.gauge("vibe_ws_connections", "Connected WebSocket clients")
@@ -58,6 +58,14 @@ class VibeModule(ABC):
         """
         pass
 
+    def migrate_state(self, previous: 'VibeModule'):
+        """
+        可选：热重载时调用 (在 initialize 之前)，previous 为被替换的旧实例 (已 on_stop)。
+        可在此接管缓存、计数等运行状态，避免重载后从零开始。
+        Optional: called on hot reload (before initialize) with the instance being replaced.
+        """
+        pass
+
     def configure(self):
         """
         可选：在此处设置触发器或订阅主题。
@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+# 栈顶为这些函数的线程视为空闲 (等待锁/事件/IO/定时)，默认不计入样本
+IDLE_FUNCTIONS = frozenset({"wait", "sleep", "select", "poll", "accept", "_wait_for_tstate_lock",
+                            "readinto", "recv_into"})
+
+
+def module_of(filename: str) -> Optional[str]:
+    """
+    文件所属的 VibeStock 模块名: modules/<分类>/<包名>/... -> 包名，modules/<分类>/<文件>.py -> 文件名。
+    不在 modules 下返回 None。
+    """
+    parts = filename.replace("\\", "/").split("/")
+    try:
+        i = len(parts) - 1 - parts[::-1].index("modules")
+    except ValueError:
+        return None
+    rest = parts[i + 2:]
+    if not rest:
+        return None
+    return rest[0][:-3] if rest[0].endswith(".py") else rest[0]
+
+
+class StackSampler:
+    """
+    全线程采样分析器 (进程内，无需重启或外部工具)。
+    后台线程每 interval 秒用 sys._current_frames() 抓取所有线程的调用栈，
+    按折叠栈 (flamegraph.pl / speedscope 的 "a;b;c count" 格式) 计数，
+    同时把每个样本归属到栈上最外层的 modules/ 下的模块 (发起这次工作的模块)，
+    无模块帧的样本按线程名归类 (如 uvicorn、scheduler)。
+    include_idle=False 时跳过正在等待 (IDLE_FUNCTIONS) 的线程，结果接近 CPU 热点。
+    """
+
+    max_depth = 64
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._labels: Dict[object, Tuple[str, Optional[str]]] = {}  # code object -> (帧标签, 模块名)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stacks: Counter = Counter()
+            self.modules: Counter = Counter()
+            self.samples = 0
+            self.started_at: Optional[float] = None
+            self.elapsed = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: Optional[float] = None, include_idle: Optional[bool] = None, reset: bool = True) -> bool:
+        """开始采样；已在运行时返回 False。"""
+        if self.running:
+            return False
+        if interval:
+            self.interval = interval
+        if include_idle is not None:
+            self.include_idle = include_idle
+        if reset:
+            self.reset()
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="vibe-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> bool:
+        if not self.running:
+            return False
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed += time.time() - (self.started_at or time.time())
+        return True
+
+    def _label(self, code) -> Tuple[str, Optional[str]]:
+        cached = self._labels.get(code)
+        if cached is None:
+            filename = code.co_filename
+            try:
+                short = os.path.relpath(filename)
+                if short.startswith(".."):
+                    short = os.path.basename(filename)
+            except ValueError:
+                short = os.path.basename(filename)
+            cached = (f"{code.co_name} ({short.replace(os.sep, '/')})", module_of(filename))
+            self._labels[code] = cached
+        return cached
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            batch = []
+            for ident, frame in frames.items():
+                if ident == own or (not self.include_idle and frame.f_code.co_name in IDLE_FUNCTIONS):
+                    continue
+                stack = []
+                owner = None
+                depth = 0
+                while frame is not None and depth < self.max_depth:
+                    label, module = self._label(frame.f_code)
+                    stack.append(label)
+                    if module:
+                        owner = module  # 从栈顶向下走，最后一个即最外层
+                    frame = frame.f_back
+                    depth += 1
+                thread = names.get(ident, str(ident))
+                stack.append(thread)
+                batch.append((";".join(reversed(stack)), owner or f"[{thread.split('-')[0]}]"))
+            del frames
+            with self._lock:
+                self.samples += 1
+                for folded, owner in batch:
+                    self.stacks[folded] += 1
+                    self.modules[owner] += 1
+
+    # --- 输出 ---
+
+    def folded(self) -> str:
+        """折叠栈文本，可直接交给 flamegraph.pl 或拖入 speedscope。"""
+        with self._lock:
+            return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def summary(self, top: int = 20) -> dict:
+        with self._lock:
+            total = sum(self.modules.values()) or 1
+            leaf = Counter()
+            for stack, count in self.stacks.items():
+                leaf[stack.rsplit(";", 1)[-1]] += count
+            elapsed = self.elapsed + (time.time() - self.started_at if self.running and self.started_at else 0.0)
+            return {
+                "running": self.running,
+                "interval": self.interval,
+                "include_idle": self.include_idle,
+                "samples": self.samples,
+                "elapsed": round(elapsed, 3),
+                "by_module": [{"module": m, "samples": n, "percent": round(n * 100 / total, 2)}
+                              for m, n in self.modules.most_common()],
+                "top_functions": [{"frame": f, "samples": n, "percent": round(n * 100 / total, 2)}
+                                  for f, n in leaf.most_common(top)],
+            }
+
+
+profiler = StackSampler()
@@ -1,13 +1,17 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Body, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Body, HTTPException, BackgroundTasks, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
 import os
 import json
 import csv
+import asyncio
 from typing import List, Dict
 
 from .websocket_manager import manager
 from vibe_core.data.factory import DataFactory
+from vibe_core.metrics import registry as metrics_registry
+from vibe_core.profiler import profiler
+from vibe_core.accounting import accounting
 
 app = FastAPI()
 
@@ -30,111 +34,72 @@ async def get():
         return HTMLResponse(content=f.read())
 
 @app.get("/api/modules/ui_registry")
-async def get_ui_registry():
+async def get_ui_registry(request: Request):
     """
-    Returns the UI configuration for all active modules.
+    Returns the UI configuration for all running (and lazy) module instances.
     Used by the frontend to dynamically load scripts and build the dashboard.
+    Served from the ModuleLoaderService's in-memory registry (rebuilt only after
+    instances start/stop or definitions reload), with ETag / If-None-Match -> 304.
     """
-    # This logic should ideally be in module_loader, but for now we'll access context via a hack or singleton if available.
-    # A better way is to have ModuleLoaderService inject this data into a shared state or the server holds a reference.
-    # For now, let's look at what modules are loaded by scanning the filesystem or importing the loader service instance.
-    # Since server.py is often separate, we'll implement a simple scan or rely on the running vibe.py process to update a shared registry.
-    
-    # SIMPLIFICATION: We will re-scan here or use a shared singleton registry if one existed.
-    # To avoid complexity, we will manually instantiate modules to check config (NOT IDEAL but works for this task)
-    # OR better: The ModuleLoader updates a JSON file or shared dict.
-    
-    # FAST PATH: We scan the directories for __init__.py and import them? No, that's heavy.
-    # We will assume a global registry exists. 
-    # Let's import the loader service instance from vibe.py? No, circular import.
-    
-    # PRACTICAL SOLUTION:
-    # We will walk the 'modules' directory. If we find a module with 'widget.js' and a python class, 
-    # we can try to extract config. 
-    # BUT easier: Just return the config for the known 'watchlist' module we created, 
-    # plus any others we find that follow the pattern.
-    
-    registry = []
-    
-    # 1. Scan for modules with widget.js
-    for category in ["core", "prod", "beta"]:
-        cat_path = os.path.join(modules_dir, category)
-        if not os.path.exists(cat_path): continue
-        
-        for mod_name in os.listdir(cat_path):
-            mod_path = os.path.join(cat_path, mod_name)
-            if os.path.isdir(mod_path):
-                # Check for widget.js
-                widget_js = os.path.join(mod_path, "widget.js")
-                if os.path.exists(widget_js):
-                    # It has a UI. Now we need the python config.
-                    # We can try to import it, or just make a best guess/convention.
-                    # Convention: It must be loaded by the main process.
-                    
-                    # For this task, we will try to instantiate it temporarily to get config
-                    # OR we just hardcode the path convention for the frontend to assume.
-                    
-                    # Let's do the "Import to get config" (Safe enough for trusted code)
-                    try:
-                        import importlib.util
-                        spec = importlib.util.spec_from_file_location(mod_name, os.path.join(mod_path, "__init__.py"))
-                        if spec and spec.loader:
-                            module = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(module)
-                            # Find class
-                            from vibe_core.module import VibeModule
-                            for attr_name in dir(module):
-                                attr = getattr(module, attr_name)
-                                if isinstance(attr, type) and issubclass(attr, VibeModule) and attr is not VibeModule:
-                                    ui_config = None
-                                    
-                                    # 1. Try class method (preferred)
-                                    if hasattr(attr, 'get_ui_config') and callable(getattr(attr, 'get_ui_config')):
-                                        try:
-                                            # Check if it's bound (classmethod) or needs instance
-                                            # Inspecting is tricky, just try calling it as class method first
-                                            ui_config = attr.get_ui_config()
-                                        except TypeError:
-                                            # Likely an instance method requiring 'self'
-                                            pass
-                                        except Exception as e:
-                                            print(f"Error calling static get_ui_config for {mod_name}: {e}")
-
-                                    # 2. Fallback to instantiation
-                                    if ui_config is None:
-                                        try:
-                                            # Try passing None as context (for modules expecting context)
-                                            try:
-                                                instance = attr(None)
-                                            except TypeError:
-                                                # Fallback: Try no arguments (for modules without context in __init__)
-                                                instance = attr()
-                                                
-                                            if hasattr(instance, 'get_ui_config'):
-                                                ui_config = instance.get_ui_config()
-                                        except Exception as e:
-                                            print(f"Error instantiating {mod_name} for config: {e}")
-
-                                    if ui_config:
-                                        # Normalize to list
-                                        configs = ui_config if isinstance(ui_config, list) else [ui_config]
-                                        
-                                        for cfg in configs:
-                                            # Fix script path to be absolute URL
-                                            if "script_path" in cfg:
-                                                cfg["script_path"] = f"/modules/{category}/{mod_name}/{cfg['script_path']}"
-                                            registry.append(cfg)
-                                    break
-                    except Exception as e:
-                        print(f"Error loading UI config for {mod_name}: {e}")
-
-    return JSONResponse(registry)
+    loader = getattr(app.state, "module_loader", None)
+    if loader is None:
+        return JSONResponse([])
+    body, etag = loader.ui_registry()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/api/status")
 async def get_status():
     """Return the last update time of widgets to check data health."""
     return JSONResponse(manager.last_updates)
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of the in-process metrics registry."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/metrics")
+async def get_metrics_json():
+    """Metrics snapshot (count / avg / p50 / p95) for the dashboard."""
+    return JSONResponse(metrics_registry.snapshot())
+
+@app.get("/api/modules")
+async def get_modules(state: bool = True):
+    """Per-instance resource accounting (CPU / wall time, data calls, broadcast bytes, state memory)."""
+    # 状态内存需要遍历模块属性，放到线程池里避免阻塞事件循环
+    return JSONResponse(await asyncio.to_thread(accounting.report, state))
+
+# --- Debug: in-process sampling profiler ---
+
+@app.post("/api/debug/profile/start")
+async def start_profile(interval_ms: float = 5.0, include_idle: bool = False):
+    """Start sampling all threads (resets previous results)."""
+    started = profiler.start(interval=max(interval_ms, 1.0) / 1000, include_idle=include_idle)
+    return {"status": "started" if started else "already_running", "interval_ms": profiler.interval * 1000}
+
+@app.post("/api/debug/profile/stop")
+async def stop_profile():
+    profiler.stop()
+    return profiler.summary()
+
+@app.get("/api/debug/profile")
+async def get_profile(format: str = "json", seconds: float = 0, interval_ms: float = 5.0, include_idle: bool = False):
+    """
+    Profile results.
+    format=json: per-module / hottest-function summary; format=folded: flamegraph.pl / speedscope input.
+    seconds>0: sample for that many seconds first (when no session is running).
+    """
+    if seconds > 0 and not profiler.running:
+        profiler.start(interval=max(interval_ms, 1.0) / 1000, include_idle=include_idle)
+        await asyncio.sleep(min(seconds, 300))
+        profiler.stop()
+    if format == "folded":
+        return PlainTextResponse(profiler.folded(), headers={"Content-Disposition": "attachment; filename=vibe_profile.folded"})
+    return JSONResponse(profiler.summary())
+
 @app.get("/api/layout")
 async def get_layout():
     """Load dashboard layout."""
@@ -357,6 +322,18 @@ def _run_manual_sync(source: str, start_date: str = None, end_date: str = None):
         import traceback
         traceback.print_exc()
 
+@app.get("/api/stocks/search")
+async def search_stocks(q: str, limit: int = 10):
+    """Autocomplete stocks by code / name / pinyin initials prefix."""
+    ctx = getattr(app.state, "context", None)
+    data = getattr(ctx, "data", None)
+    if data is None or not hasattr(data, "search_stocks"):
+        return []
+    try:
+        return data.search_stocks(q, limit=min(max(limit, 1), 50))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/data/sync")
 async def trigger_sync(background_tasks: BackgroundTasks, source: str = "tushare", start_date: str = None, end_date: str = None):
     """Trigger a manual data sync."""
@@ -1,7 +1,10 @@
 from typing import List, Dict, Any, Callable, Awaitable
 import json
+import time
 import asyncio
 from fastapi import WebSocket
+from vibe_core.metrics import WS_CONNECTIONS, WS_MESSAGE_BYTES, WS_SEND_SECONDS
+from vibe_core.accounting import accounting
 
 class WebSocketManager:
     def __init__(self):
@@ -13,6 +16,7 @@ class WebSocketManager:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        WS_CONNECTIONS.set(len(self.active_connections))
         try:
             self.loop = asyncio.get_running_loop()
         except RuntimeError:
@@ -22,6 +26,7 @@ class WebSocketManager:
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+            WS_CONNECTIONS.set(len(self.active_connections))
             print(f"[WS] Client disconnected. Total: {len(self.active_connections)}")
 
     def set_handler(self, handler: Callable[[Dict[str, Any]], Awaitable[None]]):
@@ -49,10 +54,15 @@ class WebSocketManager:
             self.last_updates[message["widget_id"]] = datetime.datetime.now().isoformat()
 
         payload = json.dumps(message)
+        WS_MESSAGE_BYTES.labels(message.get("widget_id", message.get("type", ""))).observe(len(payload))
+        if "widget_id" in message:
+            accounting.record_broadcast(message["widget_id"], len(payload))
         # Create a copy of the list to iterate over, in case disconnect modifies it concurrently
         for connection in list(self.active_connections):
             try:
+                start = time.perf_counter()
                 await connection.send_text(payload)
+                WS_SEND_SECONDS.observe(time.perf_counter() - start)
             except Exception as e:
                 print(f"[WS] Error sending to client: {e}")
                 # We typically rely on the receive loop to detect disconnects, 
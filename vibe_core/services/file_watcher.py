@@ -0,0 +1,255 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import logging
+import threading
+import ctypes
+import ctypes.util
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+# inotify 事件掩码 (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+IGNORED_DIRS = frozenset({"__pycache__", ".git", "node_modules"})
+DEFAULT_SUFFIXES = (".py", ".yaml", ".yml")
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+class FileWatcher:
+    """
+    监视若干目录 (递归) 中的文件变化，去抖后批量回调 callback(changed_paths)。
+    只关心 suffixes 结尾的文件与目录本身的增删，忽略 __pycache__ 等目录与隐藏文件。
+    子类实现 _run 产生变化；基类负责过滤与去抖。
+    """
+
+    def __init__(self, paths: Iterable[str], callback: Callable[[Set[str]], None], debounce: float = 0.2,
+                 suffixes: Iterable[str] = DEFAULT_SUFFIXES):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.callback = callback
+        self.debounce = debounce
+        self.suffixes = tuple(suffixes)
+        self.logger = logging.getLogger("vibe.watcher")
+        self._pending: Set[str] = set()
+        self._last_event = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{type(self).__name__}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def relevant(self, path: str, is_dir: bool = False) -> bool:
+        parts = path.replace("\\", "/").split("/")
+        if any(p in IGNORED_DIRS for p in parts) or parts[-1].startswith("."):
+            return False
+        return is_dir or path.endswith(self.suffixes)
+
+    def _add(self, path: str, is_dir: bool = False):
+        if self.relevant(path, is_dir):
+            self._pending.add(path)
+            self._last_event = time.monotonic()
+
+    def _flush_due(self) -> Optional[float]:
+        """到期则回调并返回 None，否则返回距离到期还需等待的秒数。"""
+        if not self._pending:
+            return None
+        remaining = self.debounce - (time.monotonic() - self._last_event)
+        if remaining > 0:
+            return remaining
+        changed, self._pending = self._pending, set()
+        try:
+            self.callback(changed)
+        except Exception as e:
+            self.logger.error(f"File watcher callback failed: {e}")
+        return None
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    Linux inotify (ctypes 调用 libc，无第三方依赖)。
+    空闲时无超时地阻塞在 select 上 (只在去抖期间带超时)，stop 通过自管道 (self-pipe) 唤醒。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if _libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}  # wd -> 目录
+        self._wake_r, self._wake_w = os.pipe()
+        try:
+            for root in self.paths:
+                self._watch_tree(root)
+        except OSError:
+            for fd in (self._fd, self._wake_r, self._wake_w):
+                os.close(fd)
+            raise
+
+    @classmethod
+    def available(cls) -> bool:
+        return _libc is not None
+
+    def _watch(self, directory: str):
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                self.logger.warning("inotify watch limit reached (fs.inotify.max_user_watches)")
+            raise OSError(err, f"inotify_add_watch failed: {directory}")
+        self._dirs[wd] = directory
+
+    def _watch_tree(self, root: str, report: bool = False):
+        for directory, subdirs, files in os.walk(root):
+            subdirs[:] = [d for d in subdirs if d not in IGNORED_DIRS and not d.startswith(".")]
+            self._watch(directory)
+            if report:
+                # 新建/移入的目录: 监视建立前写入的文件也要上报
+                for name in files:
+                    self._add(os.path.join(directory, name))
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b"x")
+            except OSError:
+                pass
+        super().stop(timeout)
+        # 写端由 stop 关闭: 监视线程退出时只关闭它自己读的 fd，避免 stop 写到已关闭 (或被复用) 的 fd
+        if self._wake_w is not None:
+            os.close(self._wake_w)
+            self._wake_w = None
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                # 无待上报变化时 wait 为 None，一直阻塞到有事件或被 stop 唤醒
+                wait = self._flush_due()
+                ready, _, _ = select.select([self._fd, self._wake_r], [], [], wait)
+                if self._fd in ready:
+                    self._read_events()
+        finally:
+            os.close(self._fd)
+            os.close(self._wake_r)
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出，变化可能丢失: 上报根目录，由调用方整体重扫
+                for root in self.paths:
+                    self._add(root, is_dir=True)
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, name) if name else directory
+            is_dir = bool(mask & (IN_ISDIR | IN_DELETE_SELF))
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and self.relevant(path, True):
+                try:
+                    self._watch_tree(path, report=True)
+                except OSError as e:
+                    self.logger.warning(f"Cannot watch {path}: {e}")
+            self._add(path, is_dir=is_dir)
+
+
+class PollingWatcher(FileWatcher):
+    """轮询回退 (非 Linux 或 inotify 不可用时): 每 interval 秒比较一次文件 mtime。"""
+
+    def __init__(self, *args, interval: float = 1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, float]:
+        result = {}
+        for root in self.paths:
+            for directory, subdirs, files in os.walk(root):
+                subdirs[:] = [d for d in subdirs if d not in IGNORED_DIRS and not d.startswith(".")]
+                for name in files:
+                    path = os.path.join(directory, name)
+                    if self.relevant(path):
+                        try:
+                            result[path] = os.stat(path).st_mtime_ns
+                        except OSError:
+                            pass
+        return result
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            current = self._scan()
+            for path in current.keys() | self._snapshot.keys():
+                if current.get(path) != self._snapshot.get(path):
+                    self._add(path)
+            self._snapshot = current
+            # 一个轮询周期本身就是去抖窗口
+            if self._pending:
+                self._last_event = 0.0
+                self._flush_due()
+
+
+def create_watcher(paths: List[str], callback: Callable[[Set[str]], None], debounce: float = 0.2,
+                   poll_interval: float = 1.0, suffixes: Iterable[str] = DEFAULT_SUFFIXES) -> FileWatcher:
+    """优先使用 inotify，不可用 (平台不支持、监视数超限) 时回退到轮询。"""
+    if InotifyWatcher.available():
+        try:
+            return InotifyWatcher(paths, callback, debounce=debounce, suffixes=suffixes)
+        except OSError as e:
+            logging.getLogger("vibe.watcher").warning(f"inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(paths, callback, debounce=debounce, suffixes=suffixes, interval=poll_interval)
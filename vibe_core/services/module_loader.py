@@ -1,11 +1,16 @@
 from vibe_core.service import IService
 from vibe_core.module import VibeModule
 from vibe_core.context import Context
+from vibe_core.accounting import accounting
+from vibe_core.services.file_watcher import create_watcher, IGNORED_DIRS
+from vibe_core.services.reloader import ModuleReloader
 import os
-import time
+import copy
+import json
+import hashlib
+import inspect
 import threading
-import importlib.util
-import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import yaml
 import logging
 
@@ -14,15 +19,23 @@ class ModuleLoaderService(IService):
     Watches directories (core, prod, beta) and manages module lifecycle.
     Supports:
     - Multi-instance loading via config
-    - Dependency management
-    - Hot-reloading (for class definitions)
+    - Dependency management (parallel startup along the dependency DAG)
+    - Lazy instances, started when a dashboard widget subscribes to them
+    - Hot-reloading (for class definitions), driven by filesystem events
+      (inotify on Linux, polling every scan_interval seconds elsewhere), debounced
     """
-    def __init__(self, context: Context, scan_interval=5):
+    def __init__(self, context: Context, scan_interval=5, debounce=0.3, max_workers=8):
         self._name = "module_loader"
         self.context = context
         self.scan_interval = scan_interval
+        self.debounce = debounce
+        self.max_workers = max_workers
         self.running = False
         self._thread = None
+        self._watcher = None
+        self._changed = threading.Event()
+        self._changed_paths = set()
+        self._changed_lock = threading.Lock()
         self.logger = logging.getLogger("vibe.loader")
         
         # Structure: path -> timestamp
@@ -36,6 +49,28 @@ class ModuleLoaderService(IService):
         
         # Structure: path -> module_class_name
         self.path_to_class_name = {}
+
+        # Structure: instance_id -> explicit config (reused when a reload restarts the instance)
+        self.instance_configs = {}
+
+        # Structure: instance_id -> instances.yaml item, for lazy instances not started yet
+        self.lazy_instances = {}
+        # Structure: widget_id -> lazy instance_id
+        self._lazy_widgets = {}
+        # Lazy instance ids popped by _activate but not yet in active_instances
+        self._activating = set()
+
+        # UI registry: instance_id -> UI configs (running / lazy), served from memory with an ETag
+        self._instance_ui = {}
+        self._lazy_ui = {}
+        self._ui_registry_cache = None  # (body, etag), rebuilt after any change
+        # Structure: module_class_name -> default widget ids, computed once per definition load
+        self._class_widget_ids = {}
+        self._lock = threading.RLock()
+        self._activate_lock = threading.Lock()
+
+        self.reloader = ModuleReloader()
+        context.on_widget_subscribe(self.activate_widget)
         
         self.watch_dirs = [
             os.path.join("modules", "core"),
@@ -60,6 +95,10 @@ class ModuleLoaderService(IService):
 
     def stop(self):
         self.running = False
+        self._changed.set()
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
         if self._thread:
             self._thread.join(timeout=1)
 
@@ -67,12 +106,47 @@ class ModuleLoaderService(IService):
         # Initial scan and load
         self._scan_definitions()
         self._instantiate_modules()
-        
+
+        # 之后只在文件变化时被唤醒 (模块目录下任意 .py、config/ 下的 yaml)
+        watch_paths = [d for d in self.watch_dirs + ["config"] if os.path.isdir(d)]
+        self._watcher = create_watcher(watch_paths, self._on_files_changed,
+                                       debounce=self.debounce, poll_interval=self.scan_interval)
+        self._watcher.start()
+        self.logger.info(f"Module watcher using {type(self._watcher).__name__}")
+
         while self.running:
-            time.sleep(self.scan_interval)
-            if self._scan_definitions():
-                # If definitions changed, re-evaluate instances
-                self._instantiate_modules()
+            self._changed.wait()
+            self._changed.clear()
+            with self._changed_lock:
+                paths, self._changed_paths = self._changed_paths, set()
+            if self.running and paths:
+                self._apply_changes(paths)
+
+    def _on_files_changed(self, paths):
+        """Watcher callback (watcher thread): hand the batch to the loader thread."""
+        with self._changed_lock:
+            self._changed_paths |= paths
+        self._changed.set()
+
+    def _apply_changes(self, paths) -> bool:
+        self.logger.info(f"Detected changes: {sorted(os.path.relpath(p) for p in paths)}")
+        definitions_changed = self._scan_definitions()
+        config_changed = any(os.path.basename(p) == "instances.yaml" for p in paths)
+        if definitions_changed or config_changed:
+            # If definitions changed, re-evaluate instances
+            self._instantiate_modules()
+        return definitions_changed or config_changed
+
+    @staticmethod
+    def _package_mtime(package_dir: str) -> float:
+        """Newest mtime of any .py file in the package (submodules included)."""
+        latest = 0.0
+        for directory, subdirs, files in os.walk(package_dir):
+            subdirs[:] = [d for d in subdirs if d not in IGNORED_DIRS]
+            for filename in files:
+                if filename.endswith(".py"):
+                    latest = max(latest, os.path.getmtime(os.path.join(directory, filename)))
+        return latest
 
     def _scan_definitions(self) -> bool:
         """
@@ -97,7 +171,7 @@ class ModuleLoaderService(IService):
                 current_files.add(track_path)
                 
                 try:
-                    mtime = os.path.getmtime(track_path)
+                    mtime = self._package_mtime(full_path) if is_package else os.path.getmtime(track_path)
                     
                     if track_path not in self.file_timestamps:
                         # New definition
@@ -127,43 +201,55 @@ class ModuleLoaderService(IService):
         """Import module file and register VibeModule subclass."""
         self.logger.info(f"Loading definition from: {path}")
         try:
-            # Handle package paths
-            if path.endswith("__init__.py"):
-                module_name = os.path.basename(os.path.dirname(path))
-            else:
-                module_name = os.path.splitext(os.path.basename(path))[0]
-                
-            # Use unique spec name to force reload if needed
-            spec_name = f"vibe_dyn_{module_name}_{int(time.time())}"
-            spec = importlib.util.spec_from_file_location(spec_name, path)
-            
-            if spec and spec.loader:
-                mod = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(mod)
-                
-                found_class = False
-                for attribute_name in dir(mod):
-                    attribute = getattr(mod, attribute_name)
-                    if isinstance(attribute, type) and issubclass(attribute, VibeModule) and attribute is not VibeModule:
-                        # Found a valid module class
-                        self.available_classes[attribute.__name__] = attribute
-                        self.path_to_class_name[path] = attribute.__name__
-                        found_class = True
-                        # self.logger.debug(f"Registered class: {attribute.__name__}")
-                
-                if not found_class:
-                    self.logger.warning(f"No VibeModule subclass found in {path}")
-                    
+            # Reloader keeps a stable module name per definition and only re-executes changed submodules
+            mod = self.reloader.load(path)
+
+            found_class = False
+            reloaded = []
+            for attribute_name in dir(mod):
+                attribute = getattr(mod, attribute_name)
+                if isinstance(attribute, type) and issubclass(attribute, VibeModule) and attribute is not VibeModule:
+                    # Found a valid module class
+                    previous = self.available_classes.get(attribute.__name__)
+                    self.available_classes[attribute.__name__] = attribute
+                    self._class_widget_ids.pop(attribute.__name__, None)
+                    self.path_to_class_name[path] = attribute.__name__
+                    found_class = True
+                    if previous is not None and previous is not attribute and attribute.__module__ == mod.__name__:
+                        reloaded.append(attribute.__name__)
+
+            if not found_class:
+                self.logger.warning(f"No VibeModule subclass found in {path}")
+            self._ui_registry_cache = None
+
+            for class_name in reloaded:
+                self._reload_instances(class_name)
+
         except Exception as e:
             self.logger.error(f"Failed to import {path}: {e}")
             import traceback
             traceback.print_exc()
 
+    def _reload_instances(self, class_name: str):
+        """
+        Restart running instances of a reloaded class on the new definition.
+        The new instance receives the old one via VibeModule.migrate_state before initialize.
+        """
+        cls = self.available_classes[class_name]
+        for iid, inst in list(self.active_instances.items()):
+            if inst.__class__.__name__ == class_name and inst.__class__ is not cls:
+                self.logger.info(f"Reloading instance {iid} on new definition of {class_name}")
+                config = self.instance_configs.get(iid, {})
+                self._stop_instance(iid)
+                self._start_instance(iid, class_name, config, previous=inst)
+
     def _unload_class_definition(self, path: str):
+        self.reloader.unload(path)
         if path in self.path_to_class_name:
             class_name = self.path_to_class_name[path]
             if class_name in self.available_classes:
                 del self.available_classes[class_name]
+            self._class_widget_ids.pop(class_name, None)
             del self.path_to_class_name[path]
             
             # Stop all instances of this class
@@ -211,59 +297,40 @@ class ModuleLoaderService(IService):
                     "config": {} # Will verify if individual module config yaml exists later
                 })
 
-        # 2. Dependency Ordering (Simple topological sort or multi-pass)
-        # We need to know dependencies of classes.
-        # Ideally, we instantiate, check deps, if missing, wait.
-        # But VibeModule dependencies are instance attributes? No, usually class attributes or known.
-        # Let's assume we can just try to load, and if deps missing, retry next pass?
-        # Actually, let's implement a multi-pass loader.
-        
-        pending_instances = desired_instances[:]
-        loaded_in_this_pass = True
-        
-        while pending_instances and loaded_in_this_pass:
-            loaded_in_this_pass = False
-            retry_list = []
-            
-            for item in pending_instances:
-                iid = item['id']
-                class_name = item['module']
-                
-                # Check if class is available
-                if class_name not in self.available_classes:
-                    self.logger.warning(f"Class {class_name} not found for instance {iid}")
-                    continue
-                
-                # Check if already running
-                if iid in self.active_instances:
-                    # TODO: Check if config changed and reload? For now, skip.
-                    continue
-                
-                # Check Dependencies
-                # We need to instantiate temporarily or check class attribute to know dependencies?
-                # Let's inspect the class attribute 'dependencies' if it exists.
-                cls = self.available_classes[class_name]
-                # Default to empty list if not defined on class
-                deps = getattr(cls, 'dependencies', []) 
-                # Note: 'dependencies' on VibeModule instance is what we used before.
-                # If it's defined in __init__, we can't see it without instantiating.
-                # We encourage defining it as class attribute or we optimistically load.
-                
-                missing_deps = [d for d in deps if not self._is_module_active(d)]
-                
-                if missing_deps:
-                    # Dependencies not ready yet
-                    # Check if these deps are even in our desired list? 
-                    # If not, this module will never load.
-                    # For now, put in retry list.
-                    self.logger.debug(f"Instance {iid} ({class_name}) missing deps: {missing_deps}")
-                    retry_list.append(item)
-                else:
-                    # Ready to load
-                    self._start_instance(iid, class_name, item.get('config', {}))
-                    loaded_in_this_pass = True
-            
-            pending_instances = retry_list
+        # 2. Lazy instances (instances.yaml "lazy: true" or class attribute lazy = True)
+        #    are not started here; they start when a dashboard widget subscribes to them.
+        to_start = []
+        lazy_instances = {}
+        with self._lock:
+            # Instances being activated on demand count as running, or they would be queued twice
+            running = set(self.active_instances) | self._activating
+        for item in desired_instances:
+            iid = item['id']
+            class_name = item['module']
+
+            # Check if class is available
+            if class_name not in self.available_classes:
+                self.logger.warning(f"Class {class_name} not found for instance {iid}")
+                continue
+
+            # Check if already running
+            if iid in running:
+                # TODO: Check if config changed and reload? For now, skip.
+                continue
+
+            if item.get('lazy', getattr(self.available_classes[class_name], 'lazy', False)):
+                lazy_instances[iid] = item
+            else:
+                to_start.append(item)
+        # A non-lazy instance would wait forever on a lazy dependency: start those eagerly
+        eager = self._pop_lazy_dependencies(lazy_instances, to_start)
+        if eager:
+            self.logger.info(f"Starting lazy instances needed by eager dependants: {[i['id'] for i in eager]}")
+            to_start += eager
+        self._set_lazy_instances(lazy_instances)
+
+        # 3. Dependency-aware parallel start
+        pending_instances = self._start_ready(to_start)
 
         if pending_instances:
             self.logger.warning(f"Some modules could not be loaded due to missing dependencies or errors: {[i['id'] for i in pending_instances]}")
@@ -274,82 +341,262 @@ class ModuleLoaderService(IService):
                     missing = [d for d in deps if not self._is_module_active(d)]
                     self.logger.warning(f"  - {i['id']}: Missing {missing}")
 
-        # 3. Cleanup: Stop instances that are no longer in desired list
+        # 4. Cleanup: Stop instances that are no longer in desired list
         desired_ids = set(item['id'] for item in desired_instances)
         active_ids = list(self.active_instances.keys())
         for iid in active_ids:
             if iid not in desired_ids:
                 self._stop_instance(iid)
 
+    def _start_ready(self, items: list) -> list:
+        """
+        Start instances as a DAG over class `dependencies`: every instance whose dependencies
+        are active is started concurrently on a pool, dependants are submitted as soon as their
+        last dependency has started. Returns the items that could not be started.
+        """
+        pending = list(items)
+        running = {}  # future -> item
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="module-start") as pool:
+            while pending or running:
+                waiting = []
+                for item in pending:
+                    # Dependencies are read from the class attribute (instance-level ones are invisible here)
+                    deps = getattr(self.available_classes.get(item['module']), 'dependencies', [])
+                    if any(not self._is_module_active(d) for d in deps):
+                        waiting.append(item)
+                    else:
+                        future = pool.submit(self._start_instance, item['id'], item['module'], item.get('config', {}))
+                        running[future] = item
+                pending = waiting
+                if not running:
+                    # Remaining items wait on dependencies that will never become active
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+        return pending
+
+    def _set_lazy_instances(self, lazy_instances: dict):
+        """Index lazy instances by the widget ids they serve."""
+        widgets = {}
+        lazy_ui = {}
+        for iid, item in lazy_instances.items():
+            try:
+                # Same name/config as _start_instance, so the widget ids match the started instance
+                instance = self._prepare_instance(iid, item['module'], item.get('config', {}))
+                lazy_ui[iid] = self._ui_configs(iid, item['module'], instance)
+                for cfg in lazy_ui[iid]:
+                    if "id" in cfg:
+                        widgets[cfg["id"]] = iid
+            except Exception as e:
+                self.logger.error(f"Failed to read UI config of lazy instance {iid}: {e}")
+        with self._lock:
+            # An activation may have started since the caller took its snapshot
+            started = set(self.active_instances) | self._activating
+            lazy_instances = {iid: item for iid, item in lazy_instances.items() if iid not in started}
+            widgets = {w: iid for w, iid in widgets.items() if iid not in started}
+            lazy_ui = {iid: ui for iid, ui in lazy_ui.items() if iid not in started}
+            self.lazy_instances = lazy_instances
+            self._lazy_widgets = widgets
+            self._lazy_ui = lazy_ui
+            self._ui_registry_cache = None
+
+    def activate_widget(self, widget_id: str) -> bool:
+        """
+        Dashboard subscribed to widget_id: start the lazy instance behind it (in the background).
+        Returns False if no lazy instance serves this widget.
+        """
+        iid = self._lazy_widgets.get(widget_id)
+        if iid is None:
+            return False
+        threading.Thread(target=self._activate, args=(iid,), daemon=True, name=f"activate:{iid}").start()
+        return True
+
+    def _activate(self, instance_id: str):
+        with self._activate_lock:
+            with self._lock:
+                if instance_id not in self.lazy_instances:
+                    return
+                # Pull in lazy dependencies too (by instance id or class name)
+                root = self.lazy_instances.pop(instance_id)
+                items = [root] + self._pop_lazy_dependencies(self.lazy_instances, [root])
+                started = {item['id'] for item in items}
+                self._activating |= started
+                self._lazy_widgets = {w: i for w, i in self._lazy_widgets.items() if i not in started}
+                self._lazy_ui = {i: ui for i, ui in self._lazy_ui.items() if i not in started}
+            self.logger.info(f"Activating lazy instances on demand: {sorted(started)}")
+            try:
+                failed = self._start_ready(items)
+            finally:
+                with self._lock:
+                    self._activating -= started
+            if failed:
+                self.logger.warning(f"Lazy instances could not be started: {[i['id'] for i in failed]}")
+
+    def _pop_lazy_dependencies(self, lazy_instances: dict, items: list) -> list:
+        """Remove and return the lazy instances that items depend on (transitively)."""
+        found, queue = [], list(items)
+        while queue:
+            item = queue.pop()
+            for dep in getattr(self.available_classes.get(item['module']), 'dependencies', []):
+                for iid in [i for i, it in lazy_instances.items() if dep in (i, it['module'])]:
+                    dep_item = lazy_instances.pop(iid)
+                    found.append(dep_item)
+                    queue.append(dep_item)
+        return found
+
     def _is_module_active(self, module_name_or_id: str) -> bool:
         """Check if a module is active by ID or Class Name."""
+        with self._lock:
+            instances = dict(self.active_instances)
         # Check IDs
-        if module_name_or_id in self.active_instances:
+        if module_name_or_id in instances:
             return True
         # Check Class Names
-        for inst in self.active_instances.values():
+        for inst in instances.values():
             if inst.__class__.__name__ == module_name_or_id:
                 return True
         return False
 
-    def _start_instance(self, instance_id: str, class_name: str, config: dict):
-        self.logger.info(f"Starting instance: {instance_id} ({class_name})")
-        try:
+    def _ui_configs(self, instance_id: str, class_name: str, instance: VibeModule) -> list:
+        """UI configs of an instance, with widget ids made unique per instance."""
+        ui_configs = instance.get_ui_config()
+        if not ui_configs:
+            return []
+        if not isinstance(ui_configs, list): ui_configs = [ui_configs]
+        for cfg in ui_configs:
+            if "id" in cfg:
+                # Allow instance config to override UI widget ID to avoid conflicts?
+                # If multiple instances of same class, they'd conflict on default Widget ID.
+                # We should suffix the widget ID with instance ID if it's not the default one?
+
+                # LOGIC: If we have multiple instances, we MUST have unique widget IDs.
+                # The module should probably handle this by using self.name in get_ui_config,
+                # OR we dynamically patch it here.
+
+                # Let's patch it if the instance name != default class name
+                if instance_id != class_name and cfg['id'] in self._default_widget_ids(class_name):
+                    # If the ID is just the default one, we append instance name
+                    cfg['id'] = f"{cfg['id']}_{instance_id}"
+                    cfg['title'] = f"{cfg.get('title', '')} ({instance_id})"
+        return ui_configs
+
+    def ui_registry(self):
+        """
+        UI configs of all running and lazy instances, ordered by instance id.
+        Returns (json_body, etag); cached until an instance starts/stops or definitions reload.
+        """
+        with self._lock:
+            cached = self._ui_registry_cache
+            if cached is not None:
+                return cached
+            configs = dict(self._instance_ui)
+            configs.update({iid: ui for iid, ui in self._lazy_ui.items() if iid in self.lazy_instances})
+            class_paths = {cls: path for path, cls in self.path_to_class_name.items()}
+            registry = []
+            for iid in sorted(configs):
+                module = self.active_instances.get(iid)
+                class_name = type(module).__name__ if module is not None else self.lazy_instances[iid]['module']
+                path = class_paths.get(class_name)
+                base = os.path.relpath(os.path.dirname(path)).replace(os.sep, "/") if path else "modules"
+                for cfg in configs[iid]:
+                    cfg = dict(cfg)
+                    # Fix script path to be absolute URL
+                    if cfg.get("script_path") and not cfg["script_path"].startswith("/"):
+                        cfg["script_path"] = f"/{base}/{cfg['script_path']}"
+                    registry.append(cfg)
+            body = json.dumps(registry, ensure_ascii=False, default=str).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            self._ui_registry_cache = (body, etag)
+            return self._ui_registry_cache
+
+    def _default_widget_ids(self, class_name: str) -> set:
+        """Widget ids of the class's default instance, cached until its definition reloads."""
+        ids = self._class_widget_ids.get(class_name)
+        if ids is None:
             cls = self.available_classes[class_name]
-            instance = cls()
-            
-            # Override attributes
-            instance.name = instance_id # Set the instance name to the ID
-            
-            # Load specific config file if exists (modules/instance_id.yaml)
-            # OR modules/class_name.yaml
-            # Precedence: Explicit Config arg > Instance YAML > Class YAML
-            
-            # 1. Class YAML
-            class_conf_path = os.path.join("config", "modules", f"{class_name}.yaml")
-            if os.path.exists(class_conf_path):
-                with open(class_conf_path, 'r', encoding='utf-8') as f:
+            if isinstance(inspect.getattr_static(cls, 'get_ui_config', None), classmethod):
+                default = cls.get_ui_config()
+            else:
+                default = cls().get_ui_config()
+            default = default or []
+            if not isinstance(default, list): default = [default]
+            ids = self._class_widget_ids[class_name] = {cfg.get('id') for cfg in default}
+        return ids
+
+    def _prepare_instance(self, instance_id: str, class_name: str, config: dict) -> VibeModule:
+        """Create an instance named after instance_id with its merged config (not initialized)."""
+        cls = self.available_classes[class_name]
+        instance = cls()
+
+        # Override attributes
+        instance.name = instance_id # Set the instance name to the ID
+
+        # Load specific config file if exists (modules/instance_id.yaml)
+        # OR modules/class_name.yaml
+        # Precedence: Explicit Config arg > Instance YAML > Class YAML
+
+        # 1. Class YAML
+        class_conf_path = os.path.join("config", "modules", f"{class_name}.yaml")
+        if os.path.exists(class_conf_path):
+            with open(class_conf_path, 'r', encoding='utf-8') as f:
+                instance.config.update(yaml.safe_load(f) or {})
+
+        # 2. Instance YAML (if ID differs from class name)
+        if instance_id != class_name:
+            inst_conf_path = os.path.join("config", "modules", f"{instance_id}.yaml")
+            if os.path.exists(inst_conf_path):
+                with open(inst_conf_path, 'r', encoding='utf-8') as f:
                     instance.config.update(yaml.safe_load(f) or {})
-            
-            # 2. Instance YAML (if ID differs from class name)
-            if instance_id != class_name:
-                inst_conf_path = os.path.join("config", "modules", f"{instance_id}.yaml")
-                if os.path.exists(inst_conf_path):
-                    with open(inst_conf_path, 'r', encoding='utf-8') as f:
-                        instance.config.update(yaml.safe_load(f) or {})
-            
-            # 3. Explicit Config
-            instance.config.update(config)
+
+        # 3. Explicit Config
+        instance.config.update(config)
+        return instance
+
+    def _start_instance(self, instance_id: str, class_name: str, config: dict, previous: VibeModule = None):
+        self.logger.info(f"Starting instance: {instance_id} ({class_name})")
+        self.instance_configs[instance_id] = config
+        instance, routes = None, []
+        try:
+            instance = self._prepare_instance(instance_id, class_name, config)
 
             # Register UI Routes
-            ui_configs = instance.get_ui_config()
-            if ui_configs:
-                if not isinstance(ui_configs, list): ui_configs = [ui_configs]
-                for cfg in ui_configs:
-                    if "id" in cfg:
-                        # Allow instance config to override UI widget ID to avoid conflicts?
-                        # If multiple instances of same class, they'd conflict on default Widget ID.
-                        # We should suffix the widget ID with instance ID if it's not the default one?
-                        
-                        # LOGIC: If we have multiple instances, we MUST have unique widget IDs.
-                        # The module should probably handle this by using self.name in get_ui_config,
-                        # OR we dynamically patch it here.
-                        
-                        # Let's patch it if the instance.name != default class name
-                        if instance.name != class_name and cfg['id'] == getattr(cls(), 'get_ui_config', lambda: {'id':''})().get('id'):
-                             # If the ID is just the default one, we append instance name
-                             cfg['id'] = f"{cfg['id']}_{instance.name}"
-                             cfg['title'] = f"{cfg.get('title', '')} ({instance.name})"
-                        
-                        self.context.register_module_instance(cfg["id"], instance)
-
-            instance.initialize(self.context)
-            self.active_instances[instance_id] = instance
+            ui_configs = self._ui_configs(instance_id, class_name, instance)
+            for cfg in ui_configs:
+                if "id" in cfg:
+                    self.context.register_module_instance(cfg["id"], instance)
+                    routes.append(cfg["id"])
+                    accounting.bind_widget(cfg["id"], instance_id)
+
+            # Resource accounting: 模块代码 (on_event/process) 的 CPU、耗时、数据调用与推送计入该实例
+            accounting.track(instance_id, instance)
+            for method in ("on_event", "process"):
+                if callable(getattr(instance, method, None)):
+                    setattr(instance, method, accounting.wrap(instance_id, getattr(instance, method)))
+
+            # Hot reload: let the new instance take over state from the one it replaces
+            if previous is not None:
+                try:
+                    instance.migrate_state(previous)
+                except Exception as e:
+                    self.logger.error(f"State migration failed for {instance_id}: {e}")
+
+            accounting.wrap(instance_id, instance.initialize)(self.context)
+            with self._lock:
+                self.active_instances[instance_id] = instance
+                self._instance_ui[instance_id] = copy.deepcopy(ui_configs)
+                self._ui_registry_cache = None
             
         except Exception as e:
             self.logger.error(f"Failed to start instance {instance_id}: {e}")
             import traceback
             traceback.print_exc()
+            # Undo the registrations, so /api/modules and widget messages don't see a ghost instance
+            for widget_id in routes:
+                self.context.deregister_module_instance(widget_id, instance)
+            if instance is not None:
+                self.context.deregister_module(instance_id)
+                accounting.forget(instance_id)
 
     def _stop_instance(self, instance_id: str):
         self.logger.info(f"Stopping instance: {instance_id}")
@@ -361,4 +608,9 @@ class ModuleLoaderService(IService):
                 self.logger.error(f"Error stopping {instance_id}: {e}")
             
             self.context.deregister_module(instance_id)
-            del self.active_instances[instance_id]
+            accounting.forget(instance_id)
+            with self._lock:
+                del self.active_instances[instance_id]
+                self._instance_ui.pop(instance_id, None)
+                self._ui_registry_cache = None
+            self.instance_configs.pop(instance_id, None)
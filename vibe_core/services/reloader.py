@@ -0,0 +1,166 @@
+import os
+import sys
+import logging
+import importlib.util
+from types import ModuleType
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class LoadedPackage:
+    """一个模块定义 (包或单文件) 的导入记录。"""
+
+    def __init__(self, name: str, path: str):
+        self.name = name          # sys.modules 中的根名称
+        self.path = path          # __init__.py 或 .py 文件
+        self.root_dir = os.path.dirname(path) if path.endswith("__init__.py") else None
+        self.files: Dict[str, Tuple[str, float]] = {}   # 模块名 -> (文件, mtime)
+        self.deps: Dict[str, Set[str]] = {}             # 模块名 -> 引用的包内模块
+        self.sys_path_added: List[str] = []
+        self.claimed: Set[str] = set()                  # 导入期间首次出现的顶层名称模块 (经 sys.path 导入的包内文件)
+
+
+class ModuleReloader:
+    """
+    模块定义的重载管理器。
+    - 每个定义以稳定的名称 (vibe_mod_<分类>_<名称>) 作为真正的包导入，包内可用相对导入；
+    - 导入后记录包的导入图: 属于该包的模块 (名称前缀，或导入期间首次出现且文件位于包目录内) 及其相互引用；
+      进程中以常规包名 (如 modules.core.akshare_data.*) 导入的同一批文件不归重载器管理，不会被卸载；
+    - 重载时只卸载发生变化的子模块及 (传递) 引用它们的模块，未变化的子模块直接复用；
+    - 被替换的模块对象从 sys.modules 移除，导入期间追加到 sys.path 的条目也会撤销，
+      反复编辑重载不会让 sys.modules / sys.path 增长。
+    """
+
+    prefix = "vibe_mod"
+
+    def __init__(self):
+        self.packages: Dict[str, LoadedPackage] = {}  # 定义路径 -> 记录
+        self.logger = logging.getLogger("vibe.reloader")
+
+    def module_name(self, path: str) -> str:
+        """modules/core/akshare_data/__init__.py -> vibe_mod_core_akshare_data"""
+        path = os.path.abspath(path)
+        if path.endswith("__init__.py"):
+            path = os.path.dirname(path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        category = os.path.basename(os.path.dirname(path))
+        raw = f"{self.prefix}_{category}_{name}"
+        return "".join(c if c.isalnum() or c == "_" else "_" for c in raw)
+
+    # --- 导入图 ---
+
+    def _members(self, pkg: LoadedPackage) -> Dict[str, ModuleType]:
+        """当前 sys.modules 中属于该包的模块。"""
+        members = {}
+        for name, mod in list(sys.modules.items()):
+            if name == pkg.name or name.startswith(pkg.name + ".") or name in pkg.claimed:
+                members[name] = mod
+        return members
+
+    def _claim_new(self, pkg: LoadedPackage, before: Set[str]):
+        """记录本次导入新出现、文件位于包目录内的其他名称的模块 (通过 sys.path 以顶层名称导入的包内文件)。"""
+        pkg.claimed &= set(sys.modules)
+        if not pkg.root_dir:
+            return
+        root_dir = os.path.abspath(pkg.root_dir) + os.sep
+        for name in set(sys.modules) - before:
+            filename = getattr(sys.modules.get(name), "__file__", None)
+            if filename and os.path.abspath(filename).startswith(root_dir):
+                pkg.claimed.add(name)
+
+    def _record(self, pkg: LoadedPackage):
+        members = self._members(pkg)
+        pkg.files = {}
+        pkg.deps = {}
+        for name, mod in members.items():
+            filename = getattr(mod, "__file__", None)
+            if filename and os.path.exists(filename):
+                pkg.files[name] = (filename, os.path.getmtime(filename))
+            deps = set()
+            for value in list(vars(mod).values()):
+                ref = value.__name__ if isinstance(value, ModuleType) else getattr(value, "__module__", None)
+                if isinstance(ref, str) and ref != name and ref in members:
+                    deps.add(ref)
+            pkg.deps[name] = deps
+
+    def _stale(self, pkg: LoadedPackage) -> Set[str]:
+        """需要重新执行的模块: 根模块、文件变化的模块，以及 (传递) 引用它们的模块。"""
+        stale = {pkg.name}
+        for name, (filename, mtime) in pkg.files.items():
+            if not os.path.exists(filename) or os.path.getmtime(filename) != mtime:
+                stale.add(name)
+        changed = True
+        while changed:
+            changed = False
+            for name, deps in pkg.deps.items():
+                if name not in stale and deps & stale:
+                    stale.add(name)
+                    changed = True
+        # 无文件的命名空间包 (如没有 __init__.py 的 realtime/) 随其下的模块一起重建
+        for name in pkg.deps:
+            if name not in pkg.files and any(s.startswith(name + ".") for s in stale):
+                stale.add(name)
+        return stale
+
+    def _unload(self, pkg: LoadedPackage, names: Optional[Set[str]] = None):
+        for name in (names if names is not None else set(self._members(pkg))):
+            sys.modules.pop(name, None)
+        for entry in pkg.sys_path_added:
+            while entry in sys.path:
+                sys.path.remove(entry)
+        pkg.sys_path_added = []
+
+    # --- 对外接口 ---
+
+    def load(self, path: str) -> ModuleType:
+        """导入或重载定义文件，返回新的根模块。失败时抛出异常 (之前导入的类不受影响)。"""
+        path = os.path.abspath(path)
+        pkg = self.packages.get(path)
+        if pkg is None:
+            pkg = LoadedPackage(self.module_name(path), path)
+            self._unload(pkg)
+            reused = set()
+        else:
+            stale = self._stale(pkg)
+            self._unload(pkg, stale)
+            reused = set(pkg.deps) - stale
+            if reused:
+                self.logger.info(f"Reloading {pkg.name}: {len(stale)} changed, reusing {sorted(reused)}")
+
+        if pkg.root_dir:
+            spec = importlib.util.spec_from_file_location(pkg.name, path, submodule_search_locations=[pkg.root_dir])
+        else:
+            spec = importlib.util.spec_from_file_location(pkg.name, path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Cannot load {path}")
+
+        before = list(sys.path)
+        before_modules = set(sys.modules)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[pkg.name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            # 半初始化的模块不留在 sys.modules，下次整体重新导入
+            pkg.sys_path_added = [p for p in sys.path if p not in before]
+            self._claim_new(pkg, before_modules)
+            self._unload(pkg)
+            self.packages.pop(path, None)
+            raise
+        pkg.sys_path_added = [p for p in sys.path if p not in before]
+        self._claim_new(pkg, before_modules)
+
+        # 复用的子模块挂回新的父模块 (import 系统只在首次加载时设置该属性)
+        for name in reused:
+            parent, _, child = name.rpartition(".")
+            if parent and parent in sys.modules and name in sys.modules and not hasattr(sys.modules[parent], child):
+                setattr(sys.modules[parent], child, sys.modules[name])
+
+        self._record(pkg)
+        self.packages[path] = pkg
+        return module
+
+    def unload(self, path: str):
+        """定义被删除: 移除其全部模块与 sys.path 条目。"""
+        pkg = self.packages.pop(os.path.abspath(path), None)
+        if pkg is not None:
+            self._unload(pkg)